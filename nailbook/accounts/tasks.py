@@ -0,0 +1,10 @@
+"""کارهای پس‌زمینه حساب‌های کاربری"""
+
+from core.tasks import task
+from .models import User
+
+
+@task('accounts.set_role')
+def set_role(user_id, role):
+    """تنظیم نقش کاربر؛ Staff.save و Appointment.save نقش را در همان تراکنش تنظیم می‌کنند"""
+    User.objects.filter(id=user_id).exclude(role=role).update(role=role)
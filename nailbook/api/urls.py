@@ -13,6 +13,9 @@ urlpatterns = [
     path('salons/', views.salon_list_api, name='salon_list'),
     path('salons/<int:salon_id>/services/', views.salon_services_api, name='salon_services'),
     path('salons/<int:salon_id>/available-times/', views.available_times_api, name='available_times'),
+    path('owner/overview/', views.owner_overview_api, name='owner_overview'),
     path('appointments/', views.appointment_create_api, name='appointment_create'),
+    path('appointments/status/', views.appointment_status_api, name='appointment_status'),
     path('appointments/<int:appointment_id>/', views.appointment_detail_api, name='appointment_detail'),
+    path('outbox/stats/', views.outbox_stats_api, name='outbox_stats'),
 ]
\ No newline at end of file
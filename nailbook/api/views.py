@@ -3,23 +3,32 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
+from django.core.exceptions import ValidationError
+from django.db.models import Q
 from datetime import datetime, timedelta
 import json
 
 from salons.models import Salon, Staff
 from services.models import Service
 from appointments.models import Appointment
+from appointments.transitions import bulk_transition
+from appointments.waitlist import held_times, is_held_for_other
+from salons.overview import get_owner_overview
+from salons.search import search_salons
+from core.outbox import outbox_stats
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def salon_list_api(request):
-    """API لیست سالن‌ها"""
-    salons = Salon.objects.filter(is_active=True).values(
-        'id', 'name', 'phone', 'address', 'opening_time', 'closing_time'
-    )
+    """API لیست سالن‌ها (با ?search= به ترتیب شباهت)"""
+    salons = Salon.objects.filter(is_active=True)
+    search = request.GET.get('search', '').strip()
+    if search:
+        salons = search_salons(salons, search)
+    salons = salons.values('id', 'name', 'phone', 'address', 'opening_time', 'closing_time')
     return Response(list(salons))
 
 @api_view(['GET'])
@@ -54,6 +63,7 @@ def available_times_api(request, salon_id):
             appointment_date=appointment_date,
             status__in=['pending', 'confirmed', 'in_progress']
         ).values_list('appointment_time', flat=True)
+        booked_times = set(booked_times) | held_times(staff.id, appointment_date, request.user)
         
         # تولید ساعات موجود
         available_times = []
@@ -71,6 +81,16 @@ def available_times_api(request, salon_id):
     except Exception as e:
         return Response({'error': str(e)}, status=400)
 
+@api_view(['GET'])
+def owner_overview_api(request):
+    """API نمای کلی سالن‌های مسئول"""
+    if request.user.role != 'salon_owner':
+        return Response({'error': 'دسترسی غیر مجاز'}, status=403)
+    
+    overview = get_owner_overview(request.user)
+    overview['date'] = overview['date'].strftime('%Y-%m-%d')
+    return Response(overview)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def appointment_create_api(request):
@@ -92,7 +112,7 @@ def appointment_create_api(request):
             appointment_date=appointment_date,
             appointment_time=appointment_time,
             status__in=['pending', 'confirmed', 'in_progress']
-        ).exists():
+        ).exists() or is_held_for_other(staff.id, appointment_date, appointment_time, request.user):
             return Response({'error': 'این زمان رزرو شده است'}, status=400)
         
         # ایجاد نوبت
@@ -115,6 +135,34 @@ def appointment_create_api(request):
     except Exception as e:
         return Response({'error': str(e)}, status=400)
 
+@api_view(['POST'])
+def appointment_status_api(request):
+    """API تغییر وضعیت گروهی نوبت‌ها (مسئول سالن و کارمند)"""
+    appointment_ids = request.data.get('appointment_ids')
+    new_status = request.data.get('status')
+    if (not isinstance(appointment_ids, list) or not appointment_ids
+            or not all(isinstance(appointment_id, int) for appointment_id in appointment_ids)):
+        return Response({'error': 'لیست نوبت‌ها الزامی است'}, status=400)
+    
+    # فقط نوبت‌های سالن‌هایی که کاربر مسئول یا کارمند آن است
+    access = Q(salon__owner=request.user)
+    if hasattr(request.user, 'staff'):
+        access |= Q(salon_id=request.user.staff.salon_id)
+    appointments = Appointment.objects.filter(access, id__in=appointment_ids)
+    
+    try:
+        result = bulk_transition(appointments, new_status, actor=request.user)
+    except ValidationError as e:
+        return Response({'error': e.messages[0]}, status=400)
+    
+    found = result['updated'] + result['unchanged'] + result['rejected']
+    return Response({
+        'updated': result['updated'],
+        'unchanged': result['unchanged'],
+        'rejected_ids': result['rejected_ids'],
+        'not_found': len(set(appointment_ids)) - found,
+    })
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def appointment_detail_api(request, appointment_id):
@@ -136,3 +184,9 @@ def appointment_detail_api(request, appointment_id):
     }
     
     return Response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def outbox_stats_api(request):
+    """API معیارهای تأخیر outbox برای پایش"""
+    return Response(outbox_stats())
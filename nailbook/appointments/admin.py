@@ -1,9 +1,33 @@
-from django.contrib import admin
+from datetime import datetime
+
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import path, reverse
 from django.utils import timezone
 from django.db.models import Q
-from .models import Appointment, TimeSlot
+from core.jalali import format_dates
+from core.persian import format_price
+from core.paginators import EstimatedCountPaginator
+from notifications.reminders import send_appointment_reminders
+from .forms import AppointmentAdminForm, GenerateTimeSlotsForm, SlotAvailabilityForm
+from .models import Appointment, AppointmentStatusHistory, TimeSlot, WaitlistEntry
+from .search import search_appointments
+from .slots import generate_time_slots, set_slots_availability
+from .transitions import bulk_transition, transition_appointment
+
+STATUS_BADGE_COLORS = {
+    'pending': '#ffc107',
+    'confirmed': '#17a2b8',
+    'in_progress': '#007bff',
+    'completed': '#28a745',
+    'cancelled': '#dc3545',
+    'no_show': '#6c757d',
+}
+STATUS_LABELS = dict(Appointment.STATUS_CHOICES)
 
 class AppointmentStatusFilter(admin.SimpleListFilter):
     title = 'وضعیت نوبت'
@@ -31,6 +55,41 @@ class AppointmentStatusFilter(admin.SimpleListFilter):
         if self.value() == 'confirmed':
             return queryset.filter(status='confirmed')
 
+class AppointmentChangeList(ChangeList):
+    """ChangeList که تاریخ شمسی و رنگ هر ردیف صفحه را یک بار و با یک now محاسبه می‌کند"""
+    
+    def get_results(self, request):
+        super().get_results(request)
+        now = timezone.localtime().replace(tzinfo=None)
+        today = now.date()
+        persian_dates = format_dates([obj.appointment_date for obj in self.result_list])
+        
+        for obj, persian_date in zip(self.result_list, persian_dates):
+            appointment_dt = datetime.combine(obj.appointment_date, obj.appointment_time)
+            if appointment_dt < now:
+                color = '#dc3545'  # قرمز برای گذشته
+            elif obj.appointment_date == today:
+                color = '#ffc107'  # زرد برای امروز
+            else:
+                color = '#28a745'  # سبز برای آینده
+            
+            obj.admin_persian_date = persian_date
+            obj.admin_date_color = color
+
+class AppointmentStatusHistoryInline(admin.TabularInline):
+    """تاریخچه وضعیت (فقط خواندنی)"""
+    model = AppointmentStatusHistory
+    fields = ('changed_at', 'from_status', 'to_status', 'actor')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('actor')
+
 @admin.register(Appointment)
 class AppointmentAdmin(admin.ModelAdmin):
     list_display = (
@@ -42,6 +101,11 @@ class AppointmentAdmin(admin.ModelAdmin):
         'get_payment_status',
         'get_price_display'
     )
+    list_select_related = ('customer', 'service', 'salon', 'staff__user', 'staff__salon')
+    
+    # شمارش دقیق کل جدول در هر بار باز کردن لیست انجام نمی‌شود
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     list_filter = (
         AppointmentStatusFilter,
@@ -52,6 +116,7 @@ class AppointmentAdmin(admin.ModelAdmin):
         'created_at'
     )
     
+    # فقط برای نمایش کادر جستجو؛ جستجو از جدول توکن‌ها انجام می‌شود (get_search_results)
     search_fields = (
         'customer__username',
         'customer__first_name', 
@@ -65,6 +130,7 @@ class AppointmentAdmin(admin.ModelAdmin):
     
     ordering = ('-appointment_date', '-appointment_time')
     
+    form = AppointmentAdminForm
     fieldsets = (
         ('اطلاعات نوبت', {
             'fields': ('salon', 'customer', 'staff', 'service')
@@ -90,9 +156,27 @@ class AppointmentAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ('created_at', 'updated_at')
+    inlines = [AppointmentStatusHistoryInline]
     
     actions = ['mark_as_confirmed', 'mark_as_completed', 'mark_as_cancelled', 'send_reminder_sms']
     
+    def get_changelist(self, request, **kwargs):
+        return AppointmentChangeList
+    
+    def save_model(self, request, obj, form, change):
+        # بقیه فیلدها با save و وضعیت از مسیر اعتبارسنجی شده transitions؛ تاریخچه کاربر پنل را ثبت می‌کند نه سیستم
+        status = obj.status
+        if change and 'status' in form.changed_data:
+            obj.status = form.initial['status']
+        obj.save(actor=request.user)
+        if obj.status != status:
+            transition_appointment(obj, status, actor=request.user)
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search_appointments(queryset, search_term), False
+    
     def get_appointment_info(self, obj):
         return format_html(
             '<strong>{}</strong><br><small>{}</small>',
@@ -102,41 +186,19 @@ class AppointmentAdmin(admin.ModelAdmin):
     get_appointment_info.short_description = 'مشتری / خدمت'
     
     def get_appointment_datetime(self, obj):
-        persian_date = obj.get_persian_date()
-        time_str = obj.appointment_time.strftime('%H:%M')
-        
-        # رنگ‌بندی بر اساس زمان
-        now = timezone.now()
-        appointment_dt = obj.get_appointment_datetime()
-        
-        if appointment_dt < now:
-            color = '#dc3545'  # قرمز برای گذشته
-        elif appointment_dt.date() == now.date():
-            color = '#ffc107'  # زرد برای امروز
-        else:
-            color = '#28a745'  # سبز برای آینده
-        
+        # مقادیر از پیش محاسبه شده در AppointmentChangeList
         return format_html(
             '<span style="color: {}; font-weight: bold;">{}<br>{}</span>',
-            color, persian_date, time_str
+            obj.admin_date_color, obj.admin_persian_date, obj.appointment_time.strftime('%H:%M')
         )
     get_appointment_datetime.short_description = 'تاریخ و ساعت'
     
     def get_status_badge(self, obj):
-        colors = {
-            'pending': '#ffc107',
-            'confirmed': '#17a2b8',
-            'in_progress': '#007bff',
-            'completed': '#28a745',
-            'cancelled': '#dc3545',
-            'no_show': '#6c757d',
-        }
-        
-        color = colors.get(obj.status, '#6c757d')
+        color = STATUS_BADGE_COLORS.get(obj.status, '#6c757d')
         return format_html(
             '<span style="background-color: {}; color: white; padding: 3px 8px; border-radius: 3px; font-size: 11px;">{}</span>',
             color,
-            obj.get_status_display_fa()
+            STATUS_LABELS.get(obj.status, obj.status)
         )
     get_status_badge.short_description = 'وضعیت'
     
@@ -158,39 +220,49 @@ class AppointmentAdmin(admin.ModelAdmin):
     
     def get_price_display(self, obj):
         return format_html(
-            '<span style="font-weight: bold;">{:,} تومان</span>',
-            obj.total_price
+            '<span style="font-weight: bold;">{} تومان</span>',
+            format_price(obj.total_price)
         )
     get_price_display.short_description = 'مبلغ'
     
     # Actions
+    def _transition(self, request, queryset, status, done_message):
+        result = bulk_transition(queryset, status, actor=request.user)
+        self.message_user(request, f"{result['updated']} نوبت {done_message}.")
+        if result['rejected']:
+            self.message_user(
+                request,
+                f"{result['rejected']} نوبت به دلیل وضعیت فعلی قابل تغییر نبود.",
+                messages.WARNING
+            )
+    
     def mark_as_confirmed(self, request, queryset):
-        updated = queryset.update(status='confirmed')
-        self.message_user(request, f'{updated} نوبت تایید شد.')
+        self._transition(request, queryset, 'confirmed', 'تایید شد')
     mark_as_confirmed.short_description = 'تایید نوبت‌های انتخاب شده'
     
     def mark_as_completed(self, request, queryset):
-        updated = queryset.update(status='completed')
-        self.message_user(request, f'{updated} نوبت تکمیل شد.')
+        self._transition(request, queryset, 'completed', 'تکمیل شد')
     mark_as_completed.short_description = 'تکمیل نوبت‌های انتخاب شده'
     
     def mark_as_cancelled(self, request, queryset):
-        updated = queryset.update(status='cancelled')
-        self.message_user(request, f'{updated} نوبت لغو شد.')
+        self._transition(request, queryset, 'cancelled', 'لغو شد')
     mark_as_cancelled.short_description = 'لغو نوبت‌های انتخاب شده'
     
     def send_reminder_sms(self, request, queryset):
-        # اینجا می‌تونید کد ارسال پیامک بذارید
-        count = queryset.count()
-        self.message_user(request, f'پیامک یادآوری برای {count} نوبت ارسال شد.')
+        result = send_appointment_reminders(queryset.filter(status__in=['pending', 'confirmed']))
+        self.message_user(request, f"پیامک یادآوری برای {result['sent']} نوبت ارسال شد.")
+        if result['failed']:
+            self.message_user(request, f"ارسال {result['failed']} پیامک ناموفق بود.", messages.WARNING)
     send_reminder_sms.short_description = 'ارسال پیامک یادآوری'
 
 @admin.register(TimeSlot)
 class TimeSlotAdmin(admin.ModelAdmin):
     list_display = ('salon', 'staff', 'date', 'get_time_range', 'get_duration', 'is_available')
     list_filter = ('salon', 'is_available', 'date')
+    list_select_related = ('salon', 'staff__user', 'staff__salon')
     search_fields = ('salon__name', 'staff__user__first_name', 'staff__user__last_name')
     ordering = ('date', 'start_time')
+    change_list_template = 'admin/appointments/timeslot/change_list.html'
     
     fieldsets = (
         ('اطلاعات بازه زمانی', {
@@ -204,10 +276,86 @@ class TimeSlotAdmin(admin.ModelAdmin):
         })
     )
     
+    actions = ['mark_as_available', 'mark_as_unavailable']
+    
+    def get_urls(self):
+        urls = [
+            path('generate/', self.admin_site.admin_view(self.generate_view), name='appointments_timeslot_generate'),
+            path('availability/', self.admin_site.admin_view(self.availability_view),
+                 name='appointments_timeslot_availability'),
+        ]
+        return urls + super().get_urls()
+    
+    def _bulk_form_view(self, request, form_class, title, submit_label, handle):
+        """صفحه فرم گروهی؛ handle(cleaned_data) پیام نتیجه را برمی‌گرداند"""
+        if not self.has_change_permission(request) or not self.has_add_permission(request):
+            raise PermissionDenied
+        
+        if request.method == 'POST':
+            form = form_class(request.POST)
+            if form.is_valid():
+                self.message_user(request, handle(form.cleaned_data))
+                return redirect('admin:appointments_timeslot_changelist')
+        else:
+            staff_ids = [i for i in request.GET.get('staff', '').split(',') if i.isdigit()]
+            form = form_class(initial={'staff': staff_ids})
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': title,
+            'submit_label': submit_label,
+            'form': form,
+        }
+        return TemplateResponse(request, 'admin/appointments/timeslot/bulk_form.html', context)
+    
+    def generate_view(self, request):
+        def handle(data):
+            created = generate_time_slots(
+                data['staff'], data['start_date'], data['end_date'],
+                start_time=data['start_time'], end_time=data['end_time'],
+                slot_minutes=data['slot_minutes'], weekdays=set(data['weekdays']) or None,
+            )
+            return f'{created} بازه زمانی جدید ساخته شد.'
+        return self._bulk_form_view(request, GenerateTimeSlotsForm, 'ساخت گروهی بازه‌های زمانی', 'ساخت بازه‌ها', handle)
+    
+    def availability_view(self, request):
+        def handle(data):
+            updated = set_slots_availability(
+                data['staff'], data['start_date'], data['end_date'], data['is_available'],
+                start_time=data['start_time'], end_time=data['end_time'],
+            )
+            return f'وضعیت {updated} بازه زمانی تغییر کرد.'
+        return self._bulk_form_view(
+            request, SlotAvailabilityForm, 'فعال/غیرفعال کردن گروهی بازه‌ها', 'اعمال', handle
+        )
+    
     def get_time_range(self, obj):
         return f"{obj.start_time} - {obj.end_time}"
     get_time_range.short_description = 'بازه زمانی'
     
     def get_duration(self, obj):
         return f"{obj.duration_minutes} دقیقه"
-    get_duration.short_description = 'مدت زمان'
\ No newline at end of file
+    get_duration.short_description = 'مدت زمان'
+    
+    def mark_as_available(self, request, queryset):
+        updated = queryset.update(is_available=True)
+        self.message_user(request, f'{updated} بازه زمانی فعال شد.')
+    mark_as_available.short_description = 'فعال کردن بازه‌های انتخاب شده'
+    
+    def mark_as_unavailable(self, request, queryset):
+        updated = queryset.update(is_available=False)
+        self.message_user(request, f'{updated} بازه زمانی غیرفعال شد.')
+    mark_as_unavailable.short_description = 'غیرفعال کردن بازه‌های انتخاب شده'
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = (
+        'customer', 'salon', 'service', 'staff', 'date_from', 'date_to', 'time_from', 'time_to',
+        'priority', 'status', 'hold_expires_at'
+    )
+    list_filter = ('status', 'salon')
+    list_select_related = ('customer', 'salon', 'service', 'staff__user', 'staff__salon')
+    search_fields = ('customer__phone', 'customer__first_name', 'customer__last_name')
+    raw_id_fields = ('customer',)
+    readonly_fields = ('offered_staff', 'offered_date', 'offered_time', 'hold_expires_at', 'created_at')
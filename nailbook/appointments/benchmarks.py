@@ -0,0 +1,194 @@
+from datetime import time as dt_time, timedelta
+
+import jdatetime
+
+from django.contrib import admin
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import User
+from core.benchmarks import format_timings, measure, scenario, seed_salon
+from core.templatetags import persian_filters
+from . import views
+from .models import Appointment, TimeSlot, WaitlistEntry
+from .slots import generate_time_slots, set_slots_availability
+from .sweeper import stale_window, sweep_stale_appointments
+from .waitlist import find_matches
+
+
+@scenario('calendar_feed')
+def calendar_feed(options):
+    """نمای سه‌ماهه تقویم با 5000 نوبت"""
+    salon = seed_salon(appointments=5000, days=90, staff_count=10)
+    start = salon.appointments.order_by('appointment_date').values_list('appointment_date', flat=True).first()
+    end = start + timedelta(days=90)
+
+    factory = RequestFactory()
+    request = factory.get(
+        f'/appointments/calendar-data/{salon.id}/',
+        {'start': start.isoformat(), 'end': end.isoformat()},
+    )
+    request.user = salon.owner
+
+    response = views.appointment_calendar_data(request, salon.id)
+    yield f"{salon.appointments.count()} appointments, response {len(response.content) // 1024} KiB"
+    yield format_timings('3-month view', measure(
+        lambda: views.appointment_calendar_data(request, salon.id), repeat=options['repeat']
+    ))
+
+    staff_request = factory.get(
+        f'/appointments/calendar-data/{salon.id}/',
+        {'start': start.isoformat(), 'end': end.isoformat(), 'staff_id': salon.staff_members.first().id},
+    )
+    staff_request.user = salon.owner
+    yield format_timings('3-month view, one staff', measure(
+        lambda: views.appointment_calendar_data(staff_request, salon.id), repeat=options['repeat']
+    ))
+
+
+@scenario('admin_changelist')
+def admin_changelist(options):
+    """لیست نوبت‌ها در پنل مدیریت روی جدول بزرگ"""
+    size = int(120_000 * options['scale'])
+    salon = seed_salon(appointments=size, days=365, staff_count=max(20, size // 5000))
+    superuser = User.objects.create_superuser('bench_admin', password='bench', phone='bench_admin')
+    model_admin = admin.site._registry[Appointment]
+    factory = RequestFactory()
+
+    def render(params):
+        request = factory.get('/admin/appointments/appointment/', params)
+        request.user = superuser
+        return model_admin.changelist_view(request).render()
+
+    customer_phone = salon.appointments.values_list('customer__phone', flat=True).first()
+    yield f"{Appointment.objects.count()} appointments"
+    for label, params in [
+        ('first page', {}),
+        ('middle page', {'p': size // model_admin.list_per_page // 2}),
+        ('filtered by salon', {'salon__id__exact': salon.id}),
+        ('search one customer', {'q': customer_phone}),
+        ('search matching every row', {'q': 'مشتری'}),
+    ]:
+        with CaptureQueriesContext(connection) as queries:
+            render(params)
+        yield format_timings(f'{label} ({len(queries)} queries)', measure(
+            lambda: render(params), repeat=options['repeat']
+        ))
+
+
+@scenario('timeslot_generate')
+def timeslot_generate(options):
+    """ساخت یک ماه بازه نیم‌ساعته برای 20 کارمند و غیرفعال کردن یک هفته"""
+    salon = seed_salon(appointments=0, staff_count=20)
+    staff_members = list(salon.staff_members.select_related('salon'))
+    start = salon.created_at.date()
+    end = start + timedelta(days=30)
+
+    timings = measure(lambda: generate_time_slots(staff_members, start, end), repeat=1, warmup=0)
+    yield format_timings(f"{TimeSlot.objects.count()} slots generated", timings)
+    yield format_timings('re-run (no new slots)', measure(
+        lambda: generate_time_slots(staff_members, start, end), repeat=options['repeat'], warmup=0
+    ))
+    yield format_timings('toggle one week for all staff', measure(
+        lambda: set_slots_availability(staff_members, start, start + timedelta(days=6), False),
+        repeat=1, warmup=0,
+    ))
+
+
+@scenario('stale_sweep')
+def stale_sweep(options):
+    """بستن نوبت‌های گذشته یک سال با سیاست «انجام شده»"""
+    size = int(100_000 * options['scale'])
+    salon = seed_salon(
+        appointments=size, days=365, staff_count=max(20, size // 5000),
+        start=timezone.localdate() - timedelta(days=365),
+    )
+    salon.stale_appointment_policy = 'completed'
+    salon.save(update_fields=['stale_appointment_policy'])
+
+    cutoff = timezone.localtime().replace(tzinfo=None) - timedelta(hours=salon.stale_after_hours)
+    plan = Appointment.objects.filter(
+        stale_window(cutoff), salon_id__in=[salon.id], status='confirmed'
+    ).order_by().values('id').explain()
+    stale = Appointment.objects.filter(stale_window(cutoff), status__in=['pending', 'confirmed']).count()
+    yield f"{Appointment.objects.count()} appointments, {stale} stale"
+    yield f"scan plan: {' | '.join(line.split(' ', 3)[-1] for line in plan.splitlines())}"
+
+    counts = {}
+    timings = measure(lambda: counts.update(sweep_stale_appointments()), repeat=1, warmup=0)
+    yield format_timings(f"swept {sum(counts.values())} appointments", timings)
+    yield format_timings('re-run (nothing stale)', measure(
+        lambda: sweep_stale_appointments(), repeat=options['repeat'], warmup=0
+    ))
+
+
+@scenario('waitlist_match')
+def waitlist_match(options):
+    """پیدا کردن منتظر مناسب یک نوبت آزاد شده در لیست انتظار بزرگ"""
+    size = int(100_000 * options['scale'])
+    salon = seed_salon(appointments=0, staff_count=10, service_count=20, customers=1000)
+    services = list(salon.services.all())
+    staff = list(salon.staff_members.all())
+    customers = list(User.objects.filter(role='customer', username__startswith=salon.owner.username[:-6]))
+    today = timezone.localdate()
+
+    WaitlistEntry.objects.bulk_create([
+        WaitlistEntry(
+            salon=salon,
+            service=services[i % len(services)],
+            staff=staff[i % len(staff)] if i % 3 else None,
+            customer=customers[i % len(customers)],
+            date_from=today + timedelta(days=i % 60),
+            date_to=today + timedelta(days=i % 60 + 7),
+            time_from=dt_time(8 + i % 8),
+            time_to=dt_time(12 + i % 8),
+            status='waiting' if i % 4 else 'expired',
+        )
+        for i in range(size)
+    ], batch_size=2000)
+
+    slot = (services[0].id, staff[1].id, today + timedelta(days=30), dt_time(14))
+    plan = find_matches(*slot).explain()
+    yield f"{WaitlistEntry.objects.count()} waitlist entries, {find_matches(*slot).count()} match the slot"
+    yield f"match plan: {' | '.join(line.split(' ', 3)[-1] for line in plan.splitlines())}"
+    yield format_timings('first match', measure(
+        lambda: find_matches(*slot).first(), repeat=options['repeat']
+    ))
+
+
+@scenario('manage_render')
+def manage_render(options):
+    """رندر صفحه مدیریت نوبت‌ها با 1000 ردیف و فیلترهای تاریخ شمسی"""
+    salon = seed_salon(appointments=1000, days=30, staff_count=10)
+    request = RequestFactory().get(f'/appointments/manage/{salon.id}/')
+    request.user = salon.owner
+    appointments = list(salon.appointments.select_related('customer', 'staff__user', 'service').order_by(
+        '-appointment_date', '-appointment_time'
+    ))
+    context = {'salon': salon, 'appointments': appointments, 'status_filter': 'all'}
+    render = lambda: render_to_string('appointments/manage.html', context, request)
+
+    dates = [appointment.appointment_date for appointment in appointments]
+    yield f"{len(appointments)} rows, {len(set(dates))} distinct dates"
+    yield format_timings('persian_date x1000, per-call jdatetime', measure(
+        lambda: [jdatetime.date.fromgregorian(date=value).strftime('%Y/%m/%d') for value in dates],
+        repeat=options['repeat'],
+    ))
+    yield format_timings('persian_date x1000, cached', measure(
+        lambda: [persian_filters.persian_date(value) for value in dates], repeat=options['repeat']
+    ))
+
+    # همان فیلترها بدون کش، برای مقایسه با تبدیل تک‌تک قبلی
+    cached = persian_filters.to_jalali, persian_filters.format_jalali
+    persian_filters.to_jalali, persian_filters.format_jalali = (func.__wrapped__ for func in cached)
+    try:
+        yield format_timings('manage.html, uncached', measure(render, repeat=options['repeat']))
+    finally:
+        persian_filters.to_jalali, persian_filters.format_jalali = cached
+
+    persian_filters.clear_caches()
+    yield format_timings('manage.html, cached', measure(render, repeat=options['repeat']))
+    yield f"cache: {persian_filters.format_jalali.cache_info()}"
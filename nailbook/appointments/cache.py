@@ -0,0 +1,55 @@
+"""
+شمارنده نسخه نوبت‌های هر سالن برای کش قطعه‌ای قالب‌ها
+
+هر نوشتن روی Appointment (save، delete و update/delete/bulk_create روی
+QuerySet) نسخه سالن مربوط را بعد از commit تراکنش افزایش می‌دهد. قالب‌های
+داشبورد این نسخه را در کلید {% cache %} قرار می‌دهند، پس تا وقتی نوبتی
+تغییر نکرده جدول‌ها از کش رندر می‌شوند.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'appointments_version:{}'
+
+
+def _initial_version():
+    # مقدار اولیه وابسته به زمان است تا بعد از حذف کلید از کش، نسخه قدیمی تکرار نشود
+    return time.time_ns() // 1000
+
+
+def get_appointments_version(salon_id):
+    """نسخه فعلی نوبت‌های سالن"""
+    key = VERSION_KEY.format(salon_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(salon_ids):
+    for salon_id in salon_ids:
+        key = VERSION_KEY.format(salon_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), timeout=None)
+
+
+def bump_appointments_version(*salon_ids):
+    """افزایش نسخه نوبت‌های سالن‌ها بعد از commit تراکنش جاری"""
+    salon_ids = {salon_id for salon_id in salon_ids if salon_id is not None}
+    if salon_ids:
+        transaction.on_commit(lambda: _bump(salon_ids))
+
+
+def fragment_cache_context(salon_id):
+    """متغیرهای لازم برای {% cache %} در قالب‌های داشبورد"""
+    return {
+        'appointments_version': get_appointments_version(salon_id),
+        'fragment_timeout': settings.DASHBOARD_FRAGMENT_TIMEOUT,
+    }
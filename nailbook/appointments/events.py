@@ -0,0 +1,56 @@
+"""رویدادهای دامنه نوبت‌ها در outbox (core.outbox)"""
+
+from core.outbox import publish, publish_many
+
+CREATED = 'appointment.created'
+UPDATED = 'appointment.updated'
+STATUS_CHANGED = 'appointment.status_changed'
+RESCHEDULED = 'appointment.rescheduled'
+
+
+def appointment_payload(appointment):
+    return {
+        'salon_id': appointment.salon_id,
+        'customer_id': appointment.customer_id,
+        'staff_id': appointment.staff_id,
+        'service_id': appointment.service_id,
+        'date': appointment.appointment_date.isoformat(),
+        'time': appointment.appointment_time.strftime('%H:%M'),
+        'status': appointment.status,
+    }
+
+
+def publish_created(appointments):
+    publish_many((CREATED, appointment.pk, appointment_payload(appointment)) for appointment in appointments)
+
+
+def publish_updated(appointment, update_fields=None):
+    payload = appointment_payload(appointment)
+    if update_fields is not None:
+        payload['fields'] = sorted(update_fields)
+    publish(UPDATED, appointment.pk, payload)
+
+
+def publish_rescheduled(appointment, previous_slot):
+    """رویداد جابه‌جایی با زمان قبلی؛ previous_slot = (staff_id، تاریخ، ساعت)"""
+    staff_id, appointment_date, appointment_time = previous_slot
+    payload = appointment_payload(appointment)
+    payload.update({
+        'previous_staff_id': staff_id,
+        'previous_date': appointment_date.isoformat(),
+        'previous_time': appointment_time.strftime('%H:%M'),
+    })
+    publish(RESCHEDULED, appointment.pk, payload)
+
+
+def publish_status_changes(rows, from_status, to_status, actor_id=None):
+    """یک رویداد برای هر (appointment_id، salon_id)"""
+    publish_many(
+        (STATUS_CHANGED, appointment_id, {
+            'salon_id': salon_id,
+            'from_status': from_status,
+            'to_status': to_status,
+            'actor_id': actor_id,
+        })
+        for appointment_id, salon_id in rows
+    )
@@ -0,0 +1,101 @@
+from django import forms
+
+from salons.models import Salon, Staff
+from .models import Appointment, WaitlistEntry
+from .slots import MAX_RANGE_DAYS
+from .transitions import can_transition, transition_error
+
+SLOT_MINUTES_CHOICES = [(15, '15 دقیقه'), (30, '30 دقیقه'), (45, '45 دقیقه'), (60, '60 دقیقه')]
+
+
+class StaffDateRangeForm(forms.Form):
+    """انتخاب کارمندان و بازه تاریخ برای فرم‌های گروهی بازه‌های زمانی"""
+    staff = forms.ModelMultipleChoiceField(
+        queryset=Staff.objects.select_related('user', 'salon').order_by('salon__name', 'user__first_name'),
+        widget=forms.SelectMultiple(attrs={'size': 12}),
+        label='کارمندان',
+    )
+    start_date = forms.DateField(label='از تاریخ', widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(label='تا تاریخ', widget=forms.DateInput(attrs={'type': 'date'}))
+    start_time = forms.TimeField(
+        label='از ساعت', required=False, widget=forms.TimeInput(attrs={'type': 'time'}),
+        help_text='خالی: ساعت شروع کار سالن',
+    )
+    end_time = forms.TimeField(
+        label='تا ساعت', required=False, widget=forms.TimeInput(attrs={'type': 'time'}),
+        help_text='خالی: ساعت پایان کار سالن',
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date, end_date = cleaned_data.get('start_date'), cleaned_data.get('end_date')
+        if start_date and end_date:
+            if start_date > end_date:
+                raise forms.ValidationError('تاریخ شروع باید قبل از تاریخ پایان باشد')
+            if (end_date - start_date).days >= MAX_RANGE_DAYS:
+                raise forms.ValidationError(f'بازه تاریخ حداکثر {MAX_RANGE_DAYS} روز است')
+        start_time, end_time = cleaned_data.get('start_time'), cleaned_data.get('end_time')
+        if start_time and end_time and start_time >= end_time:
+            raise forms.ValidationError('ساعت شروع باید قبل از ساعت پایان باشد')
+        return cleaned_data
+
+
+class GenerateTimeSlotsForm(StaffDateRangeForm):
+    slot_minutes = forms.TypedChoiceField(
+        choices=SLOT_MINUTES_CHOICES, coerce=int, initial=30, label='طول هر بازه'
+    )
+    weekdays = forms.MultipleChoiceField(
+        choices=Salon.DAYS_CHOICES, required=False, widget=forms.CheckboxSelectMultiple,
+        label='روزهای هفته', help_text='خالی: همه روزها به جز روزهای تعطیل سالن',
+    )
+
+
+class SlotAvailabilityForm(StaffDateRangeForm):
+    is_available = forms.TypedChoiceField(
+        choices=[('0', 'غیرفعال (مرخصی / تعطیلی)'), ('1', 'فعال')],
+        coerce=lambda value: value == '1', initial='0', widget=forms.RadioSelect, label='وضعیت',
+    )
+
+
+class WaitlistForm(forms.ModelForm):
+    """ثبت در لیست انتظار یک سالن"""
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ['service', 'staff', 'date_from', 'date_to', 'time_from', 'time_to']
+        widgets = {
+            'date_from': forms.DateInput(attrs={'type': 'date'}),
+            'date_to': forms.DateInput(attrs={'type': 'date'}),
+            'time_from': forms.TimeInput(attrs={'type': 'time'}),
+            'time_to': forms.TimeInput(attrs={'type': 'time'}),
+        }
+
+    def __init__(self, *args, salon, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['service'].queryset = salon.services.filter(is_active=True)
+        self.fields['staff'].queryset = salon.staff_members.select_related('user')
+        self.fields['staff'].empty_label = 'فرقی نمی‌کند'
+        for field in self.fields.values():
+            field.widget.attrs.setdefault('class', 'form-control')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and (date_to - date_from).days >= MAX_RANGE_DAYS:
+            raise forms.ValidationError(f'بازه تاریخ حداکثر {MAX_RANGE_DAYS} روز است')
+        return cleaned_data
+
+
+class AppointmentAdminForm(forms.ModelForm):
+    """فرم ویرایش نوبت در پنل مدیریت؛ تغییر وضعیت فقط طبق ALLOWED_TRANSITIONS"""
+
+    class Meta:
+        model = Appointment
+        fields = '__all__'
+
+    def clean_status(self):
+        status = self.cleaned_data['status']
+        current = self.instance.status
+        if self.instance.pk and status != current and not can_transition(current, status):
+            raise forms.ValidationError(transition_error(current, status))
+        return status
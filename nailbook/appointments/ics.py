@@ -0,0 +1,177 @@
+"""
+فیدهای iCalendar (ICS) نوبت‌ها برای تقویم گوشی کارمندان و سالن‌ها
+
+آدرس فیدها با یک توکن امضاشده از شناسه و calendar_feed_key کارمند یا سالن
+ساخته می‌شود (بدون نیاز به ورود)؛ با عوض کردن کلید (reset_feed_key) آدرس لو
+رفته باطل می‌شود و با عوض کردن SECRET_KEY (و SECRET_KEY_FALLBACKS برای دوره
+انتقال) همه آدرس‌ها. هر فید فقط
+یک پنجره متحرک از نوبت‌ها را برمی‌گرداند و ETag آن از آخرین updated_at،
+تعداد نوبت‌ها و شروع پنجره ساخته می‌شود تا درخواست‌های دوره‌ای تقویم‌ها
+وقتی چیزی تغییر نکرده فقط یک کوئری تجمیعی و پاسخ 304 هزینه داشته باشند.
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Appointment
+
+ICS_PAST_DAYS = 30
+ICS_FUTURE_DAYS = 90
+
+STAFF_SALT = 'appointments.ics.staff'
+SALON_SALT = 'appointments.ics.salon'
+
+ICS_STATUS = {
+    'pending': 'TENTATIVE',
+    'confirmed': 'CONFIRMED',
+    'in_progress': 'CONFIRMED',
+    'completed': 'CONFIRMED',
+    'cancelled': 'CANCELLED',
+    'no_show': 'CANCELLED',
+}
+STATUS_LABELS = dict(Appointment.STATUS_CHOICES)
+
+ICS_FIELDS = (
+    'id', 'appointment_date', 'appointment_time', 'status', 'updated_at', 'notes',
+    'service__name', 'service__duration', 'customer__first_name', 'customer__last_name',
+    'customer__phone', 'staff__user__first_name', 'staff__user__last_name', 'salon__name',
+    'salon__address',
+)
+
+
+def make_feed_token(obj_id, feed_key, salt):
+    return signing.Signer(salt=salt).sign(f'{obj_id}.{feed_key}')
+
+
+def read_feed_token(token, salt):
+    """(شناسه، کلید فید) داخل توکن یا None اگر توکن نامعتبر باشد"""
+    try:
+        obj_id, feed_key = signing.Signer(salt=salt).unsign(token).split('.')
+        return int(obj_id), feed_key
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def staff_feed_token(staff):
+    return make_feed_token(staff.id, staff.calendar_feed_key, STAFF_SALT)
+
+
+def salon_feed_token(salon):
+    return make_feed_token(salon.id, salon.calendar_feed_key, SALON_SALT)
+
+
+def reset_feed_key(obj):
+    """کلید جدید فید کارمند یا سالن؛ آدرس‌های قبلی دیگر کار نمی‌کنند"""
+    from salons.models import new_feed_key
+
+    obj.calendar_feed_key = new_feed_key()
+    # UPDATE مستقیم؛ save سالن و کارمند ایندکس جستجو و نقش را هم بررسی می‌کند
+    type(obj).objects.filter(pk=obj.pk).update(calendar_feed_key=obj.calendar_feed_key)
+
+
+def feed_window(today=None):
+    today = today or timezone.localdate()
+    return today - timedelta(days=ICS_PAST_DAYS), today + timedelta(days=ICS_FUTURE_DAYS)
+
+
+def feed_queryset(queryset, today=None):
+    """نوبت‌های داخل پنجره متحرک فید"""
+    window_start, window_end = feed_window(today)
+    return queryset.filter(
+        appointment_date__gte=window_start,
+        appointment_date__lte=window_end,
+    ).order_by()
+
+
+def feed_etag(queryset, today=None):
+    """ETag و زمان آخرین تغییر فید با یک کوئری تجمیعی"""
+    window_start, _ = feed_window(today)
+    state = feed_queryset(queryset, today).aggregate(
+        last_updated=Max('updated_at'),
+        count=Count('id'),
+    )
+    last_updated = state['last_updated']
+    raw = f"{window_start.isoformat()}:{state['count']}:{last_updated.isoformat() if last_updated else ''}"
+    return hashlib.md5(raw.encode()).hexdigest(), last_updated
+
+
+def _escape(value):
+    return (
+        str(value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """شکستن خطوط طولانی‌تر از 75 بایت طبق RFC 5545"""
+    if len(line.encode('utf-8')) <= 75:
+        return line
+    parts = []
+    current, size = '', 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n'.join(parts)
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def build_calendar(queryset, calendar_name, today=None):
+    """متن کامل فایل ICS برای نوبت‌های پنجره فید"""
+    local_tz = timezone.get_current_timezone()
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//NailBook//Appointments//FA',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(calendar_name)}',
+        'X-PUBLISHED-TTL:PT15M',
+    ]
+
+    for (appointment_id, appointment_date, appointment_time, status, updated_at, notes,
+         service_name, duration, customer_first_name, customer_last_name, customer_phone,
+         staff_first_name, staff_last_name, salon_name, salon_address) in feed_queryset(
+            queryset, today).values_list(*ICS_FIELDS).iterator():
+        start = timezone.make_aware(datetime.combine(appointment_date, appointment_time), local_tz)
+        end = start + timedelta(minutes=duration)
+        customer = f"{customer_first_name} {customer_last_name}".strip()
+        staff = f"{staff_first_name} {staff_last_name}".strip()
+        description = '\n'.join(filter(None, [
+            f'مشتری: {customer} {customer_phone or ""}'.strip(),
+            f'کارمند: {staff}',
+            f'وضعیت: {STATUS_LABELS.get(status, status)}',
+            notes,
+        ]))
+
+        lines.extend([
+            'BEGIN:VEVENT',
+            f'UID:appointment-{appointment_id}@nailbook',
+            f'DTSTAMP:{_utc(updated_at)}',
+            f'LAST-MODIFIED:{_utc(updated_at)}',
+            f'DTSTART:{_utc(start)}',
+            f'DTEND:{_utc(end)}',
+            f'SUMMARY:{_escape(f"{service_name} - {customer}")}',
+            f'DESCRIPTION:{_escape(description)}',
+            f'LOCATION:{_escape(f"{salon_name}، {salon_address}")}',
+            f'STATUS:{ICS_STATUS.get(status, "CONFIRMED")}',
+            'END:VEVENT',
+        ])
+
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from appointments.models import Appointment
+from appointments.search import index_queryset
+
+
+class Command(BaseCommand):
+    help = 'ساخت دوباره توکن‌های جستجوی نوبت‌ها (بعد از migrate یا تغییر قواعد نرمال‌سازی)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salon', type=int, action='append', help='فقط نوبت‌های سالن با این شناسه')
+
+    def handle(self, *args, **options):
+        appointments = Appointment.objects.all()
+        if options['salon']:
+            appointments = appointments.filter(salon_id__in=options['salon'])
+
+        index_queryset(appointments)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {appointments.count()} appointments'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from appointments.sweeper import sweep_stale_appointments
+from appointments.waitlist import expire_waitlist_entries
+
+
+class Command(BaseCommand):
+    help = 'بستن خودکار نوبت‌های گذشته طبق سیاست هر سالن و انقضای لیست انتظار گذشته (اجرای دوره‌ای از cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='تعداد نوبت در هر دسته (پیش‌فرض SWEEP_BATCH_SIZE)')
+        parser.add_argument('--dry-run', action='store_true', help='فقط شمارش بدون تغییر وضعیت')
+
+    def handle(self, *args, **options):
+        counts = sweep_stale_appointments(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'Would sweep' if options['dry_run'] else 'Swept'
+        for (from_status, to_status), count in sorted(counts.items()):
+            self.stdout.write(f'{verb} {count} {from_status} -> {to_status}')
+        self.stdout.write(f'{verb} {sum(counts.values())} appointments in total')
+        if not options['dry_run']:
+            self.stdout.write(f'Expired {expire_waitlist_entries()} past waitlist entries')
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_alter_appointment_options_alter_timeslot_options_and_more'),
+        ('salons', '0003_salonforecast'),
+        ('services', '0002_alter_service_options_alter_service_duration_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['appointment_date', 'appointment_time'], name='appointment_datetime_idx'),
+        ),
+    ]
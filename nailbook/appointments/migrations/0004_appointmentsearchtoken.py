@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_appointment_datetime_idx'),
+        ('salons', '0003_salonforecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='appointments.appointment')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='salons.salon')),
+            ],
+            options={
+                'verbose_name': 'توکن جستجوی نوبت',
+                'verbose_name_plural': 'توکن\u200cهای جستجوی نوبت',
+                'indexes': [models.Index(fields=['token'], name='appointment_token_idx'), models.Index(fields=['salon', 'token'], name='appointment_salon_token_idx')],
+            },
+        ),
+    ]
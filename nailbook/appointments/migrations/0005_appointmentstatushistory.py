@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_appointmentsearchtoken'),
+        ('salons', '0003_salonforecast'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentStatusHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.PositiveSmallIntegerField(blank=True, choices=[(1, 'در انتظار تایید'), (2, 'تایید شده'), (3, 'در حال انجام'), (4, 'تکمیل شده'), (5, 'لغو شده'), (6, 'عدم حضور')], null=True, verbose_name='از وضعیت')),
+                ('to_status', models.PositiveSmallIntegerField(choices=[(1, 'در انتظار تایید'), (2, 'تایید شده'), (3, 'در حال انجام'), (4, 'تکمیل شده'), (5, 'لغو شده'), (6, 'عدم حضور')], verbose_name='به وضعیت')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='زمان تغییر')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='انجام دهنده')),
+                ('appointment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='appointments.appointment')),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='salons.salon')),
+            ],
+            options={
+                'verbose_name': 'تاریخچه وضعیت نوبت',
+                'verbose_name_plural': 'تاریخچه وضعیت نوبت\u200cها',
+                'ordering': ['changed_at', 'id'],
+                'indexes': [models.Index(fields=['salon', 'changed_at'], name='status_history_salon_idx'), models.Index(fields=['salon', 'to_status', 'changed_at'], name='status_history_status_idx')],
+            },
+        ),
+    ]
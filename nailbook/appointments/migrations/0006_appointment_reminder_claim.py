@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_appointmentstatushistory'),
+        ('salons', '0003_salonforecast'),
+        ('services', '0002_alter_service_options_alter_service_duration_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='reminder_claim',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='reminder_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('reminder_sent', False)), fields=['appointment_date', 'appointment_time'], name='appointment_reminder_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['reminder_claim'], name='appointment_reminder_claim_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_appointment_reminder_claim'),
+        ('salons', '0004_stale_appointment_policy'),
+        ('services', '0002_alter_service_options_alter_service_duration_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['salon', 'status', 'appointment_date'], name='appointment_salon_status_idx'),
+        ),
+    ]
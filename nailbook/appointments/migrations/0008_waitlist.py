@@ -0,0 +1,84 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0007_appointment_salon_status_idx'),
+        ('salons', '0004_stale_appointment_policy'),
+        ('services', '0002_alter_service_options_alter_service_duration_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_from', models.DateField(verbose_name='از تاریخ')),
+                ('date_to', models.DateField(verbose_name='تا تاریخ')),
+                ('time_from', models.TimeField(verbose_name='از ساعت')),
+                ('time_to', models.TimeField(verbose_name='تا ساعت')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='اولویت')),
+                ('status', models.CharField(choices=[('waiting', 'در انتظار'), ('offered', 'نگه داشته شده'), ('booked', 'رزرو شده'), ('expired', 'منقضی'), ('cancelled', 'لغو شده')], default='waiting', max_length=10, verbose_name='وضعیت')),
+                ('offered_date', models.DateField(blank=True, null=True, verbose_name='تاریخ نوبت پیشنهادی')),
+                ('offered_time', models.TimeField(blank=True, null=True, verbose_name='ساعت نوبت پیشنهادی')),
+                ('hold_expires_at', models.DateTimeField(blank=True, null=True, verbose_name='انقضای نگه\u200cداری')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'لیست انتظار',
+                'verbose_name_plural': 'لیست انتظار',
+                'ordering': ['-priority', 'created_at'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['staff', 'appointment_date', 'appointment_time'], name='appointment_slot_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'confirmed', 'in_progress'])), fields=('salon', 'staff', 'appointment_date', 'appointment_time'), name='appointment_active_slot_unique'),
+        ),
+        migrations.AddField(
+            model_name='waitlistentry',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='waitlistentry',
+            name='offered_staff',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='salons.staff', verbose_name='کارمند نوبت پیشنهادی'),
+        ),
+        migrations.AddField(
+            model_name='waitlistentry',
+            name='salon',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='salons.salon'),
+        ),
+        migrations.AddField(
+            model_name='waitlistentry',
+            name='service',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='services.service'),
+        ),
+        migrations.AddField(
+            model_name='waitlistentry',
+            name='staff',
+            field=models.ForeignKey(blank=True, help_text='خالی: هر کارمندی', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='salons.staff', verbose_name='کارمند'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(fields=['service', 'status', 'date_from'], name='waitlist_match_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(fields=['offered_staff', 'offered_date'], name='waitlist_hold_idx'),
+        ),
+    ]
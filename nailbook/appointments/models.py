@@ -1,8 +1,86 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from datetime import datetime, timedelta
-import jdatetime
+from core.jalali import format_date
+from .cache import bump_appointments_version
+
+# تغییر این فیلدها توکن‌های جستجوی نوبت را عوض می‌کند
+SEARCH_RELATED_FIELDS = {
+    'salon', 'salon_id', 'customer', 'customer_id', 'staff', 'staff_id', 'service', 'service_id',
+}
+SEARCH_KEY_FIELDS = ('salon_id', 'customer_id', 'staff_id', 'service_id')
+
+# تغییر این فیلدها یعنی نوبت قبلی آزاد شده است
+SLOT_FIELDS = {'staff', 'staff_id', 'appointment_date', 'appointment_time'}
+
+class AppointmentQuerySet(models.QuerySet):
+    """QuerySet نوبت‌ها که بعد از نوشتن‌های گروهی نسخه کش سالن‌ها را افزایش می‌دهد"""
+    
+    def _salon_ids(self):
+        return set(self.order_by().values_list('salon_id', flat=True).distinct())
+    
+    def update(self, **kwargs):
+        # مثل auto_now در save؛ ETag فیدهای تقویم به updated_at وابسته است
+        kwargs.setdefault('updated_at', timezone.now())
+        salon_ids = self._salon_ids()
+        reindex_ids = None
+        if SEARCH_RELATED_FIELDS.intersection(kwargs):
+            reindex_ids = list(self.order_by().values_list('id', flat=True))
+        updated = super().update(**kwargs)
+        new_salon = kwargs.get('salon_id', kwargs.get('salon'))
+        if new_salon is not None:
+            salon_ids.add(getattr(new_salon, 'pk', new_salon))
+        bump_appointments_version(*salon_ids)
+        if reindex_ids:
+            from .search import index_appointments
+            index_appointments(reindex_ids)
+        return updated
+    update.alters_data = True
+    
+    def delete(self):
+        salon_ids = self._salon_ids()
+        result = super().delete()
+        bump_appointments_version(*salon_ids)
+        return result
+    delete.alters_data = True
+    delete.queryset_only = True
+    
+    def _calendar_days(self, **filters):
+        from core.models import CalendarDay
+        return self.filter(appointment_date__in=CalendarDay.objects.filter(**filters).values('date'))
+    
+    def in_jalali_month(self, year, month):
+        """نوبت‌های یک ماه شمسی (از جدول CalendarDay)"""
+        return self._calendar_days(jalali_year=year, jalali_month=month)
+    
+    def in_jalali_week(self, year, week):
+        """نوبت‌های هفته week ام سال شمسی (هفته از شنبه)"""
+        return self._calendar_days(jalali_year=year, jalali_week=week)
+    
+    def on_holidays(self):
+        """نوبت‌های روزهای تعطیل رسمی و جمعه‌ها"""
+        from core.models import CalendarDay
+        return self.filter(appointment_date__in=CalendarDay.objects.filter(
+            models.Q(is_holiday=True) | models.Q(is_weekend=True)
+        ).values('date'))
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        from .events import publish_created
+        from .search import index_appointments
+        
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bump_appointments_version(*{obj.salon_id for obj in objs})
+        # با ignore_conflicts بعضی پایگاه‌داده‌ها pk برنمی‌گردانند؛ آن نوبت‌ها باید جدا ایندکس شوند
+        created = [obj for obj in objs if obj.pk is not None]
+        index_appointments(obj.pk for obj in created)
+        publish_created(created)
+        by_status = {}
+        for obj in created:
+            by_status.setdefault(obj.status, []).append((obj.pk, obj.salon_id))
+        for status, rows in by_status.items():
+            AppointmentStatusHistory.record(rows, None, status)
+        return objs
 
 class Appointment(models.Model):
     STATUS_CHOICES = [
@@ -47,13 +125,41 @@ class Appointment(models.Model):
     # SMS
     sms_sent = models.BooleanField(default=False, verbose_name='پیامک ارسال شده')
     reminder_sent = models.BooleanField(default=False, verbose_name='یادآوری ارسال شده')
+    # رزرو نوبت برای ارسال یادآوری توسط یک worker (notifications.reminders.claim_due_reminders)
+    reminder_claim = models.UUIDField(null=True, blank=True, editable=False)
+    reminder_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = AppointmentQuerySet.as_manager()
+    
     class Meta:
         ordering = ['appointment_date', 'appointment_time']
-        unique_together = ['salon', 'staff', 'appointment_date', 'appointment_time']
+        constraints = [
+            # نوبت‌های لغو شده یا گذشته ساعت را آزاد می‌کنند؛ فقط نوبت‌های فعال یکتا هستند
+            models.UniqueConstraint(
+                fields=['salon', 'staff', 'appointment_date', 'appointment_time'],
+                condition=models.Q(status__in=['pending', 'confirmed', 'in_progress']),
+                name='appointment_active_slot_unique',
+            ),
+        ]
+        indexes = [
+            # مرتب‌سازی و صفحه‌بندی لیست نوبت‌ها در پنل مدیریت
+            models.Index(fields=['appointment_date', 'appointment_time'], name='appointment_datetime_idx'),
+            # بررسی تداخل رزرو، ساعات خالی و لیست انتظار (کارمند، روز، ساعت)
+            models.Index(fields=['staff', 'appointment_date', 'appointment_time'], name='appointment_slot_idx'),
+            # فقط نوبت‌هایی که هنوز یادآوری نگرفته‌اند؛ ایندکس کوچک می‌ماند. شرط وضعیت عمداً
+            # در ایندکس نیست چون SQLite شرط‌های پارامتری (status IN (?, ?)) را با آن تطبیق نمی‌دهد
+            models.Index(
+                fields=['appointment_date', 'appointment_time'],
+                name='appointment_reminder_due_idx',
+                condition=models.Q(reminder_sent=False),
+            ),
+            models.Index(fields=['reminder_claim'], name='appointment_reminder_claim_idx'),
+            # فیلتر وضعیت نوبت‌های یک سالن (داشبوردها، گزارش‌ها و appointments.sweeper)
+            models.Index(fields=['salon', 'status', 'appointment_date'], name='appointment_salon_status_idx'),
+        ]
         verbose_name = 'نوبت'
         verbose_name_plural = 'نوبت‌ها'
     
@@ -84,17 +190,81 @@ class Appointment(models.Model):
         if errors:
             raise ValidationError(errors)
     
-    def save(self, *args, **kwargs):
+    def save(self, *args, actor=None, **kwargs):
+        # actor کاربری است که نوبت را ساخته یا وضعیتش را عوض کرده (None یعنی سیستم)
         # تنظیم خودکار قیمت از روی سرویس
         if not self.total_price and hasattr(self, 'service'):
             self.total_price = self.service.price
         
-        # اطمینان از اینکه customer نقش customer داشته باشد
-        if self.customer.role != 'customer':
-            self.customer.role = 'customer'
-            self.customer.save()
+        from . import events
+        from .search import index_appointments
+        
+        update_fields = kwargs.get('update_fields')
+        is_new = self._state.adding
+        previous_status = getattr(self, '_loaded_status', None)
+        status_changed = (previous_status is not None and previous_status != self.status
+                          and (update_fields is None or 'status' in update_fields))
+        previous_slot = getattr(self, '_loaded_slot', None)
+        slot_changed = (not is_new and previous_slot is not None and previous_slot != self._slot()
+                        and (update_fields is None or SLOT_FIELDS.intersection(update_fields)))
+        # نوبتی که از پایگاه‌داده خوانده نشده است همیشه دوباره ایندکس می‌شود
+        previous_search_keys = getattr(self, '_loaded_search_keys', None)
+        search_changed = (is_new or previous_search_keys is None or (
+            previous_search_keys != self._search_keys()
+            and (update_fields is None or SEARCH_RELATED_FIELDS.intersection(update_fields))
+        ))
         
-        super().save(*args, **kwargs)
+        # نوبت، تاریخچه و رویداد outbox با هم commit می‌شوند
+        with transaction.atomic():
+            # اطمینان از اینکه customer نقش customer داشته باشد (UPDATE در جا، بدون save کاربر)
+            if self.customer.role != 'customer':
+                type(self.customer).objects.filter(pk=self.customer_id).exclude(role='customer').update(role='customer')
+                self.customer.role = 'customer'
+            
+            super().save(*args, **kwargs)
+            bump_appointments_version(self.salon_id)
+            if is_new:
+                AppointmentStatusHistory.record([(self.pk, self.salon_id)], None, self.status, actor=actor)
+                events.publish_created([self])
+            elif status_changed:
+                AppointmentStatusHistory.record([(self.pk, self.salon_id)], previous_status, self.status, actor=actor)
+                events.publish_status_changes(
+                    [(self.pk, self.salon_id)], previous_status, self.status, actor_id=getattr(actor, 'pk', actor)
+                )
+            else:
+                events.publish_updated(self, update_fields)
+            if slot_changed:
+                # نوبت قبلی آزاد شد (لیست انتظار)
+                events.publish_rescheduled(self, previous_slot)
+            if search_changed:
+                index_appointments([self.pk])
+        self._loaded_status = self.status
+        self._loaded_slot = self._slot()
+        self._loaded_search_keys = self._search_keys()
+    
+    def _slot(self):
+        return (self.staff_id, self.appointment_date, self.appointment_time)
+    
+    def _search_keys(self):
+        return tuple(getattr(self, field) for field in SEARCH_KEY_FIELDS)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # وضعیت، زمان و کلیدهای جستجوی لحظه خواندن برای تاریخچه، رویداد جابه‌جایی و ایندکس در save
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        if {'staff_id', 'appointment_date', 'appointment_time'}.issubset(field_names):
+            instance._loaded_slot = instance._slot()
+        if set(SEARCH_KEY_FIELDS).issubset(field_names):
+            instance._loaded_search_keys = instance._search_keys()
+        return instance
+    
+    def delete(self, *args, **kwargs):
+        salon_id = self.salon_id
+        result = super().delete(*args, **kwargs)
+        bump_appointments_version(salon_id)
+        return result
     
     def __str__(self):
         return f"{self.customer.get_full_name()} - {self.service.name} - {self.get_persian_date()}"
@@ -102,14 +272,8 @@ class Appointment(models.Model):
     def get_persian_date(self):
         """تبدیل تاریخ به شمسی"""
         try:
-            gregorian_date = self.appointment_date
-            persian_date = jdatetime.date.fromgregorian(
-                year=gregorian_date.year,
-                month=gregorian_date.month,
-                day=gregorian_date.day
-            )
-            return persian_date.strftime('%Y/%m/%d')
-        except:
+            return format_date(self.appointment_date)
+        except (AttributeError, TypeError):
             return str(self.appointment_date)
     
     def get_status_display_fa(self):
@@ -123,14 +287,89 @@ class Appointment(models.Model):
     
     def is_upcoming(self):
         """آیا نوبت در آینده است؟"""
-        return self.get_appointment_datetime() > timezone.now()
+        return timezone.make_aware(self.get_appointment_datetime()) > timezone.now()
     
     def can_be_cancelled(self):
         """آیا قابل لغو است؟"""
         if self.status in ['completed', 'cancelled', 'no_show']:
             return False
         # حداقل 2 ساعت قبل از نوبت قابل لغو است
-        return self.get_appointment_datetime() > timezone.now() + timedelta(hours=2)
+        return timezone.make_aware(self.get_appointment_datetime()) > timezone.now() + timedelta(hours=2)
+
+
+# کدهای کوچک ثابت تاریخچه؛ ترتیب STATUS_CHOICES نباید روی داده‌های ذخیره شده اثر بگذارد
+STATUS_CODES = {
+    'pending': 1,
+    'confirmed': 2,
+    'in_progress': 3,
+    'completed': 4,
+    'cancelled': 5,
+    'no_show': 6,
+}
+STATUS_CODE_CHOICES = [(STATUS_CODES[status], label) for status, label in Appointment.STATUS_CHOICES]
+
+
+class AppointmentStatusHistory(models.Model):
+    """تاریخچه فقط-افزودنی تغییر وضعیت نوبت‌ها"""
+    
+    appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='status_history')
+    salon = models.ForeignKey('salons.Salon', on_delete=models.CASCADE, related_name='+')
+    from_status = models.PositiveSmallIntegerField(choices=STATUS_CODE_CHOICES, null=True, blank=True, verbose_name='از وضعیت')
+    to_status = models.PositiveSmallIntegerField(choices=STATUS_CODE_CHOICES, verbose_name='به وضعیت')
+    actor = models.ForeignKey(
+        'accounts.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        verbose_name='انجام دهنده'
+    )
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name='زمان تغییر')
+    
+    class Meta:
+        ordering = ['changed_at', 'id']
+        indexes = [
+            models.Index(fields=['salon', 'changed_at'], name='status_history_salon_idx'),
+            models.Index(fields=['salon', 'to_status', 'changed_at'], name='status_history_status_idx'),
+        ]
+        verbose_name = 'تاریخچه وضعیت نوبت'
+        verbose_name_plural = 'تاریخچه وضعیت نوبت‌ها'
+    
+    @classmethod
+    def record(cls, rows, from_status, to_status, actor=None, changed_at=None):
+        """ثبت دسته‌ای یک تغییر وضعیت برای rows = [(appointment_id, salon_id), ...]"""
+        changed_at = changed_at or timezone.now()
+        from_code = STATUS_CODES.get(from_status)
+        to_code = STATUS_CODES[to_status]
+        actor_id = getattr(actor, 'pk', actor)
+        cls.objects.bulk_create([
+            cls(
+                appointment_id=appointment_id,
+                salon_id=salon_id,
+                from_status=from_code,
+                to_status=to_code,
+                actor_id=actor_id,
+                changed_at=changed_at,
+            )
+            for appointment_id, salon_id in rows
+        ], batch_size=500)
+    
+    def __str__(self):
+        return f"{self.appointment_id}: {self.get_from_status_display() or '-'} → {self.get_to_status_display()}"
+
+
+class AppointmentSearchToken(models.Model):
+    """توکن‌های نرمال‌شده جستجوی نوبت (مشتری، تلفن، سالن، کارمند، خدمت)"""
+    appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='search_tokens')
+    salon = models.ForeignKey('salons.Salon', on_delete=models.CASCADE, related_name='+')
+    token = models.CharField(max_length=64)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['token'], name='appointment_token_idx'),
+            models.Index(fields=['salon', 'token'], name='appointment_salon_token_idx'),
+        ]
+        verbose_name = 'توکن جستجوی نوبت'
+        verbose_name_plural = 'توکن‌های جستجوی نوبت'
+    
+    def __str__(self):
+        return self.token
 
 
 class TimeSlot(models.Model):
@@ -163,4 +402,60 @@ class TimeSlot(models.Model):
         """محاسبه مدت زمان بازه به دقیقه"""
         start_dt = datetime.combine(self.date, self.start_time)
         end_dt = datetime.combine(self.date, self.end_time)
-        return int((end_dt - start_dt).total_seconds() / 60)
\ No newline at end of file
+        return int((end_dt - start_dt).total_seconds() / 60)
+
+class WaitlistEntry(models.Model):
+    """درخواست مشتری برای خبر شدن از آزاد شدن نوبت (appointments.waitlist)"""
+    STATUS_CHOICES = [
+        ('waiting', 'در انتظار'),
+        ('offered', 'نگه داشته شده'),
+        ('booked', 'رزرو شده'),
+        ('expired', 'منقضی'),
+        ('cancelled', 'لغو شده'),
+    ]
+    
+    salon = models.ForeignKey('salons.Salon', on_delete=models.CASCADE, related_name='waitlist_entries')
+    service = models.ForeignKey('services.Service', on_delete=models.CASCADE, related_name='waitlist_entries')
+    staff = models.ForeignKey(
+        'salons.Staff', on_delete=models.CASCADE, null=True, blank=True, related_name='waitlist_entries',
+        help_text='خالی: هر کارمندی', verbose_name='کارمند'
+    )
+    customer = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='waitlist_entries')
+    
+    date_from = models.DateField(verbose_name='از تاریخ')
+    date_to = models.DateField(verbose_name='تا تاریخ')
+    time_from = models.TimeField(verbose_name='از ساعت')
+    time_to = models.TimeField(verbose_name='تا ساعت')
+    priority = models.SmallIntegerField(default=0, verbose_name='اولویت')
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='waiting', verbose_name='وضعیت')
+    # نوبت نگه داشته شده برای این مشتری تا hold_expires_at
+    offered_staff = models.ForeignKey(
+        'salons.Staff', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        verbose_name='کارمند نوبت پیشنهادی'
+    )
+    offered_date = models.DateField(null=True, blank=True, verbose_name='تاریخ نوبت پیشنهادی')
+    offered_time = models.TimeField(null=True, blank=True, verbose_name='ساعت نوبت پیشنهادی')
+    hold_expires_at = models.DateTimeField(null=True, blank=True, verbose_name='انقضای نگه‌داری')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-priority', 'created_at']
+        indexes = [
+            # matcher: خدمت و وضعیت برابر، سپس بازه date_from
+            models.Index(fields=['service', 'status', 'date_from'], name='waitlist_match_idx'),
+            # بررسی نوبت‌های نگه داشته شده در رزرو و ساعات خالی
+            models.Index(fields=['offered_staff', 'offered_date'], name='waitlist_hold_idx'),
+        ]
+        verbose_name = 'لیست انتظار'
+        verbose_name_plural = 'لیست انتظار'
+    
+    def clean(self):
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise ValidationError('تاریخ شروع باید قبل از تاریخ پایان باشد')
+        if self.time_from and self.time_to and self.time_from >= self.time_to:
+            raise ValidationError('ساعت شروع باید قبل از ساعت پایان باشد')
+    
+    def __str__(self):
+        return f"{self.customer} - {self.service} ({self.get_status_display()})"
@@ -0,0 +1,40 @@
+"""handlerهای رویدادهای outbox نوبت‌ها: لیست انتظار"""
+
+from django.utils import timezone
+
+from core.outbox import handler
+from .events import CREATED, RESCHEDULED, STATUS_CHANGED
+from .models import Appointment
+from .waitlist import mark_booked, offer_freed_slots, parse_slot
+
+
+@handler(STATUS_CHANGED)
+def offer_cancelled_slots(events):
+    """پیشنهاد نوبت‌های لغو شده به لیست انتظار"""
+    cancelled_ids = [event.object_id for event in events if event.payload.get('to_status') == 'cancelled']
+    if cancelled_ids:
+        offer_freed_slots(Appointment.objects.filter(id__in=cancelled_ids).order_by('id').values_list(
+            'service_id', 'staff_id', 'appointment_date', 'appointment_time'
+        ))
+
+
+@handler(RESCHEDULED)
+def offer_rescheduled_slots(events):
+    """پیشنهاد زمان قبلی نوبت‌های جابه‌جا شده به لیست انتظار"""
+    offer_freed_slots(
+        (event.payload['service_id'], event.payload['previous_staff_id'],
+         *parse_slot(event.payload['previous_date'], event.payload['previous_time']))
+        for event in events
+    )
+
+
+@handler(CREATED)
+def complete_waitlist_holds(events):
+    """نگه‌داری‌هایی که مشتری رزروشان کرده است"""
+    today = timezone.localdate().isoformat()
+    mark_booked(
+        (event.payload['customer_id'], event.payload['staff_id'],
+         *parse_slot(event.payload['date'], event.payload['time']))
+        for event in events
+        if event.payload['date'] >= today
+    )
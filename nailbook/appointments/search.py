@@ -0,0 +1,90 @@
+"""
+جدول جستجوی نوبت‌ها
+
+برای هر نوبت توکن‌های نرمال‌شده نام و تلفن مشتری، نام سالن، نام کارمند و
+نام خدمت در AppointmentSearchToken نگه‌داری می‌شود. جستجو به جای icontains
+روی چند جدول join شده، برای هر کلمه یک جستجوی پیشوندی روی ستون ایندکس‌دار
+token انجام می‌دهد. توکن‌ها هنگام ذخیره نوبت و هنگام تغییر واقعی نام یا
+تلفن مشتری، سالن، کارمند یا خدمت (signals.py) دوباره ساخته می‌شوند؛ اگر مدل
+مرتبط بیش از INLINE_REINDEX_LIMIT نوبت داشته باشد، کار در صف (core.tasks)
+انجام می‌شود تا درخواست منتظر بازسازی کل تاریخچه نماند.
+"""
+
+from django.db.models import Q
+
+from core.persian import tokenize
+from core.tasks import enqueue
+from .models import Appointment, AppointmentSearchToken
+
+SEARCH_FIELDS = (
+    'id', 'salon_id', 'customer__username', 'customer__first_name', 'customer__last_name',
+    'customer__phone', 'salon__name', 'staff__user__first_name', 'staff__user__last_name',
+    'service__name',
+)
+INDEX_BATCH_SIZE = 1000
+INLINE_REINDEX_LIMIT = 200
+
+# تغییر این فیلدها در مدل‌های مرتبط توکن‌های نوبت‌ها را عوض می‌کند
+RELATED_SEARCH_FIELDS = {
+    'accounts.User': {'username', 'first_name', 'last_name', 'phone'},
+    'salons.Salon': {'name'},
+    'salons.Staff': {'user', 'user_id'},
+    'services.Service': {'name'},
+}
+
+# نوبت‌های وابسته به هر مدل مرتبط
+RELATED_APPOINTMENTS = {
+    'accounts.User': lambda pk: Q(customer_id=pk) | Q(staff__user_id=pk),
+    'salons.Salon': lambda pk: Q(salon_id=pk),
+    'salons.Staff': lambda pk: Q(staff_id=pk),
+    'services.Service': lambda pk: Q(service_id=pk),
+}
+
+
+def index_appointments(appointment_ids):
+    """ساخت دوباره توکن‌های جستجوی نوبت‌های داده شده"""
+    appointment_ids = list(appointment_ids)
+    for start in range(0, len(appointment_ids), INDEX_BATCH_SIZE):
+        batch = appointment_ids[start:start + INDEX_BATCH_SIZE]
+        tokens = []
+        for appointment_id, salon_id, *values in Appointment.objects.filter(
+            id__in=batch
+        ).order_by().values_list(*SEARCH_FIELDS):
+            tokens.extend(
+                AppointmentSearchToken(appointment_id=appointment_id, salon_id=salon_id, token=token)
+                for token in tokenize(*values)
+            )
+        AppointmentSearchToken.objects.filter(appointment_id__in=batch).delete()
+        AppointmentSearchToken.objects.bulk_create(tokens, batch_size=INDEX_BATCH_SIZE)
+
+
+def index_queryset(queryset):
+    """ساخت دوباره توکن‌های همه نوبت‌های یک QuerySet"""
+    index_appointments(queryset.order_by().values_list('id', flat=True).iterator())
+
+
+def related_appointments(label, pk):
+    """نوبت‌هایی که توکن‌هایشان به نمونه pk از مدل label وابسته است"""
+    return Appointment.objects.filter(RELATED_APPOINTMENTS[label](pk))
+
+
+def reindex_related(label, pk):
+    """بازسازی توکن‌های نوبت‌های یک مدل مرتبط؛ تاریخچه‌های بزرگ در صف کارها"""
+    ids = list(related_appointments(label, pk).order_by().values_list('id', flat=True)[:INLINE_REINDEX_LIMIT + 1])
+    if len(ids) > INLINE_REINDEX_LIMIT:
+        enqueue('appointments.reindex_related', {'label': label, 'pk': pk})
+    else:
+        index_appointments(ids)
+
+
+def search_appointments(queryset, query, salon_id=None):
+    """نوبت‌هایی از queryset که برای هر کلمه query توکنی با آن پیشوند دارند"""
+    for term in tokenize(query):
+        # بازه [term, term + U+FFFF) از ایندکس token استفاده می‌کند؛ startswith برای دقت
+        matches = AppointmentSearchToken.objects.filter(
+            token__gte=term, token__lt=term + '\uffff', token__startswith=term
+        )
+        if salon_id is not None:
+            matches = matches.filter(salon_id=salon_id)
+        queryset = queryset.filter(id__in=matches.values('appointment_id'))
+    return queryset
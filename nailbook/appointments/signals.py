@@ -0,0 +1,68 @@
+"""سیگنال‌های نوبت‌ها و بازسازی توکن‌های جستجو بعد از تغییر مدل‌های مرتبط"""
+
+from django.db.models.signals import post_init, post_save
+from django.dispatch import Signal, receiver
+
+from accounts.models import User
+from salons.models import Salon, Staff
+from services.models import Service
+from .events import publish_status_changes
+from .models import Appointment, AppointmentStatusHistory
+from .search import RELATED_SEARCH_FIELDS, reindex_related
+
+# یک بار برای هر گروه from_status → to_status در transitions.bulk_transition
+# آرگومان‌ها: from_status, to_status, appointment_ids, salon_ids, rows=[(appointment_id, salon_id)], actor
+appointment_status_changed = Signal()
+
+
+def _search_values(instance, names):
+    """مقدار فیلدهای جستجو که در نمونه بارگذاری شده‌اند (فیلدهای defer شده خوانده نمی‌شوند)"""
+    values = {}
+    for name in names:
+        attname = instance._meta.get_field(name).attname
+        if attname in instance.__dict__:
+            values[attname] = instance.__dict__[attname]
+    return values
+
+
+def remember_search_values(sender, instance, **kwargs):
+    """مقدار فیلدهای جستجو هنگام ساخت یا خواندن از پایگاه‌داده، مثل _loaded_status نوبت"""
+    instance._loaded_search_values = _search_values(instance, RELATED_SEARCH_FIELDS[sender._meta.label])
+
+
+def _search_fields_changed(sender, instance, created, update_fields):
+    """آیا این ذخیره نام یا تلفنی را که در توکن‌های نوبت‌ها هست واقعاً عوض کرده است؟"""
+    names = RELATED_SEARCH_FIELDS[sender._meta.label]
+    if update_fields is not None:
+        names = names & set(update_fields)
+    loaded = getattr(instance, '_loaded_search_values', {})
+    current = _search_values(instance, names)
+    changed = not created and any(
+        attname not in loaded or loaded[attname] != value for attname, value in current.items()
+    )
+    loaded.update(current)
+    instance._loaded_search_values = loaded
+    return changed
+
+
+def reindex_related_appointments(sender, instance, created, update_fields=None, **kwargs):
+    """به‌روزرسانی توکن‌های نوبت‌های مشتری، کارمند، سالن یا خدمت بعد از تغییر نام یا تلفن"""
+    if _search_fields_changed(sender, instance, created, update_fields):
+        reindex_related(sender._meta.label, instance.pk)
+
+
+for model in (User, Salon, Staff, Service):
+    post_init.connect(remember_search_values, sender=model, dispatch_uid=f'search_values_{model._meta.label}')
+    post_save.connect(reindex_related_appointments, sender=model, dispatch_uid=f'search_reindex_{model._meta.label}')
+
+
+@receiver(appointment_status_changed)
+def record_status_history(sender, from_status, to_status, rows, actor=None, **kwargs):
+    """ثبت دسته‌ای تاریخچه برای هر گروه تغییر وضعیت"""
+    AppointmentStatusHistory.record(rows, from_status, to_status, actor=actor)
+
+
+@receiver(appointment_status_changed)
+def publish_status_events(sender, from_status, to_status, rows, actor=None, **kwargs):
+    """رویدادهای outbox در همان تراکنش bulk_transition"""
+    publish_status_changes(rows, from_status, to_status, actor_id=getattr(actor, 'pk', None))
@@ -0,0 +1,84 @@
+"""
+ساخت و ویرایش گروهی بازه‌های زمانی (TimeSlot)
+
+generate_time_slots برای کارمندان، بازه تاریخ و ساعات کاری انتخاب شده همه
+بازه‌ها را می‌سازد و با bulk_create(ignore_conflicts=True) در دسته‌های بزرگ
+ذخیره می‌کند؛ پس اجرای دوباره برای همان بازه امن است و فقط بازه‌های جدید
+اضافه می‌شوند. set_slots_availability در دسترس بودن بازه‌ها (مثلاً مرخصی
+یک کارمند) را با یک UPDATE تغییر می‌دهد.
+"""
+
+from datetime import datetime, timedelta
+from itertools import islice
+
+from .models import TimeSlot
+
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+SLOT_BATCH_SIZE = 2000
+MAX_RANGE_DAYS = 366
+
+
+def day_slot_times(start_time, end_time, slot_minutes):
+    """(شروع، پایان) بازه‌های کامل یک روز بین start_time و end_time"""
+    step = timedelta(minutes=slot_minutes)
+    day = datetime.min
+    current = datetime.combine(day, start_time)
+    end = datetime.combine(day, end_time)
+    times = []
+    while current + step <= end:
+        times.append((current.time(), (current + step).time()))
+        current += step
+    return times
+
+
+def _iter_slots(staff_members, start_date, end_date, start_time, end_time, slot_minutes, weekdays):
+    day_count = (end_date - start_date).days + 1
+    for staff in staff_members:
+        salon = staff.salon
+        times = day_slot_times(start_time or salon.opening_time, end_time or salon.closing_time, slot_minutes)
+        # بدون انتخاب روزهای هفته، روزهای تعطیل سالن رد می‌شوند
+        days = weekdays if weekdays is not None else (
+            set(WEEKDAY_NAMES) - set(salon.get_closed_days_list())
+        )
+        for offset in range(day_count):
+            date = start_date + timedelta(days=offset)
+            if WEEKDAY_NAMES[date.weekday()] not in days:
+                continue
+            for slot_start, slot_end in times:
+                yield TimeSlot(
+                    salon_id=salon.id,
+                    staff_id=staff.id,
+                    date=date,
+                    start_time=slot_start,
+                    end_time=slot_end,
+                )
+
+
+def generate_time_slots(staff_members, start_date, end_date, start_time=None, end_time=None,
+                        slot_minutes=30, weekdays=None):
+    """ساخت بازه‌های زمانی؛ خروجی تعداد بازه‌های تازه ساخته شده"""
+    staff_members = list(staff_members)
+    existing = TimeSlot.objects.filter(
+        staff__in=staff_members, date__gte=start_date, date__lte=end_date
+    ).count()
+
+    slots = _iter_slots(staff_members, start_date, end_date, start_time, end_time, slot_minutes, weekdays)
+    while True:
+        batch = list(islice(slots, SLOT_BATCH_SIZE))
+        if not batch:
+            break
+        TimeSlot.objects.bulk_create(batch, ignore_conflicts=True)
+
+    return TimeSlot.objects.filter(
+        staff__in=staff_members, date__gte=start_date, date__lte=end_date
+    ).count() - existing
+
+
+def set_slots_availability(staff_members, start_date, end_date, is_available, start_time=None, end_time=None):
+    """تغییر در دسترس بودن بازه‌های کارمندان در بازه تاریخ (و اختیاری ساعت)"""
+    slots = TimeSlot.objects.filter(staff__in=staff_members, date__gte=start_date, date__lte=end_date)
+    if start_time:
+        slots = slots.filter(start_time__gte=start_time)
+    if end_time:
+        slots = slots.filter(end_time__lte=end_time)
+    return slots.exclude(is_available=is_available).update(is_available=is_available)
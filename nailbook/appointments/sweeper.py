@@ -0,0 +1,76 @@
+"""
+بستن خودکار نوبت‌های گذشته
+
+کارمندان وضعیت نوبت‌ها را کمتر دستی به‌روز می‌کنند، پس نوبت‌های گذشته در
+وضعیت در انتظار یا تایید شده می‌مانند و گزارش‌ها را خراب می‌کنند. sweeper
+نوبت‌هایی را که stale_after_hours ساعت از زمانشان گذشته طبق
+stale_appointment_policy هر سالن به «انجام شده» یا «عدم حضور» می‌برد.
+
+سالن‌های با سیاست و مهلت یکسان با هم پردازش می‌شوند. برای هر وضعیت مبدأ
+شناسه‌ها از ایندکس (salon، status، appointment_date) در دسته‌های
+SWEEP_BATCH_SIZE تایی خوانده و با bulk_transition تغییر می‌کنند؛ پس برای هر
+نوبت یک ردیف تاریخچه (بدون actor، یعنی سیستم) و رویداد outbox ثبت می‌شود.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from salons.models import Salon
+from .models import Appointment
+from .transitions import bulk_transition
+
+# سیاست سالن → {وضعیت مبدأ: وضعیت مقصد}
+STALE_TRANSITIONS = {
+    'completed': {'pending': 'completed', 'confirmed': 'completed', 'in_progress': 'completed'},
+    'no_show': {'pending': 'no_show', 'confirmed': 'no_show', 'in_progress': 'completed'},
+}
+
+# تغییرات مجاز sweeper؛ pending → completed/no_show فقط برای نوبت‌های گذشته و فقط از اینجا مجاز است
+SWEEP_TRANSITIONS = defaultdict(set)
+for _rules in STALE_TRANSITIONS.values():
+    for _from_status, _to_status in _rules.items():
+        SWEEP_TRANSITIONS[_from_status].add(_to_status)
+
+
+def stale_window(cutoff):
+    """نوبت‌هایی که زمان شروعشان تا cutoff (ساعت محلی بدون منطقه زمانی) گذشته است"""
+    return (
+        Q(appointment_date__lt=cutoff.date())
+        | Q(appointment_date=cutoff.date(), appointment_time__lte=cutoff.time())
+    )
+
+
+def sweep_stale_appointments(now=None, batch_size=None, dry_run=False):
+    """بستن نوبت‌های گذشته همه سالن‌ها؛ خروجی تعداد تغییر برای هر (از، به)"""
+    now = timezone.localtime(now).replace(tzinfo=None)
+    batch_size = batch_size or settings.SWEEP_BATCH_SIZE
+
+    groups = defaultdict(list)
+    for salon_id, policy, hours in Salon.objects.exclude(stale_appointment_policy='off').values_list(
+        'id', 'stale_appointment_policy', 'stale_after_hours'
+    ):
+        groups[policy, hours].append(salon_id)
+
+    counts = Counter()
+    for (policy, hours), salon_ids in groups.items():
+        window = stale_window(now - timedelta(hours=hours))
+        for from_status, to_status in STALE_TRANSITIONS[policy].items():
+            stale = Appointment.objects.filter(window, salon_id__in=salon_ids, status=from_status).order_by()
+            if dry_run:
+                counts[from_status, to_status] += stale.count()
+                continue
+            while True:
+                ids = list(stale.values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                result = bulk_transition(
+                    Appointment.objects.filter(id__in=ids), to_status, transitions=SWEEP_TRANSITIONS
+                )
+                counts[from_status, to_status] += result['updated']
+                if not result['updated']:
+                    break
+    return dict(counts)
@@ -0,0 +1,17 @@
+"""کارهای پس‌زمینه نوبت‌ها"""
+
+from core.tasks import task
+from .search import index_queryset, related_appointments
+from .waitlist import expire_hold
+
+
+@task('appointments.expire_waitlist_hold')
+def expire_waitlist_hold(entry_id):
+    """پایان نگه‌داری بی‌پاسخ لیست انتظار و پیشنهاد به نفر بعدی"""
+    expire_hold(entry_id)
+
+
+@task('appointments.reindex_related')
+def reindex_related_appointments(label, pk):
+    """بازسازی توکن‌های جستجوی همه نوبت‌های یک مشتری، کارمند، سالن یا خدمت"""
+    index_queryset(related_appointments(label, pk))
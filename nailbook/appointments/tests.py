@@ -1,3 +1,557 @@
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from salons.models import Salon, Staff
+from core.outbox import relay
+from core.models import Task
+from core.tasks import run_tasks
+from core.testing import SalonTestData, create_salon, create_service, create_staff, create_user
+from .models import (
+    STATUS_CODES, Appointment, AppointmentSearchToken, AppointmentStatusHistory, TimeSlot, WaitlistEntry,
+)
+from . import ics
+from .cache import get_appointments_version
+from .search import search_appointments
+from .signals import appointment_status_changed
+from .slots import generate_time_slots, set_slots_availability
+from .sweeper import sweep_stale_appointments
+from .transitions import bulk_transition, transition_appointment
+from .waitlist import expire_hold, find_matches, held_times
+
+
+class FragmentCacheVersionTests(SalonTestData, TestCase):
+    """هر نوشتن روی نوبت‌ها نسخه کش سالن را عوض می‌کند"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_salon = create_salon(cls.owner, name='سالن دیگر')
+
+    def new_appointment(self, hour=10):
+        return Appointment(
+            salon=self.salon, customer=self.customer, staff=self.staff, service=self.service,
+            appointment_date=timezone.localdate(), appointment_time=time(hour),
+            total_price=self.service.price,
+        )
+
+    def assert_bumps(self, write):
+        before = get_appointments_version(self.salon.id)
+        other_before = get_appointments_version(self.other_salon.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        self.assertGreater(get_appointments_version(self.salon.id), before)
+        self.assertEqual(get_appointments_version(self.other_salon.id), other_before)
+
+    def test_every_write_path_bumps_the_salon_version(self):
+        appointment = self.new_appointment()
+        self.assert_bumps(appointment.save)
+        self.assert_bumps(lambda: Appointment.objects.filter(pk=appointment.pk).update(status='confirmed'))
+        self.assert_bumps(lambda: Appointment.objects.bulk_create([self.new_appointment(11)]))
+        self.assert_bumps(appointment.delete)
+        self.assert_bumps(lambda: Appointment.objects.filter(salon=self.salon).delete())
+
+    def test_cached_dashboard_fragment_is_invalidated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment = self.new_appointment()
+            appointment.save()
+        self.client.force_login(self.staff_user)
+        url = reverse('salons:staff_dashboard')
+        self.assertContains(self.client.get(url), 'status-pending')
+
+        # بدون افزایش نسخه (نوشتن مستقیم SQL) همان قطعه کش شده برمی‌گردد
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE appointments_appointment SET status = 'cancelled'")
+        self.assertContains(self.client.get(url), 'status-pending')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Appointment.objects.filter(pk=appointment.pk).update(status='confirmed')
+        response = self.client.get(url)
+        self.assertContains(response, 'status-confirmed')
+        self.assertNotContains(response, 'status-pending')
+
+
+class CalendarDataTests(TestCase):
+    """داده‌های JSON تقویم: محدوده تاریخ، فیلتر کارمند و خطاها"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user('owner', 'salon_owner', '09120000001')
+        cls.salon = create_salon(cls.owner)
+        cls.staff = [create_staff(cls.salon, f'staff{i}', f'0912000001{i}') for i in range(2)]
+        service = create_service(cls.salon, duration=45)
+        customer = create_user('customer', 'customer', '09120000003')
+        cls.start = date(2026, 1, 1)
+        cls.appointments = [
+            Appointment.objects.create(
+                salon=cls.salon, customer=customer, staff=staff, service=service,
+                appointment_date=cls.start + timedelta(days=offset), appointment_time=time(10),
+            )
+            for staff, offset in [(cls.staff[0], 0), (cls.staff[1], 10), (cls.staff[0], 92), (cls.staff[0], 93)]
+        ]
+
+    def get(self, **params):
+        self.client.force_login(self.owner)
+        return self.client.get(reverse('appointments:calendar_data', args=[self.salon.id]), params)
+
+    def event_ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return sorted(event['id'] for event in response.json())
+
+    def test_range_is_clamped_to_max_days(self):
+        ids = [appointment.id for appointment in self.appointments]
+        response = self.get(start='2026-01-01T00:00:00+03:30', end='2026-12-31')
+        self.assertEqual(self.event_ids(response), ids[:3])
+        event = next(event for event in response.json() if event['id'] == ids[0])
+        self.assertEqual((event['start'], event['end']), ('2026-01-01T10:00:00', '2026-01-01T10:45:00'))
+
+    def test_staff_filter(self):
+        response = self.get(start='2026-01-01', end='2026-02-01', staff_id=self.staff[1].id)
+        self.assertEqual(self.event_ids(response), [self.appointments[1].id])
+
+    def test_bad_parameters_and_outsiders(self):
+        self.assertEqual(self.get(start='1404-13-40', end='2026-02-01').status_code, 400)
+        self.assertEqual(self.get(start='2026-01-01', end='2026-02-01', staff_id='x').status_code, 400)
+
+        outsider = create_user('outsider', 'customer', '09120000009')
+        self.client.force_login(outsider)
+        response = self.client.get(reverse('appointments:calendar_data', args=[self.salon.id]))
+        self.assertEqual(response.status_code, 403)
+
+
+class IcsFeedTests(SalonTestData, TestCase):
+    """فیدهای ICS: قالب RFC 5545، توکن‌های قابل ابطال و ETag"""
+
+    salon_fields = {'name': 'سالن ستاره'}
+    service_fields = {'name': 'ژل‌لاک', 'price': 300000, 'duration': 90}
+    customer_fields = {'first_name': 'سارا'}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.appointment = cls.create_appointment(notes='رنگ قرمز; با طرح, ساده\nتماس قبل از ' + 'آمدن ' * 20)
+
+    def staff_url(self, staff=None):
+        return reverse('appointments:staff_calendar_feed', args=[ics.staff_feed_token(staff or self.staff)])
+
+    def test_lines_are_escaped_and_folded(self):
+        self.assertEqual(ics._escape('a,b;c\\d\ne'), 'a\\,b\\;c\\\\d\\ne')
+        body = self.client.get(self.staff_url()).content.decode()
+        lines = body.split('\r\n')
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        # خط‌های ادامه با یک فاصله شروع می‌شوند و با حذف CRLF + فاصله خط اصلی برمی‌گردد
+        unfolded = body.replace('\r\n ', '')
+        self.assertIn('رنگ قرمز\\; با طرح\\, ساده\\nتماس', unfolded)
+        self.assertIn('DTEND:', unfolded)
+        start = next(line for line in unfolded.split('\r\n') if line.startswith('DTSTART:'))
+        end = next(line for line in unfolded.split('\r\n') if line.startswith('DTEND:'))
+        self.assertEqual(
+            datetime.strptime(end[6:], '%Y%m%dT%H%M%SZ') - datetime.strptime(start[8:], '%Y%m%dT%H%M%SZ'),
+            timedelta(minutes=90),
+        )
+
+    def test_bad_and_revoked_tokens_are_rejected(self):
+        token = ics.staff_feed_token(self.staff)
+        self.assertEqual(ics.read_feed_token(token, ics.STAFF_SALT), (self.staff.id, self.staff.calendar_feed_key))
+        self.assertIsNone(ics.read_feed_token(token, ics.SALON_SALT))
+        self.assertIsNone(ics.read_feed_token(token[:-1] + ('A' if token[-1] != 'A' else 'B'), ics.STAFF_SALT))
+        forged = ics.make_feed_token(self.staff.id, 'guessed', ics.STAFF_SALT)
+        self.assertEqual(self.client.get(reverse('appointments:staff_calendar_feed', args=[forged])).status_code, 404)
+
+        url = self.staff_url()
+        self.client.force_login(self.staff_user)
+        self.client.post(reverse('salons:staff_calendar_feed_reset', args=[self.staff.id]))
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(self.staff_url(Staff.objects.get(pk=self.staff.pk))).status_code, 200)
+
+    def test_salon_feed_reset_is_owner_only(self):
+        url = reverse('appointments:salon_calendar_feed', args=[ics.salon_feed_token(self.salon)])
+        self.client.force_login(self.staff_user)
+        self.client.post(reverse('salons:calendar_feed_reset', args=[self.salon.id]))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.client.force_login(self.owner)
+        self.client.post(reverse('salons:calendar_feed_reset', args=[self.salon.id]))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_etag_returns_304_until_an_appointment_changes(self):
+        url = self.staff_url()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.appointment.status = 'confirmed'
+        self.appointment.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class AppointmentSearchTests(SalonTestData, TestCase):
+    """جستجوی نوبت‌ها از روی جدول توکن‌ها"""
+
+    salon_fields = {'name': 'سالن ستاره'}
+    staff_fields = {'first_name': 'مریم', 'last_name': 'احمدی'}
+    service_fields = {'name': 'ژل‌لاک', 'price': 300000, 'duration': 60}
+    customer_fields = {'phone': '09123456789', 'first_name': 'علی', 'last_name': 'کریمی'}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.appointment = cls.create_appointment()
+
+    def search(self, query):
+        return list(search_appointments(Appointment.objects.all(), query))
+
+    def test_matches_normalized_persian_and_prefixes(self):
+        self.assertEqual(self.search('علي كريمي'), [self.appointment])  # ی و ک عربی
+        self.assertEqual(self.search('۰۹۱۲۳۴'), [self.appointment])  # ارقام فارسی و پیشوند تلفن
+        self.assertEqual(self.search('ژل لاک مریم'), [self.appointment])
+        self.assertEqual(self.search('ستاره'), [self.appointment])
+        self.assertEqual(self.search('علی رضایی'), [])
+
+    def test_tokens_follow_related_changes(self):
+        self.customer.last_name = 'رضایی'
+        self.customer.save()
+        self.service.name = 'کاشت ناخن'
+        self.service.save()
+
+        self.assertEqual(self.search('رضایی کاشت'), [self.appointment])
+        self.assertEqual(self.search('کریمی'), [])
+
+    def test_unchanged_saves_do_not_reindex(self):
+        AppointmentSearchToken.objects.all().delete()
+        Salon.objects.get(pk=self.salon.pk).save()
+        User.objects.get(pk=self.customer.pk).save()
+        self.assertFalse(AppointmentSearchToken.objects.exists())
+
+        salon = Salon.objects.get(pk=self.salon.pk)
+        salon.name = 'سالن رز'
+        salon.save()
+        self.assertEqual(self.search('رز'), [self.appointment])
+
+    def test_appointment_saves_reindex_only_when_related_ids_change(self):
+        appointment = Appointment.objects.get(pk=self.appointment.pk)
+        with mock.patch('appointments.search.index_appointments') as index:
+            appointment.status = 'confirmed'
+            appointment.notes = 'یادداشت'
+            appointment.save()
+            appointment.save(update_fields=['staff'])
+            self.assertFalse(index.called)
+
+            appointment.staff = create_staff(self.salon, 'staff2', '09120000004', first_name='نگار')
+            appointment.save()
+            index.assert_called_once_with([appointment.pk])
+
+    def test_large_histories_are_reindexed_in_the_task_queue(self):
+        with mock.patch('appointments.search.INLINE_REINDEX_LIMIT', 0):
+            self.service.name = 'کاشت ناخن'
+            self.service.save(update_fields=['name'])
+        self.assertEqual(self.search('کاشت'), [])
+        self.assertTrue(Task.objects.filter(name='appointments.reindex_related').exists())
+
+        run_tasks()
+        self.assertEqual(self.search('کاشت'), [self.appointment])
+
+    def test_staff_search_view(self):
+        self.client.force_login(self.staff_user)
+        response = self.client.get(reverse('appointments:search', args=[self.salon.id]), {'q': 'کریمی'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['appointments']), [self.appointment])
+
+
+class StatusTransitionTests(SalonTestData, TestCase):
+    """تغییر وضعیت گروهی و اعتبارسنجی انتقال‌ها"""
+
+    def test_bulk_transition_groups_and_rejects(self):
+        pending = [self.create_appointment(9 + i, status='pending') for i in range(3)]
+        cancelled = self.create_appointment(14, status='cancelled')
+        confirmed = self.create_appointment(15, status='confirmed')
+        events = []
+
+        def receiver(sender, **kwargs):
+            events.append((kwargs['from_status'], kwargs['to_status'], sorted(kwargs['appointment_ids'])))
+
+        appointment_status_changed.connect(receiver)
+        try:
+            # savepoint، خواندن وضعیت‌ها، salon_id برای کش، یک UPDATE، یک INSERT تاریخچه و یک INSERT
+            # outbox برای گروه pending، release
+            with self.assertNumQueries(7):
+                result = bulk_transition(Appointment.objects.all(), 'confirmed', actor=self.owner)
+        finally:
+            appointment_status_changed.disconnect(receiver)
+
+        self.assertEqual(result['updated'], 3)
+        self.assertEqual(result['unchanged'], 1)
+        self.assertEqual(result['rejected_ids'], [cancelled.id])
+        self.assertEqual(events, [('pending', 'confirmed', sorted(a.id for a in pending))])
+        confirmed.refresh_from_db()
+        self.assertEqual(confirmed.status, 'confirmed')
+
+        history = AppointmentStatusHistory.objects.filter(appointment=pending[0])
+        self.assertEqual(
+            list(history.values_list('from_status', 'to_status', 'actor')),
+            [(None, STATUS_CODES['pending'], None),
+             (STATUS_CODES['pending'], STATUS_CODES['confirmed'], self.owner.id)],
+        )
+
+    def test_save_records_status_change(self):
+        appointment = self.create_appointment(12, status='confirmed')
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        appointment.notes = 'بدون تغییر وضعیت'
+        appointment.save()
+        appointment.status = 'in_progress'
+        appointment.save()
+
+        self.assertEqual(
+            list(appointment.status_history.values_list('from_status', 'to_status')),
+            [(None, STATUS_CODES['confirmed']),
+             (STATUS_CODES['confirmed'], STATUS_CODES['in_progress'])],
+        )
+
+    def test_reschedule_and_admin_edit_record_actor(self):
+        appointment = self.create_appointment(12, status='confirmed')
+        self.client.force_login(self.customer)
+        new_date = appointment.appointment_date + timedelta(days=1)
+        self.client.post(reverse('appointments:reschedule', args=[appointment.id]), {
+            'appointment_date': new_date.isoformat(), 'appointment_time': '13:00',
+        })
+        appointment.refresh_from_db()
+        self.assertEqual((appointment.appointment_date, appointment.status), (new_date, 'pending'))
+        self.assertEqual(
+            list(appointment.status_history.values_list('from_status', 'to_status', 'actor')[1:]),
+            [(STATUS_CODES['confirmed'], STATUS_CODES['pending'], self.customer.id)],
+        )
+
+        admin_user = User.objects.create_superuser('admin', password='pass', phone='09120000000')
+        self.client.force_login(admin_user)
+        self.post_admin_change(appointment, 'confirmed')
+        self.assertEqual(
+            appointment.status_history.values_list('from_status', 'to_status', 'actor').last(),
+            (STATUS_CODES['pending'], STATUS_CODES['confirmed'], admin_user.id),
+        )
+
+    def post_admin_change(self, appointment, status):
+        return self.client.post(reverse('admin:appointments_appointment_change', args=[appointment.id]), {
+            'salon': self.salon.id, 'customer': self.customer.id, 'staff': self.staff.id,
+            'service': self.service.id, 'appointment_date': appointment.appointment_date.isoformat(),
+            'appointment_time': appointment.appointment_time.strftime('%H:%M'),
+            'status': status, 'total_price': self.service.price, 'payment_method': '', 'notes': '',
+            'status_history-TOTAL_FORMS': 0, 'status_history-INITIAL_FORMS': 0,
+        })
+
+    def test_reschedule_and_admin_form_follow_allowed_transitions(self):
+        appointment = self.create_appointment(12, status='confirmed')
+        self.client.force_login(self.owner)
+        # برگشت به انتظار فقط از مسیر تغییر زمان مجاز است
+        response = self.client.post(
+            reverse('appointments:update_status', args=[appointment.id]), {'status': 'pending'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        cancelled = self.create_appointment(14, status='cancelled')
+        self.client.force_login(User.objects.create_superuser('admin', password='pass', phone='09120000000'))
+        response = self.post_admin_change(cancelled, 'completed')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'تغییر وضعیت از «لغو شده» به «تکمیل شده» مجاز نیست')
+        cancelled.refresh_from_db()
+        self.assertEqual(cancelled.status, 'cancelled')
+        self.assertEqual(cancelled.status_history.count(), 1)
+
+    def test_update_status_view_rejects_invalid_transition(self):
+        appointment = self.create_appointment(10, status='cancelled')
+        self.client.force_login(self.owner)
+        response = self.client.post(
+            reverse('appointments:update_status', args=[appointment.id]), {'status': 'completed'}
+        )
+        self.assertEqual(response.status_code, 400)
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.status, 'cancelled')
+
+    def test_status_api(self):
+        appointment = self.create_appointment(11, status='pending')
+        self.client.force_login(self.owner)
+        response = self.client.post(
+            reverse('api:appointment_status'),
+            {'appointment_ids': [appointment.id, 999999], 'status': 'confirmed'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 1)
+        self.assertEqual(response.json()['not_found'], 1)
+
+
+class TimeSlotGenerationTests(TestCase):
+    """ساخت و ویرایش گروهی بازه‌های زمانی"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salon = create_salon(
+            create_user('owner', 'salon_owner', '09120000001'),
+            opening_time=time(9), closing_time=time(13), closed_days='friday',
+        )
+        cls.staff = [create_staff(cls.salon, f'staff{i}', f'0912000001{i}') for i in range(2)]
+        cls.start = date(2026, 1, 3)  # شنبه
+        cls.end = cls.start + timedelta(days=13)
+
+    def test_generate_skips_closed_days_and_is_idempotent(self):
+        created = generate_time_slots(self.staff, self.start, self.end, slot_minutes=30)
+        # 2 کارمند × 12 روز کاری (دو جمعه تعطیل) × 8 بازه نیم‌ساعته از 9 تا 13
+        self.assertEqual(created, 2 * 12 * 8)
+        self.assertFalse(TimeSlot.objects.filter(date__week_day=6).exists())
+        self.assertEqual(generate_time_slots(self.staff, self.start, self.end, slot_minutes=30), 0)
+
+    def test_availability_toggle_for_vacation(self):
+        generate_time_slots(self.staff, self.start, self.end, slot_minutes=60)
+        updated = set_slots_availability(
+            [self.staff[0]], self.start, self.start + timedelta(days=2), is_available=False
+        )
+        self.assertEqual(updated, 3 * 4)
+        self.assertEqual(TimeSlot.objects.filter(is_available=False).count(), 12)
+
+    def test_admin_generate_view(self):
+        admin_user = User.objects.create_superuser('admin', phone='09120000000')
+        self.client.force_login(admin_user)
+        response = self.client.post(reverse('admin:appointments_timeslot_generate'), {
+            'staff': [self.staff[0].id],
+            'start_date': self.start.isoformat(),
+            'end_date': self.start.isoformat(),
+            'start_time': '10:00',
+            'end_time': '12:00',
+            'slot_minutes': 30,
+        })
+        self.assertRedirects(response, reverse('admin:appointments_timeslot_changelist'))
+        self.assertEqual(TimeSlot.objects.count(), 4)
+
+
+class StaleSweeperTests(TestCase):
+    """بستن خودکار نوبت‌های گذشته طبق سیاست سالن"""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = create_user('owner', 'salon_owner', '09120000001')
+        cls.customer = create_user('customer', 'customer', '09120000003')
+        cls.salons = {}
+        for index, policy in enumerate(['completed', 'no_show', 'off']):
+            salon = create_salon(owner, name=policy, stale_appointment_policy=policy, stale_after_hours=12)
+            staff = create_staff(salon, f'staff{index}', f'0912100000{index}')
+            service = create_service(salon)
+            cls.salons[policy] = (salon, staff, service)
+        cls.now = timezone.make_aware(datetime(2026, 3, 10, 12, 0))
+
+    def create(self, policy, day, hour, status):
+        salon, staff, service = self.salons[policy]
+        return Appointment.objects.create(
+            salon=salon, customer=self.customer, staff=staff, service=service,
+            appointment_date=day, appointment_time=time(hour), total_price=service.price, status=status,
+        )
+
+    def test_sweeps_by_salon_policy_in_batches(self):
+        yesterday, today = date(2026, 3, 9), date(2026, 3, 10)
+        old = [self.create('completed', yesterday, 9 + i, 'confirmed') for i in range(3)]
+        old_pending = self.create('completed', yesterday, 15, 'pending')
+        recent = self.create('completed', today, 1, 'confirmed')  # هنوز 12 ساعت نگذشته
+        no_show = self.create('no_show', yesterday, 10, 'pending')
+        in_progress = self.create('no_show', yesterday, 11, 'in_progress')
+        untouched = self.create('off', yesterday, 10, 'pending')
+        upcoming = self.create('completed', today, 14, 'pending')
+
+        self.assertEqual(sweep_stale_appointments(self.now, dry_run=True)[('confirmed', 'completed')], 3)
+        counts = sweep_stale_appointments(self.now, batch_size=2)
+        self.assertEqual(counts[('confirmed', 'completed')], 3)
+        self.assertEqual(counts[('pending', 'completed')], 1)
+        self.assertEqual(counts[('pending', 'no_show')], 1)
+        self.assertEqual(counts[('in_progress', 'completed')], 1)
+        self.assertEqual(sum(counts.values()), 6)
+
+        statuses = dict(Appointment.objects.values_list('id', 'status'))
+        self.assertEqual({statuses[a.id] for a in old + [old_pending]}, {'completed'})
+        self.assertEqual(statuses[no_show.id], 'no_show')
+        self.assertEqual(statuses[in_progress.id], 'completed')
+        for appointment, status in [(recent, 'confirmed'), (untouched, 'pending'), (upcoming, 'pending')]:
+            self.assertEqual(statuses[appointment.id], status)
+
+        history = AppointmentStatusHistory.objects.filter(appointment=no_show).latest('changed_at')
+        self.assertEqual((history.from_status, history.to_status, history.actor), (
+            STATUS_CODES['pending'], STATUS_CODES['no_show'], None
+        ))
+        self.assertEqual(sum(sweep_stale_appointments(self.now).values()), 0)
+
+
+class WaitlistTests(TestCase):
+    """پیشنهاد نوبت‌های لغو یا جابه‌جا شده به لیست انتظار"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salon = create_salon(create_user('owner', 'salon_owner', '09120000001'))
+        cls.staff = [create_staff(cls.salon, f'staff{i}', f'0912000001{i}') for i in range(2)]
+        cls.service = create_service(cls.salon)
+        cls.customers = [create_user(f'customer{i}', 'customer', f'0912000002{i}') for i in range(4)]
+        cls.day = timezone.localdate() + timedelta(days=3)
+
+    def join(self, customer, staff=None, time_from=time(9), time_to=time(12), priority=0):
+        return WaitlistEntry.objects.create(
+            salon=self.salon, service=self.service, staff=staff, customer=customer,
+            date_from=self.day - timedelta(days=1), date_to=self.day + timedelta(days=1),
+            time_from=time_from, time_to=time_to, priority=priority,
+        )
+
+    def test_cancellation_holds_slot_for_first_match(self):
+        appointment = Appointment.objects.create(
+            salon=self.salon, customer=self.customers[0], staff=self.staff[0], service=self.service,
+            appointment_date=self.day, appointment_time=time(10), total_price=self.service.price,
+        )
+        first = self.join(self.customers[1])
+        self.join(self.customers[2], staff=self.staff[1])  # کارمند دیگر
+        self.join(self.customers[2], time_from=time(14), time_to=time(18))  # بازه ساعت دیگر
+        vip = self.join(self.customers[3], priority=1)
+        self.assertIn('waitlist_match_idx', find_matches(self.service.id, self.staff[0].id, self.day, time(10)).explain())
+
+        transition_appointment(appointment, 'cancelled')
+        relay()
+        vip.refresh_from_db()
+        self.assertEqual((vip.status, vip.offered_staff, vip.offered_time), ('offered', self.staff[0], time(10)))
+        self.assertEqual(held_times(self.staff[0].id, self.day, self.customers[1]), {time(10)})
+        self.assertEqual(held_times(self.staff[0].id, self.day, self.customers[3]), set())
+        expiry_task = Task.objects.get(name='appointments.expire_waitlist_hold')
+        self.assertGreater(expiry_task.run_after, timezone.now() + timedelta(minutes=20))
+
+        # مهلت VIP تمام شد؛ نوبت به نفر بعدی می‌رسد
+        next_entry = expire_hold(vip.id, now=vip.hold_expires_at)
+        self.assertEqual(next_entry, first)
+        vip.refresh_from_db()
+        self.assertEqual(vip.status, 'expired')
+
+        self.client.force_login(self.customers[1])
+        response = self.client.post(reverse('appointments:book', args=[self.salon.id]), {
+            'service_id': self.service.id,
+            'staff_id': self.staff[0].id,
+            'appointment_date': self.day.isoformat(),
+            'appointment_time': '10:00',
+        })
+        self.assertEqual(response.status_code, 302)
+        relay()
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'booked')
 
-# Create your tests here.
+    def test_reschedule_offers_previous_slot(self):
+        appointment = Appointment.objects.create(
+            salon=self.salon, customer=self.customers[0], staff=self.staff[1], service=self.service,
+            appointment_date=self.day, appointment_time=time(11), total_price=self.service.price,
+        )
+        entry = self.join(self.customers[1], staff=self.staff[1])
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        appointment.appointment_time = time(15)
+        appointment.save()
+        relay()
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.offered_time), ('offered', time(11)))
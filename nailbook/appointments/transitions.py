@@ -0,0 +1,111 @@
+"""
+تغییر وضعیت گروهی نوبت‌ها
+
+همه مسیرهای تغییر وضعیت (اکشن‌ها و فرم ویرایش پنل مدیریت، تغییر وضعیت از
+داشبورد، لغو، تغییر زمان و API) از bulk_transition استفاده می‌کنند. نوبت‌ها بر اساس وضعیت فعلی گروه
+می‌شوند، هر گروه مجاز با UPDATE های دسته‌ای تغییر می‌کند و برای هر گروه
+(from_status → to_status) فقط یک سیگنال appointment_status_changed با لیست
+شناسه‌ها فرستاده می‌شود؛ کارهای جانبی (تاریخچه، کش، گزارش‌ها) به این سیگنال
+وصل می‌شوند نه به save.
+"""
+
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Appointment
+from .signals import appointment_status_changed
+
+STATUS_LABELS = dict(Appointment.STATUS_CHOICES)
+
+ALLOWED_TRANSITIONS = {
+    'pending': {'confirmed', 'cancelled'},
+    'confirmed': {'in_progress', 'completed', 'cancelled', 'no_show'},
+    'in_progress': {'completed', 'cancelled'},
+    'completed': set(),
+    'cancelled': set(),
+    'no_show': set(),
+}
+
+# تغییر زمان نوبت تایید شده آن را دوباره به انتظار تایید سالن برمی‌گرداند
+RESCHEDULE_TRANSITIONS = {**ALLOWED_TRANSITIONS, 'confirmed': ALLOWED_TRANSITIONS['confirmed'] | {'pending'}}
+
+TRANSITION_BATCH_SIZE = 500
+
+
+def can_transition(from_status, to_status, transitions=ALLOWED_TRANSITIONS):
+    return to_status in transitions.get(from_status, ())
+
+
+def transition_error(from_status, to_status):
+    return (
+        f'تغییر وضعیت از «{STATUS_LABELS.get(from_status, from_status)}» '
+        f'به «{STATUS_LABELS.get(to_status, to_status)}» مجاز نیست'
+    )
+
+
+def bulk_transition(queryset, to_status, actor=None, transitions=ALLOWED_TRANSITIONS):
+    """
+    تغییر وضعیت همه نوبت‌های queryset به to_status
+
+    transitions جدول تغییرات مجاز است؛ فقط کارهای سیستمی (مثل sweeper) جدول دیگری می‌دهند.
+
+    خروجی: {'updated': ..., 'unchanged': ..., 'rejected': ..., 'rejected_ids': [...]}
+    """
+    if to_status not in STATUS_LABELS:
+        raise ValidationError('وضعیت نامعتبر')
+
+    result = {'updated': 0, 'unchanged': 0, 'rejected': 0, 'rejected_ids': []}
+
+    with transaction.atomic():
+        groups = defaultdict(list)
+        for appointment_id, salon_id, from_status in queryset.select_for_update().order_by().values_list(
+            'id', 'salon_id', 'status'
+        ):
+            groups[from_status].append((appointment_id, salon_id))
+
+        for from_status, rows in groups.items():
+            if from_status == to_status:
+                result['unchanged'] += len(rows)
+                continue
+            if not can_transition(from_status, to_status, transitions):
+                result['rejected'] += len(rows)
+                result['rejected_ids'].extend(appointment_id for appointment_id, _ in rows)
+                continue
+
+            appointment_ids = [appointment_id for appointment_id, _ in rows]
+            for start in range(0, len(appointment_ids), TRANSITION_BATCH_SIZE):
+                Appointment.objects.filter(
+                    id__in=appointment_ids[start:start + TRANSITION_BATCH_SIZE],
+                ).update(status=to_status)
+            result['updated'] += len(appointment_ids)
+
+            appointment_status_changed.send(
+                sender=Appointment,
+                from_status=from_status,
+                to_status=to_status,
+                appointment_ids=appointment_ids,
+                salon_ids={salon_id for _, salon_id in rows},
+                rows=rows,
+                actor=actor,
+            )
+
+    return result
+
+
+def transition_appointment(appointment, to_status, actor=None, transitions=ALLOWED_TRANSITIONS):
+    """تغییر وضعیت یک نوبت؛ در صورت غیرمجاز بودن ValidationError"""
+    if to_status != appointment.status and not can_transition(appointment.status, to_status, transitions):
+        raise ValidationError(transition_error(appointment.status, to_status))
+
+    result = bulk_transition(
+        Appointment.objects.filter(pk=appointment.pk), to_status, actor=actor, transitions=transitions
+    )
+    if result['rejected']:
+        # وضعیت در این فاصله توسط درخواست دیگری عوض شده است
+        appointment.refresh_from_db(fields=['status'])
+        raise ValidationError(transition_error(appointment.status, to_status))
+
+    appointment.status = to_status
+    return result
@@ -9,6 +9,7 @@ urlpatterns = [
     path('salons/', views.salon_list, name='salon_list'),
     path('book/<int:salon_id>/', views.appointment_book, name='book'),
     path('my-appointments/', views.my_appointments, name='my_appointments'),
+    path('waitlist/<int:salon_id>/', views.waitlist_join, name='waitlist_join'),
     
     # Appointment Management
     path('<int:appointment_id>/', views.appointment_detail, name='detail'),
@@ -20,6 +21,10 @@ urlpatterns = [
     path('update-status/<int:appointment_id>/', views.appointment_update_status, name='update_status'),
     path('calendar-data/<int:salon_id>/', views.appointment_calendar_data, name='calendar_data'),
     
+    # iCalendar feeds (tokenized, no login)
+    path('ics/staff/<str:token>.ics', views.staff_calendar_feed, name='staff_calendar_feed'),
+    path('ics/salon/<str:token>.ics', views.salon_calendar_feed, name='salon_calendar_feed'),
+    
     # Booking without login (for walk-in customers)
     path('quick-book/<int:salon_id>/', views.quick_book, name='quick_book'),
     path('booking-success/<int:appointment_id>/', views.booking_success, name='booking_success'),
@@ -27,5 +32,6 @@ urlpatterns = [
     # Admin/Staff URLs
     path('manage/<int:salon_id>/', views.appointment_manage, name='manage'),
     path('today/<int:salon_id>/', views.today_appointments, name='today'),
+    path('search/<int:salon_id>/', views.appointment_search, name='search'),
 ]
 
@@ -1,17 +1,50 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, Http404
+from django.utils.http import http_date, quote_etag
 from django.utils import timezone
-from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.views.decorators.http import require_http_methods
 from datetime import datetime, timedelta, time
-from .models import Appointment, TimeSlot
+from .models import Appointment, TimeSlot, WaitlistEntry
+from .cache import fragment_cache_context
+from . import ics
+from .search import search_appointments
+from .transitions import RESCHEDULE_TRANSITIONS, transition_appointment
+from .waitlist import held_times, is_held_for_other
+from .forms import WaitlistForm
 from salons.models import Salon, Staff
+from salons.search import search_salons
 from services.models import Service
 from accounts.models import User
+from core.http import json_response
 import json
 
+# رنگ وضعیت‌ها در تقویم
+CALENDAR_STATUS_COLORS = {
+    'pending': '#ffc107',
+    'confirmed': '#17a2b8',
+    'in_progress': '#007bff',
+    'completed': '#28a745',
+    'cancelled': '#dc3545',
+    'no_show': '#6c757d',
+}
+DEFAULT_STATUS_COLOR = '#6c757d'
+STATUS_LABELS = dict(Appointment.STATUS_CHOICES)
+
+# حداکثر تعداد نتایج جستجوی نوبت‌ها
+SEARCH_RESULTS_LIMIT = 50
+
+# حداکثر بازه قابل درخواست از تقویم (حدود سه ماه)
+CALENDAR_MAX_RANGE_DAYS = 93
+CALENDAR_FIELDS = (
+    'id', 'appointment_date', 'appointment_time', 'status', 'total_price',
+    'customer__first_name', 'customer__last_name', 'customer__phone', 'service__name',
+    'service__duration', 'staff__user__first_name', 'staff__user__last_name',
+)
+
 @login_required
 def customer_dashboard(request):
     """داشبورد مشتری"""
@@ -37,12 +70,10 @@ def salon_list(request):
     """لیست عمومی سالن‌ها"""
     salons = Salon.objects.filter(is_active=True).select_related('owner')
     
-    # جستجو
-    search = request.GET.get('search', '')
+    # جستجوی فازی در نام، آدرس و خدمات سالن (salons.search)
+    search = request.GET.get('search', '').strip()
     if search:
-        salons = salons.filter(
-            Q(name__icontains=search) | Q(address__icontains=search)
-        )
+        salons = search_salons(salons, search)
     
     context = {
         'salons': salons,
@@ -79,7 +110,7 @@ def appointment_book(request, salon_id):
                 appointment_date=appointment_date,
                 appointment_time=appointment_time,
                 status__in=['pending', 'confirmed', 'in_progress']
-            ).exists()
+            ).exists() or is_held_for_other(staff.id, appointment_date, appointment_time, request.user)
             
             if existing_appointment:
                 messages.error(request, 'این زمان قبلاً رزرو شده است')
@@ -139,6 +170,7 @@ def get_available_times(request, salon_id):
             appointment_date=appointment_date,
             status__in=['pending', 'confirmed', 'in_progress']
         ).values_list('appointment_time', flat=True)
+        booked_times = set(booked_times) | held_times(staff.id, appointment_date, request.user)
         
         # تولید ساعات موجود (هر 30 دقیقه)
         available_times = []
@@ -172,8 +204,11 @@ def appointment_cancel(request, appointment_id):
         messages.error(request, 'این نوبت قابل لغو نیست')
         return redirect('appointments:customer_dashboard')
     
-    appointment.status = 'cancelled'
-    appointment.save()
+    try:
+        transition_appointment(appointment, 'cancelled', actor=request.user)
+    except ValidationError as e:
+        messages.error(request, e.messages[0])
+        return redirect('appointments:customer_dashboard')
     
     messages.success(request, 'نوبت با موفقیت لغو شد')
     
@@ -202,8 +237,10 @@ def appointment_update_status(request, appointment_id):
     if new_status not in dict(Appointment.STATUS_CHOICES):
         return JsonResponse({'error': 'وضعیت نامعتبر'}, status=400)
     
-    appointment.status = new_status
-    appointment.save()
+    try:
+        transition_appointment(appointment, new_status, actor=request.user)
+    except ValidationError as e:
+        return JsonResponse({'error': e.messages[0]}, status=400)
     
     return JsonResponse({
         'success': True,
@@ -211,6 +248,10 @@ def appointment_update_status(request, appointment_id):
         'status_value': appointment.status
     })
 
+def _parse_calendar_date(value):
+    """تاریخ ارسالی FullCalendar (YYYY-MM-DD یا ISO datetime)"""
+    return datetime.strptime(value[:10], '%Y-%m-%d').date()
+
 def appointment_calendar_data(request, salon_id):
     """داده‌های تقویم برای نمایش نوبت‌ها (AJAX)"""
     salon = get_object_or_404(Salon, id=salon_id)
@@ -218,58 +259,106 @@ def appointment_calendar_data(request, salon_id):
     # بررسی مجوز
     if not (salon.owner == request.user or 
             (hasattr(request.user, 'staff') and request.user.staff.salon == salon)):
-        return JsonResponse({'error': 'دسترسی غیر مجاز'}, status=403)
+        return json_response({'error': 'دسترسی غیر مجاز'}, status=403)
     
     start_date = request.GET.get('start')
     end_date = request.GET.get('end')
     
-    if start_date and end_date:
-        appointments = Appointment.objects.filter(
-            salon=salon,
-            appointment_date__gte=start_date,
-            appointment_date__lte=end_date
-        ).select_related('customer', 'staff__user', 'service')
-    else:
-        # نوبت‌های این ماه
-        today = timezone.now().date()
-        month_start = today.replace(day=1)
-        next_month = (month_start + timedelta(days=32)).replace(day=1)
-        
-        appointments = Appointment.objects.filter(
-            salon=salon,
-            appointment_date__gte=month_start,
-            appointment_date__lt=next_month
-        ).select_related('customer', 'staff__user', 'service')
+    try:
+        if start_date and end_date:
+            range_start = _parse_calendar_date(start_date)
+            range_end = _parse_calendar_date(end_date)
+        else:
+            # نوبت‌های این ماه
+            today = timezone.now().date()
+            range_start = today.replace(day=1)
+            range_end = (range_start + timedelta(days=32)).replace(day=1)
+        staff_id = int(request.GET['staff_id']) if request.GET.get('staff_id') else None
+    except ValueError:
+        return json_response({'error': 'پارامتر نامعتبر'}, status=400)
+    
+    # محدود کردن بازه درخواستی (end در FullCalendar انحصاری است)
+    range_end = min(range_end, range_start + timedelta(days=CALENDAR_MAX_RANGE_DAYS))
+    
+    appointments = Appointment.objects.filter(
+        salon=salon,
+        appointment_date__gte=range_start,
+        appointment_date__lt=range_end
+    )
+    if staff_id is not None:
+        appointments = appointments.filter(staff_id=staff_id)
     
     # تبدیل به فرمت FullCalendar
     events = []
-    for appointment in appointments:
-        color = {
-            'pending': '#ffc107',
-            'confirmed': '#17a2b8', 
-            'in_progress': '#007bff',
-            'completed': '#28a745',
-            'cancelled': '#dc3545',
-            'no_show': '#6c757d',
-        }.get(appointment.status, '#6c757d')
+    for row in appointments.values_list(*CALENDAR_FIELDS).order_by():
+        (appointment_id, appointment_date, appointment_time, status, total_price,
+         customer_first_name, customer_last_name, customer_phone, service_name, duration,
+         staff_first_name, staff_last_name) = row
+        customer = f"{customer_first_name} {customer_last_name}".strip()
+        start = datetime.combine(appointment_date, appointment_time)
+        color = CALENDAR_STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR)
         
         events.append({
-            'id': appointment.id,
-            'title': f"{appointment.customer.get_full_name()} - {appointment.service.name}",
-            'start': f"{appointment.appointment_date}T{appointment.appointment_time}",
+            'id': appointment_id,
+            'title': f"{customer} - {service_name}",
+            'start': start.isoformat(),
+            'end': (start + timedelta(minutes=duration)).isoformat(),
             'backgroundColor': color,
             'borderColor': color,
             'extendedProps': {
-                'customer': appointment.customer.get_full_name(),
-                'service': appointment.service.name,
-                'staff': appointment.staff.user.get_full_name(),
-                'status': appointment.get_status_display_fa(),
-                'price': appointment.total_price,
-                'phone': appointment.customer.phone,
+                'customer': customer,
+                'service': service_name,
+                'staff': f"{staff_first_name} {staff_last_name}".strip(),
+                'status': STATUS_LABELS.get(status, status),
+                'price': total_price,
+                'phone': customer_phone,
             }
         })
     
-    return JsonResponse(events, safe=False)
+    return json_response(events)
+
+def _ics_response(request, queryset, calendar_name):
+    """پاسخ فید ICS با پشتیبانی از ETag و 304"""
+    etag, last_updated = ics.feed_etag(queryset)
+    etag = quote_etag(etag)
+    
+    if etag in request.headers.get('If-None-Match', ''):
+        return HttpResponseNotModified(headers={'ETag': etag})
+    
+    response = HttpResponse(
+        ics.build_calendar(queryset, calendar_name),
+        content_type='text/calendar; charset=utf-8'
+    )
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=900'
+    if last_updated:
+        response['Last-Modified'] = http_date(last_updated.timestamp())
+    return response
+
+@require_http_methods(["GET", "HEAD"])
+def staff_calendar_feed(request, token):
+    """فید ICS نوبت‌های یک کارمند"""
+    feed = ics.read_feed_token(token, ics.STAFF_SALT)
+    if feed is None:
+        raise Http404('فید یافت نشد')
+    staff_id, feed_key = feed
+    staff = get_object_or_404(
+        Staff.objects.select_related('user', 'salon'), id=staff_id, calendar_feed_key=feed_key
+    )
+    
+    calendar_name = f"نوبت‌های {staff.user.get_full_name() or staff.user.username} - {staff.salon.name}"
+    return _ics_response(request, Appointment.objects.filter(staff=staff), calendar_name)
+
+@require_http_methods(["GET", "HEAD"])
+def salon_calendar_feed(request, token):
+    """فید ICS همه نوبت‌های یک سالن"""
+    feed = ics.read_feed_token(token, ics.SALON_SALT)
+    if feed is None:
+        raise Http404('فید یافت نشد')
+    salon_id, feed_key = feed
+    salon = get_object_or_404(Salon, id=salon_id, calendar_feed_key=feed_key)
+    
+    return _ics_response(request, Appointment.objects.filter(salon=salon), f"نوبت‌های {salon.name}")
 
 @login_required
 def my_appointments(request):
@@ -325,18 +414,26 @@ def appointment_reschedule(request, appointment_id):
                 appointment_date=appointment_date,
                 appointment_time=appointment_time,
                 status__in=['pending', 'confirmed', 'in_progress']
-            ).exclude(id=appointment.id).exists():
+            ).exclude(id=appointment.id).exists() or is_held_for_other(
+                appointment.staff_id, appointment_date, appointment_time, request.user
+            ):
                 messages.error(request, 'این زمان رزرو شده است')
                 return render(request, 'appointments/reschedule.html', {'appointment': appointment})
             
             appointment.appointment_date = appointment_date
             appointment.appointment_time = appointment_time
-            appointment.status = 'pending'  # بازگشت به حالت انتظار
-            appointment.save()
+            with transaction.atomic():
+                appointment.save(
+                    actor=request.user, update_fields=['appointment_date', 'appointment_time', 'updated_at']
+                )
+                # بازگشت به حالت انتظار
+                transition_appointment(appointment, 'pending', actor=request.user, transitions=RESCHEDULE_TRANSITIONS)
             
             messages.success(request, 'زمان نوبت تغییر کرد')
             return redirect('appointments:customer_dashboard')
             
+        except ValidationError as e:
+            messages.error(request, e.messages[0])
         except Exception as e:
             messages.error(request, f'خطا: {str(e)}')
     
@@ -377,7 +474,7 @@ def quick_book(request, salon_id):
                 appointment_date=appointment_date,
                 appointment_time=appointment_time,
                 status__in=['pending', 'confirmed', 'in_progress']
-            ).exists():
+            ).exists() or is_held_for_other(staff.id, appointment_date, appointment_time):
                 messages.error(request, 'این زمان رزرو شده است')
                 return render(request, 'appointments/quick_book.html', {
                     'salon': salon, 'services': services, 'staff_members': staff_members
@@ -429,6 +526,31 @@ def booking_success(request, appointment_id):
     context = {'appointment': appointment}
     return render(request, 'appointments/booking_success.html', context)
 
+@login_required
+def waitlist_join(request, salon_id):
+    """ثبت در لیست انتظار سالن برای خبر شدن از نوبت‌های آزاد شده"""
+    salon = get_object_or_404(Salon, id=salon_id, is_active=True)
+    form = WaitlistForm(request.POST or None, salon=salon)
+    
+    if request.method == 'POST' and form.is_valid():
+        entry = form.save(commit=False)
+        entry.salon = salon
+        entry.customer = request.user
+        entry.save()
+        messages.success(request, 'در لیست انتظار ثبت شدید؛ اگر نوبتی آزاد شود پیامک دریافت می‌کنید')
+        return redirect('appointments:waitlist_join', salon_id=salon.id)
+    
+    entries = WaitlistEntry.objects.filter(
+        salon=salon, customer=request.user, status__in=['waiting', 'offered']
+    ).select_related('service', 'staff__user', 'offered_staff__user')
+    
+    context = {
+        'salon': salon,
+        'form': form,
+        'entries': entries,
+    }
+    return render(request, 'appointments/waitlist_join.html', context)
+
 @login_required
 def appointment_manage(request, salon_id):
     """مدیریت نوبت‌های سالن"""
@@ -463,6 +585,34 @@ def appointment_manage(request, salon_id):
     }
     return render(request, 'appointments/manage.html', context)
 
+@login_required
+def appointment_search(request, salon_id):
+    """جستجوی نوبت‌های سالن با نام یا تلفن مشتری، نام کارمند یا خدمت"""
+    salon = get_object_or_404(Salon, id=salon_id)
+    
+    # بررسی مجوز
+    if not (salon.owner == request.user or 
+            (hasattr(request.user, 'staff') and request.user.staff.salon == salon)):
+        messages.error(request, 'دسترسی غیر مجاز')
+        return redirect('accounts:login')
+    
+    query = request.GET.get('q', '').strip()
+    appointments = []
+    if query:
+        appointments = search_appointments(
+            Appointment.objects.filter(salon=salon), query, salon_id=salon.id
+        ).select_related('customer', 'staff__user', 'service').order_by(
+            '-appointment_date', '-appointment_time'
+        )[:SEARCH_RESULTS_LIMIT]
+    
+    context = {
+        'salon': salon,
+        'query': query,
+        'appointments': appointments,
+        'results_limit': SEARCH_RESULTS_LIMIT,
+    }
+    return render(request, 'appointments/search.html', context)
+
 @login_required
 def today_appointments(request, salon_id):
     """نوبت‌های امروز"""
@@ -483,6 +633,7 @@ def today_appointments(request, salon_id):
     context = {
         'salon': salon,
         'appointments': appointments,
-        'today': today
+        'today': today,
+        **fragment_cache_context(salon.id),
     }
     return render(request, 'appointments/today.html', context)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+لیست انتظار و پیشنهاد نوبت‌های آزاد شده
+
+وقتی نوبتی لغو یا جابه‌جا می‌شود (handlerهای outbox در appointments/outbox.py)،
+offer_slot اولین مشتری منتظری را که خدمت، کارمند (یا هر کارمند)، بازه تاریخ و
+بازه ساعتش با نوبت آزاد شده جور است به ترتیب اولویت و زمان ثبت پیدا می‌کند و
+نوبت را WAITLIST_HOLD_MINUTES دقیقه برایش نگه می‌دارد. جستجو از ایندکس
+(service، status، date_from) فقط ردیف‌های منتظر همان خدمت را می‌خواند، نه کل
+لیست. در این مدت رزرو آن ساعت برای بقیه بسته است (held_times). انقضای
+نگه‌داری با یک کار زمان‌دار در صف (core.tasks) بررسی و نوبت به نفر بعدی
+پیشنهاد می‌شود.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.outbox import publish
+from core.tasks import enqueue
+from .models import Appointment, WaitlistEntry
+
+OFFERED = 'waitlist.offered'
+ACTIVE_STATUSES = ['pending', 'confirmed', 'in_progress']
+
+
+def find_matches(service_id, staff_id, slot_date, slot_time):
+    """منتظرهای مناسب یک نوبت به ترتیب اولویت"""
+    return WaitlistEntry.objects.filter(
+        service_id=service_id,
+        status='waiting',
+        date_from__lte=slot_date,
+        date_to__gte=slot_date,
+        time_from__lte=slot_time,
+        time_to__gte=slot_time,
+    ).filter(Q(staff__isnull=True) | Q(staff_id=staff_id)).order_by('-priority', 'created_at', 'id')
+
+
+def active_holds(staff_id, slot_date, now=None):
+    return WaitlistEntry.objects.filter(
+        offered_staff_id=staff_id,
+        offered_date=slot_date,
+        status='offered',
+        hold_expires_at__gt=now or timezone.now(),
+    )
+
+
+def held_times(staff_id, slot_date, customer=None):
+    """ساعت‌هایی از روز کارمند که برای مشتری دیگری نگه داشته شده‌اند"""
+    holds = active_holds(staff_id, slot_date)
+    if customer is not None and customer.pk:
+        holds = holds.exclude(customer=customer)
+    return set(holds.values_list('offered_time', flat=True))
+
+
+def is_held_for_other(staff_id, slot_date, slot_time, customer=None):
+    return slot_time in held_times(staff_id, slot_date, customer)
+
+
+def offer_slot(service_id, staff_id, slot_date, slot_time, now=None):
+    """نگه داشتن نوبت آزاد شده برای اولین منتظر مناسب؛ خروجی WaitlistEntry یا None"""
+    now = now or timezone.now()
+    slot_start = timezone.make_aware(datetime.combine(slot_date, slot_time))
+    if slot_start <= now:
+        return None
+
+    with transaction.atomic():
+        taken = Appointment.objects.filter(
+            staff_id=staff_id,
+            appointment_date=slot_date,
+            appointment_time=slot_time,
+            status__in=ACTIVE_STATUSES,
+        ).exists()
+        if taken or active_holds(staff_id, slot_date, now).filter(offered_time=slot_time).exists():
+            return None
+
+        candidates = find_matches(service_id, staff_id, slot_date, slot_time)
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        entry = candidates.first()
+        if entry is None:
+            return None
+
+        hold_minutes = settings.WAITLIST_HOLD_MINUTES
+        entry.status = 'offered'
+        entry.offered_staff_id = staff_id
+        entry.offered_date = slot_date
+        entry.offered_time = slot_time
+        entry.hold_expires_at = now + timedelta(minutes=hold_minutes)
+        entry.save(update_fields=['status', 'offered_staff', 'offered_date', 'offered_time', 'hold_expires_at'])
+
+        publish(OFFERED, entry.id, {
+            'customer_id': entry.customer_id,
+            'staff_id': staff_id,
+            'date': slot_date.isoformat(),
+            'time': slot_time.strftime('%H:%M'),
+            'expires_at': entry.hold_expires_at.isoformat(),
+        })
+        enqueue('appointments.expire_waitlist_hold', {'entry_id': entry.id}, delay=hold_minutes * 60)
+    return entry
+
+
+def offer_freed_slots(slots, now=None):
+    """offer_slot برای هر (service_id، staff_id، تاریخ، ساعت)؛ خروجی تعداد نگه‌داری‌ها"""
+    return sum(offer_slot(*slot, now=now) is not None for slot in slots)
+
+
+def expire_hold(entry_id, now=None):
+    """پایان نگه‌داری بی‌پاسخ و پیشنهاد نوبت به نفر بعدی"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        entry = WaitlistEntry.objects.select_for_update().filter(
+            id=entry_id, status='offered', hold_expires_at__lte=now
+        ).first()
+        if entry is None:
+            return None
+        entry.status = 'expired'
+        entry.save(update_fields=['status'])
+        return offer_slot(entry.service_id, entry.offered_staff_id, entry.offered_date, entry.offered_time, now)
+
+
+def mark_booked(rows):
+    """نگه‌داری‌هایی که مشتری‌شان همان نوبت را رزرو کرده؛ rows = [(customer_id، staff_id، تاریخ، ساعت)]"""
+    rows = set(rows)
+    if not rows:
+        return 0
+    holds = WaitlistEntry.objects.filter(
+        offered_staff_id__in={staff_id for _, staff_id, _, _ in rows},
+        offered_date__in={slot_date for _, _, slot_date, _ in rows},
+        status='offered',
+    ).values_list('id', 'customer_id', 'offered_staff_id', 'offered_date', 'offered_time')
+    booked_ids = [entry_id for entry_id, *key in holds if tuple(key) in rows]
+    return WaitlistEntry.objects.filter(id__in=booked_ids).update(status='booked') if booked_ids else 0
+
+
+def expire_waitlist_entries(today=None):
+    """منتظرهایی که بازه تاریخشان گذشته است"""
+    today = today or timezone.localdate()
+    return WaitlistEntry.objects.filter(status='waiting', date_to__lt=today).update(status='expired')
+
+
+def parse_slot(slot_date, slot_time):
+    """تاریخ و ساعت ذخیره شده در payload رویدادها"""
+    return date.fromisoformat(slot_date), time.fromisoformat(slot_time)
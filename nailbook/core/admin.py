@@ -0,0 +1,35 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import CalendarDay, OutboxEvent, Task
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    readonly_fields = ('attempts', 'locked_until', 'last_error', 'created_at', 'finished_at')
+
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='queued', attempts=0, run_after=timezone.now(), claim=None,
+            locked_until=None, finished_at=None,
+        )
+        self.message_user(request, f'{updated} کار دوباره در صف قرار گرفت.')
+    retry.short_description = 'اجرای دوباره کارهای انتخاب شده'
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'topic', 'object_id', 'created_at', 'processed_at', 'attempts')
+    list_filter = ('topic', 'processed_at')
+    search_fields = ('=object_id',)
+    readonly_fields = ('topic', 'object_id', 'payload', 'created_at', 'processed_at', 'attempts', 'last_error')
+
+@admin.register(CalendarDay)
+class CalendarDayAdmin(admin.ModelAdmin):
+    list_display = ('date', '__str__', 'jalali_week', 'weekday', 'is_weekend', 'is_holiday', 'holiday_name')
+    list_filter = ('is_holiday', 'is_weekend', 'jalali_year', 'jalali_month')
+    search_fields = ('holiday_name',)
+    list_editable = ('is_holiday', 'holiday_name')
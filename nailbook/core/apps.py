@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+
+        from . import checks  # noqa: F401
+
+        # ثبت کارهای پس‌زمینه (tasks.py) و handlerهای رویداد (outbox.py) همه اپ‌ها
+        autodiscover_modules('tasks', 'outbox')
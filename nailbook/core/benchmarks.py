@@ -0,0 +1,122 @@
+"""
+ابزار بنچمارک‌های داخلی
+
+هر اپ می‌تواند در ماژول benchmarks.py خود سناریو ثبت کند:
+
+    from core.benchmarks import scenario
+
+    @scenario('calendar_feed')
+    def calendar_feed(options):
+        ...
+
+دستور `python manage.py benchmark` سناریوها را روی یک پایگاه‌داده آزمایشی
+موقت اجرا می‌کند، پس داده‌های ساخته‌شده هیچ‌وقت وارد پایگاه‌داده اصلی نمی‌شوند.
+"""
+
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import time as dt_time, timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    """ثبت یک تابع به عنوان سناریوی بنچمارک"""
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+@contextmanager
+def benchmark_database():
+    """ساخت پایگاه‌داده آزمایشی موقت برای مدت اجرای بنچمارک"""
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def measure(func, repeat=10, warmup=1):
+    """اجرای func چند بار و برگرداندن زمان‌ها به میلی‌ثانیه"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'best_ms': min(timings),
+        'median_ms': statistics.median(timings),
+        'max_ms': max(timings),
+    }
+
+
+def format_timings(label, timings):
+    return (
+        f"{label}: best {timings['best_ms']:.1f} ms, "
+        f"median {timings['median_ms']:.1f} ms, max {timings['max_ms']:.1f} ms"
+    )
+
+
+def seed_salon(appointments=1000, days=90, staff_count=5, service_count=5, customers=200, start=None):
+    """ساخت یک سالن با کارمند، خدمت و نوبت‌های پخش‌شده در days روز"""
+    from accounts.models import User
+    from appointments.models import Appointment
+    from appointments.search import index_queryset
+    from salons.models import Salon, Staff
+    from services.models import Service
+
+    start = start or timezone.localdate()
+    prefix = f"bench{User.objects.count()}"
+
+    owner = User.objects.create_user(f'{prefix}_owner', role='salon_owner', phone=f'{prefix}0')
+    salon = Salon.objects.create(
+        name=f'سالن {prefix}', owner=owner, phone='02100000000', address='تهران',
+        opening_time=dt_time(8), closing_time=dt_time(22),
+    )
+    staff_users = User.objects.bulk_create([
+        User(username=f'{prefix}_staff{i}', role='staff', first_name='کارمند', last_name=str(i))
+        for i in range(staff_count)
+    ])
+    staff = Staff.objects.bulk_create([Staff(user=user, salon=salon) for user in staff_users])
+    services = Service.objects.bulk_create([
+        Service(salon=salon, name=f'خدمت {i}', price=100000 * (i + 1), duration=30 * (i % 3 + 1))
+        for i in range(service_count)
+    ])
+    customer_users = User.objects.bulk_create([
+        User(username=f'{prefix}_customer{i}', role='customer', first_name='مشتری', last_name=str(i),
+             phone=f'{prefix}c{i}')
+        for i in range(customers)
+    ])
+
+    # نوبت‌ها اول بین روزها پخش می‌شوند؛ هر کارمند روزانه حداکثر 28 نوبت نیم‌ساعته (8 تا 22)
+    slots_per_day = 28
+    statuses = ['pending', 'confirmed', 'completed', 'cancelled', 'completed', 'confirmed']
+    objs = []
+    for i in range(appointments):
+        slot = i // staff_count
+        day = slot % days
+        slot_in_day = (slot // days) % slots_per_day
+        service = services[i % service_count]
+        objs.append(Appointment(
+            salon=salon,
+            customer=customer_users[i % customers],
+            staff=staff[i % staff_count],
+            service=service,
+            appointment_date=start + timedelta(days=day),
+            appointment_time=dt_time(8 + slot_in_day // 2, 30 * (slot_in_day % 2)),
+            status=statuses[i % len(statuses)],
+            total_price=service.price,
+            is_paid=i % 3 == 0,
+        ))
+    Appointment.objects.bulk_create(objs, batch_size=1000, ignore_conflicts=True)
+    index_queryset(salon.appointments.all())
+    return salon
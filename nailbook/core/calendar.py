@@ -0,0 +1,103 @@
+"""
+جدول تقویم شمسی (CalendarDay)
+
+برای هر روز میلادی یک ردیف با سال، ماه، روز، هفته سال و روز هفته شمسی و
+پرچم جمعه و تعطیل رسمی ساخته می‌شود تا فیلترهایی مثل «این ماه شمسی»، «هفته
+n ام سال» یا «روزهای تعطیل» داخل SQL و با ایندکس اجرا شوند، نه با بارگذاری
+ردیف‌ها و تبدیل در پایتون. ستون‌ها با تبدیل برداری core.jalali محاسبه
+می‌شوند.
+
+تعطیلات رسمی خورشیدی ثابت (FIXED_HOLIDAYS) همیشه اعمال می‌شوند؛ تعطیلات
+قمری هر سال جابه‌جا می‌شوند و با فایل CSV به دستور build_calendar داده
+می‌شوند (هر خط: تاریخ شمسی YYYY/MM/DD، نام). اجرای دوباره تعطیلی را پاک
+نمی‌کند: روزی که در این اجرا تعطیل نیست پرچم و نام تعطیل ردیف موجود (مثلاً
+تعطیلی که دستی در پنل ادمین ثبت شده) را نگه می‌دارد.
+"""
+
+import csv
+from datetime import date
+
+import numpy as np
+from django.db import transaction
+
+from .jalali import ordinals_to_jalali
+from .models import CalendarDay
+
+# (ماه، روز) شمسی
+FIXED_HOLIDAYS = {
+    (1, 1): 'نوروز',
+    (1, 2): 'نوروز',
+    (1, 3): 'نوروز',
+    (1, 4): 'نوروز',
+    (1, 12): 'روز جمهوری اسلامی',
+    (1, 13): 'روز طبیعت',
+    (3, 14): 'رحلت امام خمینی',
+    (3, 15): 'قیام ۱۵ خرداد',
+    (11, 22): 'پیروزی انقلاب اسلامی',
+    (12, 29): 'ملی شدن صنعت نفت',
+}
+
+FRIDAY = 6  # روز هفته شمسی: شنبه = 0
+DATE_FIELDS = ['jalali_year', 'jalali_month', 'jalali_day', 'jalali_week', 'weekday', 'is_weekend']
+HOLIDAY_FIELDS = ['is_holiday', 'holiday_name']
+BUILD_BATCH_SIZE = 1000
+
+
+def read_holidays(path):
+    """تعطیلات قمری از CSV؛ خروجی {(سال، ماه، روز): نام}"""
+    holidays = {}
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith('#'):
+                continue
+            year, month, day = (int(part) for part in row[0].strip().split('/'))
+            holidays[(year, month, day)] = (row[1].strip() if len(row) > 1 else '') or 'تعطیل رسمی'
+    return holidays
+
+
+def calendar_rows(start, end, holidays=None):
+    """دیکشنری ستون‌های CalendarDay برای هر روز از start تا end (شامل هر دو)"""
+    holidays = holidays or {}
+    ordinals = np.arange(start.toordinal(), end.toordinal() + 1)
+    years, months, days = ordinals_to_jalali(ordinals)
+
+    # روز هفته شمسی از روز هفته میلادی (دوشنبه = 0 → شنبه = 0)
+    weekdays = (ordinals + 1) % 7
+    day_of_year = np.where(months <= 6, (months - 1) * 31, 186 + (months - 7) * 30) + days - 1
+    # هفته اول هفته‌ای است که 1 فروردین در آن است؛ هفته‌ها از شنبه شروع می‌شوند
+    weeks = (day_of_year + (weekdays - day_of_year) % 7) // 7 + 1
+
+    for ordinal, year, month, day, week, weekday in zip(
+        ordinals.tolist(), years.tolist(), months.tolist(), days.tolist(), weeks.tolist(), weekdays.tolist()
+    ):
+        holiday_name = holidays.get((year, month, day)) or FIXED_HOLIDAYS.get((month, day), '')
+        yield {
+            'date': date.fromordinal(ordinal),
+            'jalali_year': year,
+            'jalali_month': month,
+            'jalali_day': day,
+            'jalali_week': week,
+            'weekday': weekday,
+            'is_weekend': weekday == FRIDAY,
+            'is_holiday': bool(holiday_name),
+            'holiday_name': holiday_name,
+        }
+
+
+def build_calendar(start, end, holidays=None):
+    """ساخت یا بازنویسی ردیف‌های تقویم بازه؛ خروجی تعداد روزها
+
+    روزهای تعطیل این اجرا همه ستون‌ها را بازنویسی می‌کنند و بقیه روزها فقط
+    ستون‌های تاریخ را، تا تعطیلی ثبت شده قبلی از بین نرود.
+    """
+    objs = [CalendarDay(**row) for row in calendar_rows(start, end, holidays)]
+    with transaction.atomic():
+        for is_holiday, update_fields in ((True, DATE_FIELDS + HOLIDAY_FIELDS), (False, DATE_FIELDS)):
+            CalendarDay.objects.bulk_create(
+                [obj for obj in objs if obj.is_holiday == is_holiday],
+                batch_size=BUILD_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['date'],
+                update_fields=update_fields,
+            )
+    return len(objs)
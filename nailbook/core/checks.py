@@ -0,0 +1,28 @@
+"""بررسی‌های سیستمی (manage.py check) تنظیمات اجرای پروژه"""
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+# کش‌هایی که فقط داخل همان پروسه دیده می‌شوند
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    نسخه نوبت‌های سالن (appointments.cache) باید بین همه workerها مشترک باشد
+
+    با LocMemCache هر پروسه gunicorn نسخه و قطعه‌های کش خودش را دارد و تغییر
+    نوبت در یک worker قطعه‌های کش شده worker دیگر را باطل نمی‌کند.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.CACHE_REQUIRE_SHARED and backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f'کش پیش‌فرض ({backend}) بین پروسه‌ها مشترک نیست و داشبوردها نوبت‌های قدیمی نشان می‌دهند',
+            hint='CACHE_BACKEND را روی Redis یا Memcached تنظیم کنید (یا CACHE_REQUIRE_SHARED=False برای یک پروسه)',
+            id='core.E001',
+        )]
+    return []
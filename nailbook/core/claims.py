@@ -0,0 +1,29 @@
+"""
+رزرو ردیف‌ها برای یک worker با توکن
+
+صف کارها (core.tasks)، یادآوری نوبت‌ها و پیامک‌های در صف با یک الگو بین
+workerها تقسیم می‌شوند: شناسه ردیف‌های قابل رزرو خوانده می‌شود (با
+select_for_update(skip_locked) وقتی پایگاه‌داده پشتیبانی کند) و سپس با یک
+UPDATE شرطی توکن worker روی آن‌ها نوشته می‌شود. شرط رزرو داخل خود UPDATE هم
+تکرار می‌شود، پس دو worker همزمان هیچ‌وقت یک ردیف را با هم برنمی‌دارند.
+"""
+
+from django.db import connection, transaction
+
+
+def claim_rows(queryset, claimable, limit, **claim_fields):
+    """
+    رزرو حداکثر limit ردیف از queryset که شرط claimable را دارند
+
+    ترتیب برداشتن ردیف‌ها ترتیب queryset است؛ claim_fields (توکن، زمان رزرو و ...)
+    روی ردیف‌های رزرو شده نوشته می‌شود. خروجی تعداد ردیف‌های رزرو شده.
+    """
+    with transaction.atomic():
+        candidates = queryset.filter(claimable)
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list('id', flat=True)[:limit])
+        if not ids:
+            return 0
+        # شرط claimable دوباره در UPDATE تا رزرو همزمان worker دیگر بازنویسی نشود
+        return queryset.model._default_manager.filter(claimable, id__in=ids).update(**claim_fields)
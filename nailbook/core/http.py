@@ -0,0 +1,11 @@
+import orjson
+from django.http import HttpResponse
+
+
+def json_response(data, status=200):
+    """پاسخ JSON سریع با orjson (جایگزین JsonResponse برای خروجی‌های حجیم)"""
+    return HttpResponse(
+        orjson.dumps(data),
+        status=status,
+        content_type='application/json',
+    )
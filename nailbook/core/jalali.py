@@ -0,0 +1,86 @@
+"""
+تبدیل برداری تاریخ میلادی به شمسی
+
+همان الگوریتم jdatetime (jalali.c فارسی‌وب) با حساب صحیح روی آرایه‌های
+NumPy: فاصله روز از مبدأ 1600/03/20 میلادی (= 979/01/01 شمسی) به
+دوره‌های 33 ساله (12053 روز)، چهار ساله (1461 روز) و سال تقسیم می‌شود و
+شش ماه اول 31 روزه و بقیه 30 روزه‌اند. برای گزارش‌ها و خروجی‌ها که هزاران
+ردیف با تعداد کمی تاریخ متمایز دارند، format_dates هر تاریخ متمایز را یک
+بار فرمت می‌کند. نتیجه در تست‌ها روز به روز با jdatetime مقایسه می‌شود.
+"""
+
+from datetime import date
+
+import numpy as np
+
+# ordinal روز 1600/03/20 میلادی؛ سال 979 شمسی از این روز شروع می‌شود
+EPOCH_ORDINAL = date(1600, 3, 20).toordinal()
+EPOCH_YEAR = 979
+
+DAYS_IN_33_YEARS = 12053
+DAYS_IN_4_YEARS = 1461
+FIRST_HALF_DAYS = 186  # شش ماه 31 روزه
+
+
+def to_ordinals(dates):
+    """آرایه ordinal (شماره روز پایتون) برای لیست dateها"""
+    return np.fromiter((value.toordinal() for value in dates), dtype=np.int64)
+
+
+def ordinals_to_jalali(ordinals):
+    """سال، ماه و روز شمسی (سه آرایه) برای آرایه ordinalها"""
+    day_no = np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL
+
+    cycles, day_no = np.divmod(day_no, DAYS_IN_33_YEARS)
+    quads, day_no = np.divmod(day_no, DAYS_IN_4_YEARS)
+    years = EPOCH_YEAR + 33 * cycles + 4 * quads
+
+    # سال اول هر دوره چهار ساله 366 روز است
+    later = day_no >= 366
+    shifted = day_no - 1
+    years = years + np.where(later, shifted // 365, 0)
+    day_no = np.where(later, shifted % 365, day_no)
+
+    first_half = day_no < FIRST_HALF_DAYS
+    second_half = day_no - FIRST_HALF_DAYS
+    months = np.where(first_half, day_no // 31 + 1, second_half // 30 + 7)
+    days = np.where(first_half, day_no % 31 + 1, second_half % 30 + 1)
+    return years, months, days
+
+
+def jalali_months(start, n_days):
+    """شماره ماه شمسی (1 تا 12) برای n روز متوالی از start"""
+    return ordinals_to_jalali(start.toordinal() + np.arange(n_days))[1]
+
+
+def format_dates(dates, separator='/'):
+    """رشته شمسی YYYY/MM/DD هر date؛ هر تاریخ متمایز فقط یک بار فرمت می‌شود"""
+    if not dates:
+        return []
+    unique, inverse = np.unique(to_ordinals(dates), return_inverse=True)
+    years, months, days = ordinals_to_jalali(unique)
+    formatted = np.array([
+        f'{year:04d}{separator}{month:02d}{separator}{day:02d}'
+        for year, month, day in zip(years.tolist(), months.tolist(), days.tolist())
+    ], dtype=object)
+    return formatted[inverse].tolist()
+
+
+def to_jalali(value):
+    """(سال، ماه، روز) شمسی یک date؛ همان حساب ordinals_to_jalali برای یک مقدار"""
+    cycles, day_no = divmod(value.toordinal() - EPOCH_ORDINAL, DAYS_IN_33_YEARS)
+    quads, day_no = divmod(day_no, DAYS_IN_4_YEARS)
+    year = EPOCH_YEAR + 33 * cycles + 4 * quads
+    if day_no >= 366:
+        years, day_no = divmod(day_no - 1, 365)
+        year += years
+    if day_no < FIRST_HALF_DAYS:
+        return year, day_no // 31 + 1, day_no % 31 + 1
+    day_no -= FIRST_HALF_DAYS
+    return year, day_no // 30 + 7, day_no % 30 + 1
+
+
+def format_date(value, separator='/'):
+    """رشته شمسی یک date"""
+    year, month, day = to_jalali(value)
+    return f'{year:04d}{separator}{month:02d}{separator}{day:02d}'
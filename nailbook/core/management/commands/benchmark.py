@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import autodiscover_modules
+
+from core.benchmarks import SCENARIOS, benchmark_database
+
+
+class Command(BaseCommand):
+    help = 'اجرای سناریوهای بنچمارک روی یک پایگاه‌داده آزمایشی موقت'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help='نام سناریوها (پیش‌فرض: همه)')
+        parser.add_argument('--list', action='store_true', help='فقط نمایش سناریوهای موجود')
+        parser.add_argument('--repeat', type=int, default=10, help='تعداد تکرار هر اندازه‌گیری')
+        parser.add_argument('--scale', type=float, default=1.0, help='ضریب اندازه داده‌های ساخته‌شده')
+
+    def handle(self, *args, **options):
+        autodiscover_modules('benchmarks')
+
+        if options['list']:
+            for name in sorted(SCENARIOS):
+                self.stdout.write(name)
+            return
+
+        names = options['scenarios'] or sorted(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"سناریوی ناشناخته: {', '.join(unknown)}")
+
+        with benchmark_database():
+            for name in names:
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                for line in SCENARIOS[name](options):
+                    self.stdout.write(f'  {line}')
@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.calendar import build_calendar, read_holidays
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'تاریخ نامعتبر: {value} (فرمت YYYY-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'ساخت یا بازنویسی جدول تقویم شمسی (CalendarDay) برای یک بازه میلادی'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_date,
+                            help='اولین روز (YYYY-MM-DD)؛ پیش‌فرض اول سال CALENDAR_YEARS_BEFORE سال قبل')
+        parser.add_argument('--end', type=parse_date,
+                            help='آخرین روز (YYYY-MM-DD)؛ پیش‌فرض آخر سال CALENDAR_YEARS_AFTER سال بعد')
+        parser.add_argument('--holidays', help='فایل CSV تعطیلات قمری (تاریخ شمسی YYYY/MM/DD، نام)')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        start = options['start'] or date(today.year - settings.CALENDAR_YEARS_BEFORE, 1, 1)
+        end = options['end'] or date(today.year + settings.CALENDAR_YEARS_AFTER, 12, 31)
+        if end < start:
+            raise CommandError('تاریخ پایان نباید قبل از تاریخ شروع باشد')
+
+        holidays = read_holidays(options['holidays']) if options['holidays'] else None
+        count = build_calendar(start, end, holidays)
+        extra = f' with {len(holidays)} extra holidays' if holidays else ''
+        self.stdout.write(f'Built {count} calendar days from {start} to {end}{extra}')
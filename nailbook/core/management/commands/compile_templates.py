@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_cache import compile_templates
+
+
+class Command(BaseCommand):
+    help = 'پارس همه قالب‌های پروژه در مرحله build؛ با هر خطای قالب شکست می‌خورد'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        compiled, errors = compile_templates()
+        elapsed = (time.perf_counter() - start) * 1000
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        self.stdout.write(f'Compiled {compiled} templates in {elapsed:.0f} ms')
+        if errors:
+            raise CommandError(f'{len(errors)} قالب خطا دارد')
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import outbox_stats, purge_processed_events, relay
+
+
+class Command(BaseCommand):
+    help = 'تحویل رویدادهای outbox به handlerها (یک بار از cron یا به صورت worker با --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='تعداد رویداد در هر دسته (پیش‌فرض OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--loop', action='store_true', help='اجرای دائمی به صورت worker')
+        parser.add_argument('--interval', type=float, default=1, help='فاصله بررسی صف خالی در حالت --loop (ثانیه)')
+        parser.add_argument('--stats', action='store_true', help='فقط نمایش معیارهای تأخیر')
+        parser.add_argument('--purge', action='store_true', help='حذف رویدادهای تحویل‌شده قدیمی‌تر از OUTBOX_RETENTION_DAYS')
+
+    def write_stats(self):
+        stats = outbox_stats()
+        self.stdout.write(
+            f"Pending {stats['pending']} (retrying {stats['retrying']}), "
+            f"oldest {stats['oldest_pending_seconds']}s, last delivery lag {stats['last_delivery_lag_seconds']}s"
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_stats()
+            return
+        if options['purge']:
+            self.stdout.write(f'Purged {purge_processed_events()} processed events')
+
+        while True:
+            totals = relay(options['batch_size'])
+            if totals['delivered'] or totals['parked'] or not options['loop']:
+                self.stdout.write(f"Delivered {totals['delivered']}, parked {totals['parked']}")
+            if totals['blocked']:
+                self.stderr.write('Relay is waiting on a failing event; see relay_outbox --stats')
+            if not options['loop']:
+                self.write_stats()
+                break
+            if totals['blocked'] or not totals['delivered']:
+                time.sleep(options['interval'])
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import purge_finished_tasks, run_tasks
+
+
+class Command(BaseCommand):
+    help = 'اجرای کارهای پس‌زمینه صف (یک بار از cron یا به صورت worker با --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='تعداد کار در هر رزرو (پیش‌فرض TASK_BATCH_SIZE)')
+        parser.add_argument('--visibility-timeout', type=int, help='مدت رزرو هر دسته به ثانیه (پیش‌فرض TASK_VISIBILITY_TIMEOUT)')
+        parser.add_argument('--loop', action='store_true', help='اجرای دائمی به صورت worker')
+        parser.add_argument('--interval', type=float, default=2, help='فاصله بررسی صف خالی در حالت --loop (ثانیه)')
+        parser.add_argument('--purge', action='store_true', help='حذف کارهای انجام شده قدیمی‌تر از TASK_RETENTION_DAYS')
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            self.stdout.write(f'Purged {purge_finished_tasks()} finished tasks')
+
+        while True:
+            totals = run_tasks(options['batch_size'], options['visibility_timeout'])
+            if totals['claimed'] or not options['loop']:
+                self.stdout.write(
+                    f"Claimed {totals['claimed']}, done {totals['done']}, "
+                    f"retried {totals['retried']}, failed {totals['failed']}"
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
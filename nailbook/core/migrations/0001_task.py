@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='نام کار')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='آرگومان\u200cها')),
+                ('priority', models.SmallIntegerField(default=0, verbose_name='اولویت')),
+                ('status', models.CharField(choices=[('queued', 'در صف'), ('running', 'در حال اجرا'), ('done', 'انجام شده'), ('failed', 'ناموفق')], default='queued', max_length=10, verbose_name='وضعیت')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='تعداد تلاش')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5, verbose_name='حداکثر تلاش')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='اجرا بعد از')),
+                ('claim', models.UUIDField(blank=True, editable=False, null=True)),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='رزرو تا')),
+                ('last_error', models.TextField(blank=True, verbose_name='آخرین خطا')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان پایان')),
+            ],
+            options={
+                'verbose_name': 'کار پس\u200cزمینه',
+                'verbose_name_plural': 'کارهای پس\u200cزمینه',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', '-priority', 'run_after'], name='task_claim_idx')],
+            },
+        ),
+    ]
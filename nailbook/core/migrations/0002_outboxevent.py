@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=64, verbose_name='موضوع')),
+                ('object_id', models.BigIntegerField(verbose_name='شناسه شیء')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='داده')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='زمان ثبت')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان تحویل')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='تعداد تلاش ناموفق')),
+                ('last_error', models.TextField(blank=True, verbose_name='آخرین خطا')),
+            ],
+            options={
+                'verbose_name': 'رویداد outbox',
+                'verbose_name_plural': 'رویدادهای outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:36
+
+from datetime import date
+
+import numpy as np
+from django.db import migrations, models
+
+# کپی ثابت core.jalali.ordinals_to_jalali، core.calendar.FIXED_HOLIDAYS و
+# calendar_rows در زمان این migration؛ تغییرهای بعدی آن ماژول‌ها این migration
+# را عوض نمی‌کند (بعد از آن‌ها manage.py build_calendar)
+EPOCH_ORDINAL = date(1600, 3, 20).toordinal()
+EPOCH_YEAR = 979
+FIXED_HOLIDAYS = {
+    (1, 1): 'نوروز',
+    (1, 2): 'نوروز',
+    (1, 3): 'نوروز',
+    (1, 4): 'نوروز',
+    (1, 12): 'روز جمهوری اسلامی',
+    (1, 13): 'روز طبیعت',
+    (3, 14): 'رحلت امام خمینی',
+    (3, 15): 'قیام ۱۵ خرداد',
+    (11, 22): 'پیروزی انقلاب اسلامی',
+    (12, 29): 'ملی شدن صنعت نفت',
+}
+FRIDAY = 6
+BATCH_SIZE = 1000
+
+
+def ordinals_to_jalali(ordinals):
+    day_no = ordinals - EPOCH_ORDINAL
+    cycles, day_no = np.divmod(day_no, 12053)
+    quads, day_no = np.divmod(day_no, 1461)
+    years = EPOCH_YEAR + 33 * cycles + 4 * quads
+
+    later = day_no >= 366
+    shifted = day_no - 1
+    years = years + np.where(later, shifted // 365, 0)
+    day_no = np.where(later, shifted % 365, day_no)
+
+    first_half = day_no < 186
+    second_half = day_no - 186
+    months = np.where(first_half, day_no // 31 + 1, second_half // 30 + 7)
+    days = np.where(first_half, day_no % 31 + 1, second_half % 30 + 1)
+    return years, months, days
+
+
+def calendar_rows(start, end):
+    ordinals = np.arange(start.toordinal(), end.toordinal() + 1, dtype=np.int64)
+    years, months, days = ordinals_to_jalali(ordinals)
+    weekdays = (ordinals + 1) % 7
+    day_of_year = np.where(months <= 6, (months - 1) * 31, 186 + (months - 7) * 30) + days - 1
+    weeks = (day_of_year + (weekdays - day_of_year) % 7) // 7 + 1
+
+    for ordinal, year, month, day, week, weekday in zip(
+        ordinals.tolist(), years.tolist(), months.tolist(), days.tolist(), weeks.tolist(), weekdays.tolist()
+    ):
+        holiday_name = FIXED_HOLIDAYS.get((month, day), '')
+        yield {
+            'date': date.fromordinal(ordinal),
+            'jalali_year': year,
+            'jalali_month': month,
+            'jalali_day': day,
+            'jalali_week': week,
+            'weekday': weekday,
+            'is_weekend': weekday == FRIDAY,
+            'is_holiday': bool(holiday_name),
+            'holiday_name': holiday_name,
+        }
+
+
+def fill_calendar(apps, schema_editor):
+    # بازه پیش‌فرض؛ برای تعطیلات قمری یا سال‌های بعد manage.py build_calendar
+    CalendarDay = apps.get_model('core', 'CalendarDay')
+    CalendarDay.objects.bulk_create(
+        (CalendarDay(**row) for row in calendar_rows(date(2015, 1, 1), date(2040, 12, 31))),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarDay',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False, verbose_name='تاریخ')),
+                ('jalali_year', models.PositiveSmallIntegerField(verbose_name='سال شمسی')),
+                ('jalali_month', models.PositiveSmallIntegerField(verbose_name='ماه شمسی')),
+                ('jalali_day', models.PositiveSmallIntegerField(verbose_name='روز شمسی')),
+                ('jalali_week', models.PositiveSmallIntegerField(verbose_name='هفته سال')),
+                ('weekday', models.PositiveSmallIntegerField(verbose_name='روز هفته (شنبه = 0)')),
+                ('is_weekend', models.BooleanField(default=False, verbose_name='جمعه')),
+                ('is_holiday', models.BooleanField(default=False, verbose_name='تعطیل رسمی')),
+                ('holiday_name', models.CharField(blank=True, max_length=100, verbose_name='مناسبت')),
+            ],
+            options={
+                'verbose_name': 'روز تقویم',
+                'verbose_name_plural': 'روزهای تقویم',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['jalali_year', 'jalali_month', 'jalali_day'], name='calendar_jalali_idx'), models.Index(fields=['jalali_year', 'jalali_week'], name='calendar_week_idx'), models.Index(fields=['is_holiday', 'date'], name='calendar_holiday_idx')],
+            },
+        ),
+        migrations.RunPython(fill_calendar, migrations.RunPython.noop),
+    ]
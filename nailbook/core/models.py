@@ -0,0 +1,94 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """کار پس‌زمینه در صف پایگاه‌داده (core.tasks)"""
+    STATUS_CHOICES = [
+        ('queued', 'در صف'),
+        ('running', 'در حال اجرا'),
+        ('done', 'انجام شده'),
+        ('failed', 'ناموفق'),
+    ]
+    PRIORITY_HIGH = 10
+    PRIORITY_NORMAL = 0
+    PRIORITY_LOW = -10
+
+    name = models.CharField(max_length=100, verbose_name='نام کار')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='آرگومان‌ها')
+    priority = models.SmallIntegerField(default=PRIORITY_NORMAL, verbose_name='اولویت')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name='وضعیت')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='تعداد تلاش')
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name='حداکثر تلاش')
+    run_after = models.DateTimeField(default=timezone.now, verbose_name='اجرا بعد از')
+
+    # رزرو worker؛ بعد از locked_until کار دوباره قابل برداشتن است
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name='رزرو تا')
+
+    last_error = models.TextField(blank=True, verbose_name='آخرین خطا')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='زمان پایان')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after'], name='task_claim_idx'),
+        ]
+        verbose_name = 'کار پس‌زمینه'
+        verbose_name_plural = 'کارهای پس‌زمینه'
+
+    def __str__(self):
+        return f"{self.name} - {self.get_status_display()}"
+
+
+class OutboxEvent(models.Model):
+    """رویداد دامنه که همراه تراکنش نوشتن ثبت و بعداً با relay_outbox تحویل می‌شود (core.outbox)"""
+    topic = models.CharField(max_length=64, verbose_name='موضوع')
+    object_id = models.BigIntegerField(verbose_name='شناسه شیء')
+    payload = models.JSONField(default=dict, blank=True, verbose_name='داده')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='زمان ثبت')
+
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name='زمان تحویل')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='تعداد تلاش ناموفق')
+    last_error = models.TextField(blank=True, verbose_name='آخرین خطا')
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # فقط رویدادهای تحویل‌نشده؛ relay همیشه از ابتدای این ایندکس می‌خواند
+            models.Index(fields=['id'], condition=models.Q(processed_at__isnull=True), name='outbox_pending_idx'),
+        ]
+        verbose_name = 'رویداد outbox'
+        verbose_name_plural = 'رویدادهای outbox'
+
+    def __str__(self):
+        return f"{self.topic} #{self.object_id}"
+
+
+class CalendarDay(models.Model):
+    """یک روز میلادی با ستون‌های تقویم شمسی برای فیلتر و join در SQL (core.calendar)"""
+    date = models.DateField(primary_key=True, verbose_name='تاریخ')
+    jalali_year = models.PositiveSmallIntegerField(verbose_name='سال شمسی')
+    jalali_month = models.PositiveSmallIntegerField(verbose_name='ماه شمسی')
+    jalali_day = models.PositiveSmallIntegerField(verbose_name='روز شمسی')
+    jalali_week = models.PositiveSmallIntegerField(verbose_name='هفته سال')
+    weekday = models.PositiveSmallIntegerField(verbose_name='روز هفته (شنبه = 0)')
+
+    is_weekend = models.BooleanField(default=False, verbose_name='جمعه')
+    is_holiday = models.BooleanField(default=False, verbose_name='تعطیل رسمی')
+    holiday_name = models.CharField(max_length=100, blank=True, verbose_name='مناسبت')
+
+    class Meta:
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['jalali_year', 'jalali_month', 'jalali_day'], name='calendar_jalali_idx'),
+            models.Index(fields=['jalali_year', 'jalali_week'], name='calendar_week_idx'),
+            models.Index(fields=['is_holiday', 'date'], name='calendar_holiday_idx'),
+        ]
+        verbose_name = 'روز تقویم'
+        verbose_name_plural = 'روزهای تقویم'
+
+    def __str__(self):
+        return f"{self.jalali_year}/{self.jalali_month:02d}/{self.jalali_day:02d}"
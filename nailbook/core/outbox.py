@@ -0,0 +1,150 @@
+"""
+صندوق خروجی (outbox) رویدادهای دامنه
+
+رویدادها با publish / publish_many در همان تراکنشی که مدل را می‌نویسد در جدول
+OutboxEvent ثبت می‌شوند؛ پس یا هر دو commit می‌شوند یا هیچ‌کدام، و مسیر
+درخواست فقط یک INSERT اضافه دارد. relay_outbox رویدادهای تحویل‌نشده را به
+ترتیب شناسه در دسته‌های OUTBOX_BATCH_SIZE تایی به handlerهای ثبت‌شده می‌دهد و
+بعد از موفقیت همه handlerها علامت تحویل می‌زند. تحویل «حداقل یک بار» است:
+handler باید تکرارپذیر باشد.
+
+اگر handlerی روی دسته خطا بدهد، دسته رویداد به رویداد تحویل می‌شود تا رویداد
+مشکل‌دار پیدا شود. relay پشت آن رویداد می‌ایستد (ترتیب حفظ می‌شود) و اجرای
+بعدی دوباره تلاش می‌کند؛ بعد از OUTBOX_MAX_ATTEMPTS تلاش رویداد با خطایش کنار
+گذاشته می‌شود تا بقیه صف قفل نماند.
+
+handlerها با دکوراتور @handler در ماژول outbox.py هر اپ ثبت می‌شوند. چون
+handlerها داخل تراکنش relay اجرا می‌شوند، کار کند (مثل ارسال پیامک) را باید
+به صف کارها (core.tasks) بسپارند.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+HANDLERS = []
+PUBLISH_BATCH_SIZE = 500
+
+
+def handler(*topics):
+    """ثبت تابع برای دریافت لیست رویدادهای topics ('*' برای همه)"""
+    def decorator(func):
+        HANDLERS.append((frozenset(topics), func))
+        return func
+    return decorator
+
+
+def publish(topic, object_id, payload=None):
+    """ثبت یک رویداد در تراکنش جاری"""
+    return OutboxEvent.objects.create(topic=topic, object_id=object_id, payload=payload or {})
+
+
+def publish_many(events):
+    """ثبت گروهی رویدادها از (topic، object_id، payload)"""
+    now = timezone.now()
+    return OutboxEvent.objects.bulk_create([
+        OutboxEvent(topic=topic, object_id=object_id, payload=payload or {}, created_at=now)
+        for topic, object_id, payload in events
+    ], batch_size=PUBLISH_BATCH_SIZE)
+
+
+def pending_events():
+    return OutboxEvent.objects.filter(processed_at__isnull=True).order_by('id')
+
+
+def _deliver(events):
+    """تحویل رویدادها به ترتیب شناسه به همه handlerهای مشترک"""
+    for topics, func in HANDLERS:
+        selected = [event for event in events if '*' in topics or event.topic in topics]
+        if selected:
+            func(selected)
+
+
+def _deliver_one_by_one(events, now):
+    """تحویل تک‌تک بعد از خطای دسته؛ خروجی (تحویل‌شده‌ها، کنارگذاشته‌ها، متوقف شد؟)"""
+    delivered, parked = [], []
+    for event in events:
+        try:
+            with transaction.atomic():
+                _deliver([event])
+        except Exception as e:
+            event.attempts += 1
+            event.last_error = repr(e)
+            if event.attempts < settings.OUTBOX_MAX_ATTEMPTS:
+                event.save(update_fields=['attempts', 'last_error'])
+                return delivered, parked, True
+            event.processed_at = now
+            event.save(update_fields=['attempts', 'last_error', 'processed_at'])
+            parked.append(event)
+        else:
+            delivered.append(event)
+    return delivered, parked, False
+
+
+def relay_batch(batch_size=None):
+    """تحویل یک دسته؛ خروجی تعداد تحویل‌شده، کنارگذاشته و اینکه relay پشت خطا ایستاده یا نه"""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    with transaction.atomic():
+        # قفل بدون skip_locked: دو relay همزمان نوبتی کار می‌کنند و ترتیب به هم نمی‌ریزد
+        events = list(pending_events().select_for_update()[:batch_size])
+        if not events:
+            return {'delivered': 0, 'parked': 0, 'blocked': False}
+        try:
+            with transaction.atomic():
+                _deliver(events)
+        except Exception:
+            delivered, parked, blocked = _deliver_one_by_one(events, now)
+        else:
+            delivered, parked, blocked = events, [], False
+        if delivered:
+            OutboxEvent.objects.filter(id__in=[event.id for event in delivered]).update(
+                processed_at=now, last_error=''
+            )
+    return {'delivered': len(delivered), 'parked': len(parked), 'blocked': blocked}
+
+
+def relay(batch_size=None, max_batches=None):
+    """تحویل دسته به دسته تا خالی شدن صف یا رسیدن به رویداد خطادار"""
+    totals = {'delivered': 0, 'parked': 0, 'blocked': False}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        result = relay_batch(batch_size)
+        totals['delivered'] += result['delivered']
+        totals['parked'] += result['parked']
+        totals['blocked'] = result['blocked']
+        batches += 1
+        if result['blocked'] or not (result['delivered'] or result['parked']):
+            break
+    return totals
+
+
+def outbox_stats(now=None):
+    """معیارهای تأخیر: تعداد در انتظار، سن قدیمی‌ترین و تأخیر آخرین تحویل (ثانیه)"""
+    now = now or timezone.now()
+    pending = pending_events()
+    oldest = pending.values_list('created_at', flat=True).first()
+    last = OutboxEvent.objects.filter(processed_at__isnull=False).order_by('-id').values(
+        'created_at', 'processed_at'
+    ).first()
+    return {
+        'pending': pending.count(),
+        'retrying': pending.filter(attempts__gt=0).count(),
+        'oldest_pending_seconds': round((now - oldest).total_seconds(), 3) if oldest else 0,
+        'last_delivery_lag_seconds': (
+            round((last['processed_at'] - last['created_at']).total_seconds(), 3) if last else None
+        ),
+    }
+
+
+def purge_processed_events(days=None):
+    """حذف رویدادهای تحویل‌شده قدیمی‌تر از OUTBOX_RETENTION_DAYS روز"""
+    days = settings.OUTBOX_RETENTION_DAYS if days is None else days
+    deleted, _ = OutboxEvent.objects.filter(
+        processed_at__lt=timezone.now() - timedelta(days=days), last_error=''
+    ).delete()
+    return deleted
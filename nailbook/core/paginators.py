@@ -0,0 +1,74 @@
+"""
+صفحه‌بندی جدول‌های بزرگ پنل مدیریت
+
+COUNT(*) دقیق روی جدولی با میلیون‌ها ردیف در هر بار باز کردن changelist
+کل جدول را اسکن می‌کند. وقتی لیست فیلتر نشده است تعداد تخمینی از آمار خود
+پایگاه‌داده خوانده می‌شود و وقتی فیلتر شده است شمارش در سقف threshold متوقف
+می‌شود، پس هزینه شمارش به اندازه جدول بستگی ندارد. display_count این دو حالت
+را در پنل مدیریت مشخص می‌کند («حدود ...» و «100,000+») تا عدد دقیق به نظر نرسد.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATED_COUNT_THRESHOLD = 100_000
+
+
+def estimate_row_count(model, using='default'):
+    """تعداد تقریبی ردیف‌های جدول از آمار پایگاه‌داده یا None"""
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s',
+                [model._meta.db_table],
+            )
+        elif connection.vendor == 'sqlite':
+            # MAX(rowid) از انتهای B-tree خوانده می‌شود
+            cursor.execute(f'SELECT MAX(rowid) FROM {table}')
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator با شمارش تخمینی/سقف‌دار برای جدول‌های بزرگ"""
+
+    threshold = ESTIMATED_COUNT_THRESHOLD
+    count_is_estimated = False
+    count_is_capped = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.threshold:
+                self.count_is_estimated = True
+                return estimate
+
+        # شمارش با LIMIT تا اسکن لیست‌های فیلترشده بزرگ هم محدود بماند
+        count = queryset.order_by()[:self.threshold + 1].count()
+        self.count_is_capped = count > self.threshold
+        return count
+
+    @property
+    def display_count(self):
+        """تعداد برای نمایش؛ تخمینی با «حدود» و سقف‌دار با «+»"""
+        count = self.count
+        if self.count_is_capped:
+            return f'{self.threshold:,}+'
+        if self.count_is_estimated:
+            return f'حدود {count:,}'
+        return str(count)
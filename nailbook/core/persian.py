@@ -0,0 +1,106 @@
+"""
+نرمال‌سازی متن فارسی برای جستجو و نمایش اعداد فارسی
+
+ورودی کاربران ترکیبی از حروف عربی و فارسی (ي/ی، ك/ک)، نیم‌فاصله، اعراب و
+ارقام فارسی/عربی است. normalize_text همه این حالت‌ها را به یک شکل واحد
+می‌برد تا توکن‌ها و سه‌حرفی‌های (trigrams) ذخیره شده و عبارت جستجو با هم
+قابل مقایسه باشند.
+
+در جهت عکس، to_persian_digits، format_price و format_duration ارقام و
+جداکننده‌ها را با جدول‌های str.translate از پیش ساخته شده (یک گذر روی رشته)
+به شکل نمایشی برمی‌گردانند؛ رشته هر مبلغ و مدت زمان در یک کش LRU نگه داشته
+می‌شود چون صفحه‌ها همان چند قیمت و مدت خدمات را بارها نمایش می‌دهند.
+"""
+
+import re
+from functools import lru_cache
+
+# حروف عربی به فارسی و ارقام فارسی/عربی به لاتین
+_CHAR_MAP = str.maketrans({
+    'ي': 'ی',
+    'ى': 'ی',
+    'ئ': 'ی',
+    'ك': 'ک',
+    'ة': 'ه',
+    'ۀ': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ٱ': 'ا',
+    'آ': 'ا',
+    'ؤ': 'و',
+    '\u200c': ' ',  # نیم‌فاصله
+    '\u200f': None,
+    '\u200e': None,
+    'ـ': None,  # کشیده
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+
+# اعراب (فتحه، کسره، تنوین، تشدید و ...)
+_DIACRITICS = re.compile('[\u064b-\u065f\u0670]')
+_TOKEN_SPLIT = re.compile(r'[^\w]+')
+
+MAX_TOKEN_LENGTH = 64
+
+
+def normalize_text(value):
+    """شکل یکسان متن برای مقایسه: حروف فارسی، ارقام لاتین، بدون اعراب و با حروف کوچک"""
+    if not value:
+        return ''
+    value = _DIACRITICS.sub('', str(value).translate(_CHAR_MAP))
+    return value.lower().strip()
+
+
+def tokenize(*values):
+    """مجموعه توکن‌های نرمال‌شده همه مقادیر"""
+    tokens = set()
+    for value in values:
+        for token in _TOKEN_SPLIT.split(normalize_text(value)):
+            token = token.strip('_')
+            if token:
+                tokens.add(token[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+def trigrams(*values):
+    """
+    سه‌حرفی‌های نرمال‌شده همه کلمه‌ها، مثل pg_trgm
+
+    هر کلمه با دو فاصله در ابتدا و یک فاصله در انتها پد می‌شود تا ابتدای
+    کلمه و کلمه‌های یک یا دو حرفی هم سه‌حرفی داشته باشند.
+    """
+    grams = set()
+    for value in values:
+        for word in _TOKEN_SPLIT.split(normalize_text(value)):
+            word = word.strip('_')[:MAX_TOKEN_LENGTH]
+            if word:
+                padded = f'  {word} '
+                grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+PERSIAN_DIGITS = str.maketrans('0123456789', '۰۱۲۳۴۵۶۷۸۹')
+# جداکننده هزارگان فرمت پایتون (,) به ویرگول فارسی
+_PRICE_LATIN = str.maketrans(',', '،')
+_PRICE_PERSIAN = str.maketrans({',': '،', **{str(i): chr(0x06F0 + i) for i in range(10)}})
+
+FORMAT_CACHE_SIZE = 1024
+
+
+def to_persian_digits(value):
+    """ارقام لاتین متن به ارقام فارسی"""
+    return str(value).translate(PERSIAN_DIGITS)
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def format_price(price, persian_digits=False):
+    """مبلغ صحیح با جداکننده هزارگان (،)"""
+    return f'{price:,}'.translate(_PRICE_PERSIAN if persian_digits else _PRICE_LATIN)
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def format_duration(minutes, persian_digits=False):
+    """مدت زمان دقیقه‌ای به شکل «1 ساعت و 30 دقیقه»"""
+    hours, minutes = divmod(minutes, 60)
+    text = f'{hours} ساعت و {minutes} دقیقه' if hours else f'{minutes} دقیقه'
+    return text.translate(PERSIAN_DIGITS) if persian_digits else text
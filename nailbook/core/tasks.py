@@ -0,0 +1,161 @@
+"""
+صف کارهای پس‌زمینه روی پایگاه‌داده
+
+کارهای غیرضروری مسیر درخواست (تغییر نقش کاربر، پیامک تایید رزرو و ...) با
+enqueue در جدول Task ثبت می‌شوند و همراه تراکنش همان درخواست commit می‌شوند.
+worker (manage.py run_tasks) کارها را به ترتیب اولویت و run_after در دسته‌های
+TASK_BATCH_SIZE تایی با یک توکن رزرو برمی‌دارد (core.claims) و هر کار را تا
+TASK_VISIBILITY_TIMEOUT ثانیه نگه می‌دارد؛ رزرو هر کار درست پیش از اجرایش
+تمدید می‌شود تا کارهای کند اول دسته باعث برداشته شدن بقیه دسته نشوند. کاری که
+در این مدت تمام نشود دوباره قابل برداشتن است و worker قبلی آن را اجرا
+نمی‌کند، پس کارها باید تکرارپذیر باشند. خطا باعث تلاش دوباره با تأخیر نمایی (TASK_RETRY_BACKOFF × 2^n)
+تا max_attempts بار می‌شود.
+
+کارها با دکوراتور @task در ماژول tasks.py هر اپ ثبت می‌شوند (CoreConfig.ready).
+"""
+
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .claims import claim_rows
+from .models import Task
+
+TASKS = {}
+CLAIM_ORDER = ('-priority', 'run_after', 'id')
+
+
+def task(name):
+    """ثبت تابع به عنوان کار پس‌زمینه با نام name"""
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, priority=Task.PRIORITY_NORMAL, delay=0, max_attempts=None):
+    """افزودن کار به صف؛ payload باید قابل تبدیل به JSON باشد"""
+    if name not in TASKS:
+        raise ValueError(f'کار ناشناخته: {name}')
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def enqueue_many(name, payloads, priority=Task.PRIORITY_NORMAL, max_attempts=None):
+    """افزودن گروهی یک کار با payloadهای مختلف"""
+    if name not in TASKS:
+        raise ValueError(f'کار ناشناخته: {name}')
+    now = timezone.now()
+    max_attempts = max_attempts or settings.TASK_MAX_ATTEMPTS
+    return Task.objects.bulk_create([
+        Task(name=name, payload=payload, priority=priority, run_after=now, max_attempts=max_attempts)
+        for payload in payloads
+    ], batch_size=500)
+
+
+def claim_tasks(batch_size=None, visibility_timeout=None, now=None):
+    """رزرو یک دسته از کارهای آماده؛ خروجی (توکن، لیست کارها)"""
+    now = now or timezone.now()
+    batch_size = batch_size or settings.TASK_BATCH_SIZE
+    visibility_timeout = visibility_timeout or settings.TASK_VISIBILITY_TIMEOUT
+    token = uuid.uuid4()
+    claimable = Q(status='queued', run_after__lte=now) | Q(status='running', locked_until__lt=now)
+
+    claim_rows(
+        Task.objects.order_by(*CLAIM_ORDER), claimable, batch_size,
+        status='running',
+        claim=token,
+        locked_until=now + timedelta(seconds=visibility_timeout),
+        attempts=F('attempts') + 1,
+    )
+    return token, list(Task.objects.filter(claim=token).order_by(*CLAIM_ORDER))
+
+
+def _record_failure(task_obj, token, error, now):
+    """تلاش دوباره با تأخیر نمایی یا ناموفق نهایی بعد از max_attempts"""
+    fields = {'claim': None, 'locked_until': None, 'last_error': error}
+    if task_obj.attempts >= task_obj.max_attempts:
+        fields.update(status='failed', finished_at=now)
+    else:
+        delay = settings.TASK_RETRY_BACKOFF * 2 ** (task_obj.attempts - 1)
+        fields.update(status='queued', run_after=now + timedelta(seconds=delay))
+    # فقط اگر رزرو هنوز مال این worker باشد
+    Task.objects.filter(id=task_obj.id, claim=token).update(**fields)
+    return fields['status']
+
+
+def extend_claim(task_obj, token, visibility_timeout=None):
+    """تمدید رزرو یک کار؛ False اگر رزرو تمام شده و worker دیگری کار را برداشته است"""
+    visibility_timeout = visibility_timeout or settings.TASK_VISIBILITY_TIMEOUT
+    return bool(Task.objects.filter(id=task_obj.id, claim=token).update(
+        locked_until=timezone.now() + timedelta(seconds=visibility_timeout)
+    ))
+
+
+def run_claimed(token, tasks, visibility_timeout=None):
+    """اجرای کارهای یک دسته رزرو شده؛ خروجی تعداد done / retried / failed"""
+    result = {'done': 0, 'retried': 0, 'failed': 0}
+    done_ids = []
+    for task_obj in tasks:
+        if not extend_claim(task_obj, token, visibility_timeout):
+            # کارهای قبلی دسته از زمان رزرو گذشتند و این کار مال worker دیگری است
+            continue
+        func = TASKS.get(task_obj.name)
+        if func is None:
+            error = f'کار ناشناخته: {task_obj.name}'
+        elif task_obj.attempts > task_obj.max_attempts:
+            # بعد از آخرین تلاش، زمان رزرو worker قبلی تمام شده بود
+            error = task_obj.last_error or 'زمان اجرا به پایان رسید'
+        else:
+            try:
+                with transaction.atomic():
+                    func(**task_obj.payload)
+            except Exception as e:
+                error = ''.join(traceback.format_exception_only(e)).strip()
+            else:
+                done_ids.append(task_obj.id)
+                continue
+        status = _record_failure(task_obj, token, error, timezone.now())
+        result['retried' if status == 'queued' else 'failed'] += 1
+
+    if done_ids:
+        Task.objects.filter(id__in=done_ids, claim=token).update(
+            status='done', claim=None, locked_until=None, last_error='', finished_at=timezone.now()
+        )
+        result['done'] = len(done_ids)
+    return result
+
+
+def run_tasks(batch_size=None, visibility_timeout=None, max_batches=None):
+    """برداشتن و اجرای دسته به دسته تا وقتی کار آماده‌ای باقی است"""
+    totals = {'claimed': 0, 'done': 0, 'retried': 0, 'failed': 0}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        token, tasks = claim_tasks(batch_size, visibility_timeout)
+        if not tasks:
+            break
+        result = run_claimed(token, tasks, visibility_timeout)
+        totals['claimed'] += len(tasks)
+        for key, value in result.items():
+            totals[key] += value
+        batches += 1
+    return totals
+
+
+def purge_finished_tasks(days=None):
+    """حذف کارهای انجام شده قدیمی‌تر از TASK_RETENTION_DAYS روز"""
+    days = settings.TASK_RETENTION_DAYS if days is None else days
+    deleted, _ = Task.objects.filter(
+        status='done', finished_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
@@ -0,0 +1,71 @@
+"""
+کامپایل و گرم کردن قالب‌های پروژه
+
+compile_templates همه فایل‌های پوشه‌های قالب پروژه (TEMPLATES['DIRS'] و
+پوشه templates اپ‌های داخل BASE_DIR) را با موتور Django پارس می‌کند. چون
+loaderها در settings پشت cached.Loader هستند، هر قالب پارس شده در کش همان
+پروسه می‌ماند؛ wsgi.py با TEMPLATE_WARMUP این کار را هنگام بالا آمدن worker
+انجام می‌دهد تا هیچ درخواستی هزینه پارس را نپردازد. دستور compile_templates
+همین تابع را در مرحله build اجرا می‌کند و با خطای syntax، فیلتر یا
+کتابخانه ناشناخته، یا extends / include به قالب ناموجود شکست می‌خورد.
+"""
+
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+
+def project_template_dirs(engine):
+    """پوشه‌های قالب پروژه؛ قالب‌های پکیج‌های نصب شده (مثل admin) بررسی نمی‌شوند"""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    dirs = []
+    for loader in engine.template_loaders:
+        # cached.Loader پوشه‌های loaderهای داخلی خودش را برمی‌گرداند
+        for directory in loader.get_dirs() if hasattr(loader, 'get_dirs') else []:
+            directory = Path(directory).resolve()
+            if (directory.is_relative_to(base_dir) and 'site-packages' not in directory.parts
+                    and directory not in dirs):
+                dirs.append(directory)
+    return dirs
+
+
+def template_names(directory):
+    """نام نسبی همه فایل‌های قالب یک پوشه"""
+    for root, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for filename in sorted(filenames):
+            if not filename.startswith('.'):
+                yield Path(root, filename).relative_to(directory).as_posix()
+
+
+def _referenced_templates(template):
+    """نام قالب‌های extends / include که به صورت رشته ثابت آمده‌اند"""
+    nodelist = template.template.nodelist
+    for node in nodelist.get_nodes_by_type(ExtendsNode):
+        if isinstance(node.parent_name.var, str):
+            yield node.parent_name.var
+    for node in nodelist.get_nodes_by_type(IncludeNode):
+        if isinstance(node.template.var, str):
+            yield node.template.var
+
+
+def compile_templates(engine=None):
+    """پارس (و کش) همه قالب‌های پروژه؛ خروجی (تعداد، لیست (نام، خطا))"""
+    engine = engine or engines['django']
+    compiled, errors = 0, []
+    for directory in project_template_dirs(engine.engine):
+        for name in template_names(directory):
+            try:
+                template = engine.get_template(name)
+                for referenced in _referenced_templates(template):
+                    engine.get_template(referenced)
+            except TemplateDoesNotExist as e:
+                errors.append((name, f'قالب ناموجود: {e}'))
+            except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                errors.append((name, str(e)))
+            else:
+                compiled += 1
+    return compiled, errors
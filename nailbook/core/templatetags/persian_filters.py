@@ -0,0 +1,202 @@
+"""
+فیلترهای تاریخ شمسی و قیمت قالب‌ها
+
+صفحه‌های لیستی همان چند تاریخ را صدها بار نمایش می‌دهند؛ پس تبدیل میلادی به
+شمسی و رشته فرمت‌شده هر (تاریخ، فرمت) در یک کش LRU محدود نگه داشته می‌شود و
+برای datetimeها فقط بخش تاریخ تبدیل و ساعت به آن چسبانده می‌شود. فیلترهای
+تاریخ با expects_localtime مقدار datetime را به وقت محلی (TIME_ZONE) می‌گیرند.
+"""
+
+from functools import lru_cache
+
+from django import template
+from django.utils import timezone
+import jdatetime
+
+from core import persian
+from datetime import datetime, date, time
+
+register = template.Library()
+
+CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def to_jalali(value):
+    """تاریخ شمسی یک date میلادی"""
+    return jdatetime.date.fromgregorian(date=value)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def format_jalali(value, format_string):
+    """رشته فرمت‌شده شمسی یک date میلادی"""
+    return to_jalali(value).strftime(format_string)
+
+
+def format_jalali_datetime(value, format_string):
+    j_date = to_jalali(value.date())
+    return jdatetime.datetime(
+        j_date.year, j_date.month, j_date.day,
+        value.hour, value.minute, value.second, value.microsecond, value.tzinfo,
+    ).strftime(format_string)
+
+
+def clear_caches():
+    to_jalali.cache_clear()
+    format_jalali.cache_clear()
+    persian.format_price.cache_clear()
+    persian.format_duration.cache_clear()
+
+
+@register.filter(expects_localtime=True)
+def persian_date(value, format_string="%Y/%m/%d"):
+    """تبدیل تاریخ میلادی به شمسی"""
+    if not value:
+        return ""
+    
+    if isinstance(value, str):
+        return value
+    
+    if isinstance(value, datetime):
+        return format_jalali_datetime(value, format_string)
+    elif isinstance(value, date):
+        return format_jalali(value, format_string)
+    
+    return value
+
+@register.filter(expects_localtime=True)
+def persian_datetime(value, format_string="%Y/%m/%d - %H:%M"):
+    """تبدیل تاریخ و زمان میلادی به شمسی"""
+    if not value:
+        return ""
+    
+    if isinstance(value, str):
+        return value
+    
+    if isinstance(value, datetime):
+        return format_jalali_datetime(value, format_string)
+    
+    return value
+
+@register.filter
+def persian_time(value, format_string="%H:%M"):
+    """فرمت زمان"""
+    if not value:
+        return ""
+    
+    if isinstance(value, str):
+        return value
+    
+    if isinstance(value, (datetime, time)):
+        if isinstance(value, datetime):
+            return value.strftime(format_string)
+        else:
+            return value.strftime(format_string)
+    
+    return value
+
+@register.filter(expects_localtime=True)
+def persian_weekday(value):
+    """نام روز هفته به فارسی"""
+    if not value:
+        return ""
+    
+    weekdays = {
+        0: 'دوشنبه',
+        1: 'سه‌شنبه', 
+        2: 'چهارشنبه',
+        3: 'پنج‌شنبه',
+        4: 'جمعه',
+        5: 'شنبه',
+        6: 'یکشنبه'
+    }
+    
+    # روز هفته در دو تقویم یکی است؛ weekdays بر اساس weekday() میلادی است
+    if isinstance(value, date):
+        return weekdays.get(value.weekday(), '')
+    
+    return value
+
+@register.filter(expects_localtime=True)
+def persian_month_name(value):
+    """نام ماه شمسی"""
+    if not value:
+        return ""
+    
+    months = {
+        1: 'فروردین', 2: 'اردیبهشت', 3: 'خرداد',
+        4: 'تیر', 5: 'مرداد', 6: 'شهریور',
+        7: 'مهر', 8: 'آبان', 9: 'آذر',
+        10: 'دی', 11: 'بهمن', 12: 'اسفند'
+    }
+    
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return months.get(to_jalali(value).month, '')
+    
+    return value
+
+@register.filter
+def time_until(value):
+    """زمان باقی‌مانده تا تاریخ مشخص"""
+    if not value:
+        return ""
+    
+    if isinstance(value, datetime):
+        now = timezone.now()
+        diff = value - now
+        
+        if diff.days > 0:
+            return f"{diff.days} روز"
+        elif diff.seconds > 3600:
+            hours = diff.seconds // 3600
+            return f"{hours} ساعت"
+        elif diff.seconds > 60:
+            minutes = diff.seconds // 60
+            return f"{minutes} دقیقه"
+        else:
+            return "کمتر از یک دقیقه"
+    
+    return value
+
+def _price(value):
+    # PositiveIntegerField بدون تبدیل؛ Decimal، float و رشته از مسیر قبلی
+    return value if type(value) is int else int(float(value))
+
+@register.filter
+def format_price(value):
+    """فرمت قیمت با جداکننده هزارگان"""
+    if not value:
+        return "0"
+    
+    try:
+        return persian.format_price(_price(value))
+    except (ValueError, TypeError):
+        return value
+
+@register.filter
+def persian_price(value):
+    """قیمت با جداکننده هزارگان و ارقام فارسی"""
+    if not value:
+        return "۰"
+    
+    try:
+        return persian.format_price(_price(value), persian_digits=True)
+    except (ValueError, TypeError):
+        return value
+
+@register.filter(is_safe=True)
+def persian_digits(value):
+    """تبدیل ارقام لاتین به فارسی"""
+    if value is None or value == "":
+        return ""
+    return persian.to_persian_digits(value)
+
+@register.filter
+def persian_duration(value):
+    """مدت زمان دقیقه‌ای با ارقام فارسی"""
+    try:
+        return persian.format_duration(int(value), persian_digits=True)
+    except (ValueError, TypeError):
+        return value
@@ -0,0 +1,63 @@
+"""
+داده‌های مشترک تست‌ها
+
+بیشتر تست‌ها یک مسئول، سالن، کارمند، خدمت و مشتری لازم دارند. SalonTestData
+آن‌ها را در setUpTestData می‌سازد و کلاس تست فقط فیلدهای متفاوت (salon_fields،
+staff_fields، service_fields، customer_fields) و داده‌های اضافه خودش را تعریف
+می‌کند. تابع‌های create_* برای تست‌هایی است که چند سالن یا کارمند می‌سازند.
+"""
+
+from datetime import timedelta, time
+
+from django.utils import timezone
+
+from accounts.models import User
+from appointments.models import Appointment
+from salons.models import Salon, Staff
+from services.models import Service
+
+
+def create_user(username, role, phone, **fields):
+    return User.objects.create_user(username, password='pass', role=role, phone=phone, **fields)
+
+
+def create_salon(owner, **fields):
+    return Salon.objects.create(**{'name': 'سالن', 'owner': owner, 'phone': '021', 'address': 'تهران', **fields})
+
+
+def create_staff(salon, username='staff', phone='09120000002', **user_fields):
+    return Staff.objects.create(user=create_user(username, 'staff', phone, **user_fields), salon=salon)
+
+
+def create_service(salon, **fields):
+    return Service.objects.create(**{'salon': salon, 'name': 'مانیکور', 'price': 200000, 'duration': 30, **fields})
+
+
+class SalonTestData:
+    """mixin برای TestCase: owner، salon، staff_user، staff، service و customer"""
+
+    salon_fields = {}
+    staff_fields = {}
+    service_fields = {}
+    customer_fields = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.owner = create_user('owner', 'salon_owner', '09120000001')
+        cls.salon = create_salon(cls.owner, **cls.salon_fields)
+        cls.staff = create_staff(cls.salon, **cls.staff_fields)
+        cls.staff_user = cls.staff.user
+        cls.service = create_service(cls.salon, **cls.service_fields)
+        cls.customer = create_user(**{'username': 'customer', 'role': 'customer', 'phone': '09120000003',
+                                      **cls.customer_fields})
+
+    @classmethod
+    def create_appointment(cls, hour=10, day=None, **fields):
+        """نوبت مشتری پیش‌فرض در ساعت hour روز day (پیش‌فرض فردا)"""
+        return Appointment.objects.create(**{
+            'salon': cls.salon, 'customer': cls.customer, 'staff': cls.staff, 'service': cls.service,
+            'appointment_date': day or timezone.localdate() + timedelta(days=1),
+            'appointment_time': time(hour), 'total_price': cls.service.price,
+            **fields,
+        })
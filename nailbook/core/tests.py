@@ -0,0 +1,466 @@
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+import jdatetime
+import numpy as np
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from appointments.models import Appointment
+from notifications.models import SmsMessage
+from salons.models import Staff
+from . import persian
+from .calendar import build_calendar, read_holidays
+from .checks import check_shared_cache
+from .models import CalendarDay, OutboxEvent, Task
+from .paginators import EstimatedCountPaginator
+from .jalali import format_date, format_dates, jalali_months, ordinals_to_jalali, to_jalali
+from .templatetags import persian_filters
+from .outbox import HANDLERS, outbox_stats, publish, relay
+from .tasks import claim_tasks, enqueue, run_claimed, run_tasks, task
+from .testing import create_salon, create_service, create_staff, create_user
+
+CALLS = []
+
+
+@task('core.tests.record')
+def record_call(value):
+    CALLS.append(value)
+
+
+@task('core.tests.fail')
+def always_fail():
+    raise ValueError('boom')
+
+
+class SharedCacheCheckTests(TestCase):
+    """کش داخل پروسه بدون DEBUG خطای core.E001 می‌دهد"""
+
+    LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    REDIS = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://x'}}
+
+    def test_process_local_cache_is_an_error_when_required(self):
+        with override_settings(CACHES=self.LOCMEM, CACHE_REQUIRE_SHARED=True):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['core.E001'])
+        with override_settings(CACHES=self.REDIS, CACHE_REQUIRE_SHARED=True):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES=self.LOCMEM, CACHE_REQUIRE_SHARED=False):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+@override_settings(TASK_RETRY_BACKOFF=10, TASK_MAX_ATTEMPTS=2)
+class TaskQueueTests(TestCase):
+    """صف کارهای پس‌زمینه: اولویت، تلاش دوباره و زمان رزرو"""
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_runs_by_priority_and_marks_done(self):
+        enqueue('core.tests.record', {'value': 'low'}, priority=Task.PRIORITY_LOW)
+        enqueue('core.tests.record', {'value': 'high'}, priority=Task.PRIORITY_HIGH)
+        enqueue('core.tests.record', {'value': 'later'}, delay=60)
+
+        totals = run_tasks()
+        self.assertEqual(CALLS, ['high', 'low'])
+        self.assertEqual(totals, {'claimed': 2, 'done': 2, 'retried': 0, 'failed': 0})
+        self.assertEqual(Task.objects.filter(status='done').count(), 2)
+        self.assertEqual(Task.objects.get(status='queued').payload, {'value': 'later'})
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue('core.tests.missing')
+
+    def test_failures_retry_with_backoff_then_fail(self):
+        failing = enqueue('core.tests.fail')
+
+        self.assertEqual(run_tasks()['retried'], 1)
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), ('queued', 1))
+        self.assertIn('boom', failing.last_error)
+        self.assertGreater(failing.run_after, timezone.now() + timedelta(seconds=5))
+
+        Task.objects.update(run_after=timezone.now())
+        self.assertEqual(run_tasks()['failed'], 1)
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), ('failed', 2))
+
+    def test_claimed_tasks_are_hidden_until_visibility_timeout(self):
+        enqueue('core.tests.record', {'value': 'once'})
+        first_token, first = claim_tasks(visibility_timeout=30)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(claim_tasks()[1], [])
+
+        # worker اول از کار افتاده؛ بعد از پایان رزرو کار دوباره برداشته می‌شود
+        second_token, second = claim_tasks(now=timezone.now() + timedelta(seconds=31))
+        self.assertEqual([t.id for t in second], [first[0].id])
+
+        # worker اول رزروش را از دست داده و کار را اجرا نمی‌کند
+        run_claimed(first_token, first)
+        self.assertEqual((Task.objects.get().status, CALLS), ('running', []))
+        run_claimed(second_token, second)
+        self.assertEqual((Task.objects.get().status, CALLS), ('done', ['once']))
+
+    def test_claim_is_extended_before_each_task(self):
+        for value in ['slow', 'next']:
+            enqueue('core.tests.record', {'value': value})
+        token, tasks = claim_tasks(visibility_timeout=30)
+        # کار اول دسته طول کشیده و رزرو اولیه کار دوم به پایان رسیده است
+        Task.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(claim_tasks(batch_size=1, visibility_timeout=30)[1][0].id, tasks[0].id)
+
+        self.assertEqual(run_claimed(token, tasks, visibility_timeout=30)['done'], 1)
+        self.assertEqual(CALLS, ['next'])
+        running = Task.objects.get(status='running')
+        self.assertEqual(running.id, tasks[0].id)
+        self.assertEqual(claim_tasks()[1], [])
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=2)
+class OutboxTests(TestCase):
+    """تحویل مرتب و حداقل یک بار رویدادهای outbox"""
+
+    def setUp(self):
+        self.received = []
+        self.failing_ids = set()
+        self.handler = (frozenset({'test.event'}), self.receive)
+        HANDLERS.append(self.handler)
+
+    def tearDown(self):
+        HANDLERS.remove(self.handler)
+
+    def receive(self, events):
+        for event in events:
+            if event.object_id in self.failing_ids:
+                raise RuntimeError('handler down')
+        self.received.extend(event.object_id for event in events)
+
+    def test_events_roll_back_with_the_transaction(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            publish('test.event', 1)
+            raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_relays_in_order_and_marks_delivered(self):
+        for object_id in range(1, 6):
+            publish('test.event', object_id)
+        publish('other.event', 99)
+
+        self.assertEqual(relay(batch_size=2), {'delivered': 6, 'parked': 0, 'blocked': False})
+        self.assertEqual(self.received, [1, 2, 3, 4, 5])
+        self.assertEqual(outbox_stats()['pending'], 0)
+        self.assertIsNotNone(outbox_stats()['last_delivery_lag_seconds'])
+
+    def test_failing_event_blocks_then_is_parked(self):
+        for object_id in range(1, 4):
+            publish('test.event', object_id)
+        self.failing_ids = {2}
+
+        self.assertEqual(relay(), {'delivered': 1, 'parked': 0, 'blocked': True})
+        self.assertEqual(self.received, [1])
+        stats = outbox_stats()
+        self.assertEqual((stats['pending'], stats['retrying']), (2, 1))
+
+        # تلاش دوم به OUTBOX_MAX_ATTEMPTS می‌رسد و صف ادامه پیدا می‌کند
+        self.assertEqual(relay(), {'delivered': 1, 'parked': 1, 'blocked': False})
+        self.assertEqual(self.received, [1, 3])
+        self.assertIn('handler down', OutboxEvent.objects.get(object_id=2).last_error)
+
+
+class BookingTaskTests(TestCase):
+    """کارهای جانبی رزرو در صف ثبت و بیرون از درخواست اجرا می‌شوند"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salon = create_salon(create_user('owner', 'salon_owner', '09120000001'), name='سالن تست')
+        cls.staff_user = create_user('staff', 'customer', '09120000002')
+        cls.service = create_service(cls.salon, name='ژل‌لاک', price=300000, duration=60)
+
+    def test_role_changes_apply_immediately_without_tasks(self):
+        staff = Staff.objects.create(user=self.staff_user, salon=self.salon)
+        self.assertEqual(User.objects.get(pk=self.staff_user.pk).role, 'staff')
+        self.client.force_login(self.staff_user)
+        self.assertEqual(self.client.get(reverse('salons:staff_dashboard')).status_code, 200)
+
+        owner = self.salon.owner
+        appointment = Appointment.objects.create(
+            salon=self.salon, customer=owner, staff=staff, service=self.service,
+            appointment_date=timezone.localdate() + timedelta(days=1), appointment_time=time(10),
+        )
+        appointment.notes = 'یادداشت'
+        appointment.save()
+        self.assertEqual(User.objects.get(pk=owner.pk).role, 'customer')
+        self.assertFalse(Task.objects.filter(name='accounts.set_role').exists())
+
+    def test_booking_enqueues_confirmation_sms(self):
+        self.staff_user.role = 'staff'
+        self.staff_user.save()
+        staff = Staff.objects.create(user=self.staff_user, salon=self.salon)
+        response = self.client.post(reverse('appointments:quick_book', args=[self.salon.id]), {
+            'customer_name': 'سارا',
+            'customer_phone': '09123334444',
+            'service_id': self.service.id,
+            'staff_id': staff.id,
+            'appointment_date': (timezone.localdate() + timedelta(days=2)).isoformat(),
+            'appointment_time': '11:00',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(SmsMessage.objects.exists())
+        self.assertEqual(OutboxEvent.objects.get().topic, 'appointment.created')
+
+        relay()
+        self.assertTrue(Task.objects.filter(
+            name='notifications.booking_confirmation', priority=Task.PRIORITY_HIGH
+        ).exists())
+        run_tasks()
+        message = SmsMessage.objects.get()
+        self.assertEqual((message.kind, message.phone, message.status), ('confirmation', '09123334444', 'sent'))
+        self.assertTrue(message.appointment.sms_sent)
+
+        # کار تکراری دوباره پیامک نمی‌فرستد
+        enqueue('notifications.booking_confirmation', {'appointment_id': message.appointment_id})
+        run_tasks()
+        self.assertEqual(SmsMessage.objects.count(), 1)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """شمارش تخمینی و سقف‌دار changelist و نمایش آن در پنل مدیریت"""
+
+    def paginator(self, queryset, threshold=3):
+        paginator = EstimatedCountPaginator(queryset, 10)
+        paginator.threshold = threshold
+        return paginator
+
+    def test_unfiltered_count_uses_the_table_estimate(self):
+        tasks = [Task.objects.create(name='core.tests.record') for _ in range(6)]
+        tasks[0].delete()
+
+        # MAX(rowid) در sqlite؛ ردیف حذف شده در تخمین هنوز حساب می‌شود
+        paginator = self.paginator(Task.objects.all())
+        self.assertEqual(paginator.count, 6)
+        self.assertEqual((paginator.count_is_estimated, paginator.count_is_capped), (True, False))
+        self.assertEqual(paginator.display_count, 'حدود 6')
+
+        paginator = self.paginator(Task.objects.all(), threshold=10)
+        self.assertEqual((paginator.count, paginator.display_count), (5, '5'))
+        self.assertFalse(paginator.count_is_estimated)
+
+    def test_filtered_count_is_capped(self):
+        for status in ['queued'] * 5 + ['done']:
+            Task.objects.create(name='core.tests.record', status=status)
+
+        paginator = self.paginator(Task.objects.filter(status='queued'))
+        self.assertEqual(paginator.count, 4)
+        self.assertEqual((paginator.count_is_estimated, paginator.count_is_capped), (False, True))
+        self.assertEqual(paginator.display_count, '3+')
+
+        paginator = self.paginator(Task.objects.filter(status='done'))
+        self.assertEqual((paginator.count, paginator.display_count), (1, '1'))
+        self.assertFalse(paginator.count_is_capped)
+
+    def test_admin_changelist_shows_approximate_counts(self):
+        salon = create_salon(create_user('owner', 'salon_owner', '09120000001'))
+        staff = create_staff(salon)
+        service = create_service(salon)
+        customer = create_user('customer', 'customer', '09120000003')
+        Appointment.objects.bulk_create([
+            Appointment(
+                salon=salon, customer=customer, staff=staff, service=service,
+                appointment_date=date(2026, 3, 10), appointment_time=time(9 + hour), total_price=200000,
+            )
+            for hour in range(5)
+        ])
+        self.client.force_login(User.objects.create_superuser('admin', password='pass', phone='09120000000'))
+        url = reverse('admin:appointments_appointment_changelist')
+
+        with mock.patch.object(EstimatedCountPaginator, 'threshold', 3):
+            self.assertContains(self.client.get(url), 'حدود 5 نوبت‌ها')
+            response = self.client.get(url, {'status__exact': 'pending'})
+        self.assertContains(response, '3+ نتیجه')
+        self.assertContains(response, '3+ نوبت‌ها')
+        self.assertNotContains(response, '4 نتیجه')
+
+
+class PersianFilterTests(TestCase):
+    """فیلترهای تاریخ شمسی با کش تبدیل"""
+
+    def setUp(self):
+        persian_filters.clear_caches()
+
+    def test_matches_jdatetime(self):
+        day = date(2024, 3, 20)
+        for offset in range(400):
+            value = day + timedelta(days=offset)
+            expected = jdatetime.date.fromgregorian(date=value)
+            self.assertEqual(persian_filters.persian_date(value), expected.strftime('%Y/%m/%d'))
+            self.assertEqual(persian_filters.persian_date(value, '%d %B'), expected.strftime('%d %B'))
+        self.assertEqual(persian_filters.persian_weekday(date(2026, 10, 17)), 'شنبه')
+        self.assertEqual(persian_filters.persian_month_name(date(2026, 3, 21)), 'فروردین')
+
+    def test_repeated_dates_hit_the_cache(self):
+        template = Template(
+            '{% load persian_filters %}{% for d in dates %}{{ d|persian_date }} {% endfor %}'
+        )
+        output = template.render(Context({'dates': [date(2026, 1, 1)] * 50}))
+        self.assertEqual(output.split(), ['1404/10/11'] * 50)
+        info = persian_filters.format_jalali.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 49))
+
+    def test_price_duration_and_digit_filters(self):
+        template = Template(
+            '{% load persian_filters %}{{ price|format_price }}|{{ revenue|format_price }}|'
+            '{{ price|persian_price }}|{{ minutes|persian_duration }}|{{ text|persian_digits }}'
+        )
+        output = template.render(Context({
+            'price': 1250000, 'revenue': Decimal('980000.00'), 'minutes': 90, 'text': '1405/07/27 <b>',
+        }))
+        self.assertEqual(output, '1،250،000|980،000|۱،۲۵۰،۰۰۰|۱ ساعت و ۳۰ دقیقه|۱۴۰۵/۰۷/۲۷ &lt;b&gt;')
+        self.assertEqual(persian_filters.format_price(None), '0')
+        self.assertEqual(persian_filters.format_price('نامعتبر'), 'نامعتبر')
+
+    def test_repeated_prices_and_durations_hit_the_cache(self):
+        template = Template(
+            '{% load persian_filters %}{% for p in prices %}{{ p|format_price }} {{ p|persian_price }} '
+            '{% endfor %}{% for m in minutes %}{{ m|persian_duration }} {% endfor %}'
+        )
+        template.render(Context({'prices': [300000, Decimal('300000.00')] * 10, 'minutes': [60] * 10}))
+        # Decimal و int یک کلید کش‌اند؛ persian_price کلید جدا (persian_digits=True) دارد
+        info = persian.format_price.cache_info()
+        self.assertEqual((info.misses, info.hits), (2, 38))
+        info = persian.format_duration.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 9))
+
+    def test_datetimes_render_in_local_time(self):
+        value = datetime(2026, 3, 20, 22, 0, tzinfo=dt_timezone.utc)
+        output = Template('{% load persian_filters %}{{ value|persian_datetime }}').render(Context({'value': value}))
+        self.assertEqual(output, '1405/01/01 - 01:30')
+
+
+class JalaliTests(TestCase):
+    """تبدیل برداری تاریخ شمسی، روز به روز در برابر jdatetime"""
+
+    def test_matches_jdatetime_across_centuries(self):
+        start = date(1800, 1, 1)
+        n_days = (date(2200, 12, 31) - start).days + 1
+        years, months, days = ordinals_to_jalali(start.toordinal() + np.arange(n_days))
+        converted = zip(years.tolist(), months.tolist(), days.tolist())
+        for offset, (year, month, day) in enumerate(converted):
+            value = start + timedelta(days=offset)
+            expected = jdatetime.date.fromgregorian(date=value)
+            self.assertEqual((year, month, day), (expected.year, expected.month, expected.day), value)
+            if offset % 97 == 0:
+                self.assertEqual(to_jalali(value), (year, month, day), value)
+
+    def test_formatting(self):
+        dates = [date(2026, 3, 21), date(2025, 3, 20), date(2026, 3, 21)]
+        self.assertEqual(format_dates(dates), ['1405/01/01', '1403/12/30', '1405/01/01'])
+        self.assertEqual(format_dates([]), [])
+        self.assertEqual(format_date(date(2026, 10, 19), '-'), '1405-07-27')
+        self.assertEqual(jalali_months(date(2026, 3, 19), 4).tolist(), [12, 12, 1, 1])
+
+
+class CalendarDayTests(TestCase):
+    """جدول تقویم شمسی و فیلترهای SQL روی آن"""
+
+    def tmp_holidays(self, content):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_rows_are_filled_by_migration(self):
+        nowruz = CalendarDay.objects.get(date=date(2026, 3, 21))
+        self.assertEqual(
+            (nowruz.jalali_year, nowruz.jalali_month, nowruz.jalali_day, nowruz.jalali_week, nowruz.weekday),
+            (1405, 1, 1, 1, 0),
+        )
+        self.assertTrue(nowruz.is_holiday)
+        self.assertEqual(nowruz.holiday_name, 'نوروز')
+
+        friday = CalendarDay.objects.get(date=date(2026, 3, 27))
+        self.assertEqual((friday.weekday, friday.is_weekend, friday.jalali_week), (6, True, 1))
+        self.assertEqual(CalendarDay.objects.get(date=date(2026, 3, 28)).jalali_week, 2)
+        self.assertEqual(CalendarDay.objects.filter(jalali_year=1403, jalali_month=12).count(), 30)
+        self.assertEqual(CalendarDay.objects.filter(jalali_year=1404, jalali_month=12).count(), 29)
+
+    def test_command_adds_lunar_holidays(self):
+        path = self.tmp_holidays('1405/03/07,عید قربان\n')
+        call_command('build_calendar', '--start=2026-05-01', '--end=2026-06-30', f'--holidays={path}', stdout=StringIO())
+        day = CalendarDay.objects.get(date=date(2026, 5, 28))
+        self.assertEqual((day.is_holiday, day.holiday_name), (True, 'عید قربان'))
+        self.assertFalse(CalendarDay.objects.get(date=date(2026, 5, 27)).is_holiday)
+
+    def test_rebuild_keeps_existing_holidays(self):
+        path = self.tmp_holidays('1405/03/07,عید قربان\n')
+        build_calendar(date(2026, 5, 1), date(2026, 6, 30), read_holidays(path))
+        CalendarDay.objects.filter(date=date(2026, 5, 27)).update(is_holiday=True, holiday_name='تعطیل دستی')
+        CalendarDay.objects.filter(date=date(2026, 5, 26)).update(jalali_week=0)
+
+        # اجرای دوباره بدون فایل تعطیلات
+        build_calendar(date(2026, 5, 1), date(2026, 6, 30))
+        days = CalendarDay.objects.in_bulk([date(2026, 5, 26), date(2026, 5, 27), date(2026, 5, 28)])
+        self.assertEqual((days[date(2026, 5, 28)].is_holiday, days[date(2026, 5, 28)].holiday_name),
+                         (True, 'عید قربان'))
+        self.assertEqual(days[date(2026, 5, 27)].holiday_name, 'تعطیل دستی')
+        self.assertFalse(days[date(2026, 5, 26)].is_holiday)
+        self.assertNotEqual(days[date(2026, 5, 26)].jalali_week, 0)
+
+    def test_appointments_filter_by_jalali_month_week_and_holidays(self):
+        build_calendar(date(2026, 3, 1), date(2026, 4, 30))
+        owner = create_user('owner', 'salon_owner', '09120000001')
+        salon = create_salon(owner, name='سالن تست')
+        service = create_service(salon, name='ژل‌لاک', price=300000, duration=60)
+        staff = create_staff(salon)
+        for day in (date(2026, 3, 20), date(2026, 3, 21), date(2026, 3, 25), date(2026, 4, 20)):
+            Appointment.objects.create(
+                salon=salon, customer=owner, staff=staff, service=service,
+                appointment_date=day, appointment_time=time(10),
+            )
+
+        farvardin = Appointment.objects.in_jalali_month(1405, 1)
+        self.assertEqual(sorted(farvardin.values_list('appointment_date', flat=True)),
+                         [date(2026, 3, 21), date(2026, 3, 25), date(2026, 4, 20)])
+        self.assertEqual(Appointment.objects.in_jalali_week(1405, 1).count(), 2)
+        # 29 اسفند 1404 (جمعه) و 1 فروردین 1405
+        self.assertEqual(Appointment.objects.on_holidays().count(), 2)
+
+
+class CompileTemplatesTests(TestCase):
+    """کامپایل قالب‌ها در مرحله build"""
+
+    def test_project_templates_compile(self):
+        out = StringIO()
+        call_command('compile_templates', stdout=out)
+        self.assertIn('Compiled', out.getvalue())
+
+    def test_broken_templates_fail_the_build(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        files = {
+            'ok.html': '{% extends "base.html" %}',
+            'bad_filter.html': '{{ value|no_such_filter }}',
+            'bad_parent.html': '{% extends "missing.html" %}',
+        }
+        for name, content in files.items():
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+
+        templates = [{**settings.TEMPLATES[0], 'DIRS': [directory, settings.BASE_DIR / 'templates']}]
+        err = StringIO()
+        with override_settings(TEMPLATES=templates, BASE_DIR=os.path.dirname(directory)):
+            with self.assertRaises(CommandError):
+                call_command('compile_templates', stdout=StringIO(), stderr=err)
+        self.assertIn('bad_filter.html', err.getvalue())
+        self.assertIn('bad_parent.html', err.getvalue())
+        self.assertNotIn('ok.html', err.getvalue())
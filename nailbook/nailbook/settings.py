@@ -31,10 +31,12 @@ INSTALLED_APPS = [
     'corsheaders',
 
     # Local apps
+    'core',
     'accounts',
     'salons',
     'appointments',
     'services',
+    'notifications',
     'api',
 
 ]
@@ -61,7 +63,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -69,10 +70,20 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # هر قالب یک بار در هر پروسه پارس می‌شود؛ در DEBUG با تغییر فایل کش خالی می‌شود
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# پارس همه قالب‌ها هنگام بالا آمدن worker (wsgi.py، core.template_cache)
+TEMPLATE_WARMUP = config('TEMPLATE_WARMUP', default=not DEBUG, cast=bool)
+
 WSGI_APPLICATION = 'nailbook.wsgi.application'
 
 
@@ -87,6 +98,22 @@ DATABASES = {
 }
 
 
+# Cache
+# برای چند پروسه (gunicorn) یک کش مشترک مثل Redis تنظیم کنید:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='nailbook'),
+    }
+}
+# بدون DEBUG، کش داخل پروسه (LocMem) خطای core.E001 می‌دهد (core.checks)
+CACHE_REQUIRE_SHARED = config('CACHE_REQUIRE_SHARED', default=not DEBUG, cast=bool)
+
+# مدت نگهداری قطعه‌های کش شده داشبوردها (کلیدها با نسخه نوبت‌های سالن عوض می‌شوند)
+DASHBOARD_FRAGMENT_TIMEOUT = config('DASHBOARD_FRAGMENT_TIMEOUT', default=3600, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -153,4 +180,49 @@ CORS_ALLOW_ALL_ORIGINS = True  # فقط برای مرحله توسعه
 
 # SMS Settings (Kavenegar)
 SMS_API_KEY = config('SMS_API_KEY', default='')
-SMS_SENDER = config('SMS_SENDER', default='10008663')
\ No newline at end of file
+SMS_SENDER = config('SMS_SENDER', default='10008663')
+# console، stub (سرور محلی manage.py sms_stub_server)، kavenegar یا مسیر کلاس
+SMS_PROVIDER = config('SMS_PROVIDER', default='console')
+SMS_STUB_URL = config('SMS_STUB_URL', default='http://127.0.0.1:8025/send')
+SMS_MAX_WORKERS = config('SMS_MAX_WORKERS', default=4, cast=int)
+SMS_MAX_ATTEMPTS = config('SMS_MAX_ATTEMPTS', default=3, cast=int)
+SMS_RETRY_BACKOFF = config('SMS_RETRY_BACKOFF', default=0.5, cast=float)
+# پیامک رزرو شده‌ای که بعد از این چند ثانیه نتیجه‌اش ثبت نشده دوباره قابل ارسال است
+SMS_CLAIM_TIMEOUT = config('SMS_CLAIM_TIMEOUT', default=600, cast=int)
+
+
+# Report exports (salons.exports، manage.py export_report)
+EXPORT_RETENTION_DAYS = config('EXPORT_RETENTION_DAYS', default=7, cast=int)
+
+
+# Appointment reminders
+REMINDER_HOURS_BEFORE = config('REMINDER_HOURS_BEFORE', default=24, cast=int)
+REMINDER_CHUNK_SIZE = config('REMINDER_CHUNK_SIZE', default=500, cast=int)
+REMINDER_CLAIM_TIMEOUT = config('REMINDER_CLAIM_TIMEOUT', default=600, cast=int)
+
+
+# Stale appointment sweeper (appointments.sweeper، manage.py sweep_appointments)
+SWEEP_BATCH_SIZE = config('SWEEP_BATCH_SIZE', default=1000, cast=int)
+
+
+# Waitlist (appointments.waitlist)
+WAITLIST_HOLD_MINUTES = config('WAITLIST_HOLD_MINUTES', default=30, cast=int)
+
+
+# Jalali calendar table (core.calendar، manage.py build_calendar)
+CALENDAR_YEARS_BEFORE = config('CALENDAR_YEARS_BEFORE', default=2, cast=int)
+CALENDAR_YEARS_AFTER = config('CALENDAR_YEARS_AFTER', default=5, cast=int)
+
+
+# Background tasks (core.tasks، manage.py run_tasks)
+TASK_BATCH_SIZE = config('TASK_BATCH_SIZE', default=50, cast=int)
+TASK_VISIBILITY_TIMEOUT = config('TASK_VISIBILITY_TIMEOUT', default=300, cast=int)
+TASK_MAX_ATTEMPTS = config('TASK_MAX_ATTEMPTS', default=5, cast=int)
+TASK_RETRY_BACKOFF = config('TASK_RETRY_BACKOFF', default=30, cast=float)
+TASK_RETENTION_DAYS = config('TASK_RETENTION_DAYS', default=7, cast=int)
+
+
+# Transactional outbox (core.outbox، manage.py relay_outbox)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=200, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=10, cast=int)
+OUTBOX_RETENTION_DAYS = config('OUTBOX_RETENTION_DAYS', default=7, cast=int)
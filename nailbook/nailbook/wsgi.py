@@ -14,3 +14,18 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nailbook.settings')
 
 application = get_wsgi_application()
+
+# system checkها با gunicorn اجرا نمی‌شوند؛ worker با کش غیرمشترک بالا نمی‌آید
+from django.core.exceptions import ImproperlyConfigured  # noqa: E402
+
+from core.checks import check_shared_cache  # noqa: E402
+
+for error in check_shared_cache(None):
+    raise ImproperlyConfigured(f'{error.msg} ({error.hint})')
+
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATE_WARMUP:
+    from core.template_cache import compile_templates
+
+    compile_templates()
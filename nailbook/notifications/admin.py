@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .dispatch import dispatch_messages
+from .models import SmsMessage
+
+@admin.register(SmsMessage)
+class SmsMessageAdmin(admin.ModelAdmin):
+    list_display = ('phone', 'kind', 'status', 'attempts', 'error', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind', 'created_at')
+    search_fields = ('phone', 'provider_message_id')
+    readonly_fields = ('appointment', 'attempts', 'provider_message_id', 'error', 'created_at', 'sent_at')
+    
+    actions = ['resend']
+    
+    def resend(self, request, queryset):
+        # پیامک‌هایی که همین حالا در حال ارسال‌اند در dispatch_messages رزرو نمی‌شوند
+        queryset.filter(status='failed').update(status='queued')
+        result = dispatch_messages(list(queryset.filter(status='queued')))
+        self.message_user(request, f"{result['sent']} پیامک ارسال شد، {result['failed']} ناموفق.")
+    resend.short_description = 'ارسال دوباره پیامک‌های انتخاب شده'
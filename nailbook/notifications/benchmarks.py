@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from appointments.models import Appointment
+from core.benchmarks import format_timings, measure, scenario, seed_salon
+from .dispatch import dispatch_messages, queue_messages
+from .models import SmsMessage
+from .providers import HttpStubProvider
+from .reminders import due_reminders, run_reminders
+from .stub import start_stub_server
+
+
+@scenario('sms_dispatch')
+def sms_dispatch(options):
+    """ارسال 10000 پیامک به سرور آزمایشی با تأخیر 20ms و 5% خطا"""
+    server = start_stub_server(failure_rate=0.05, error_rate=0.01, latency=0.02)
+    provider = HttpStubProvider(server.url)
+    count = int(10_000 * options['scale'])
+    try:
+        for workers in (1, 4, 8):
+            SmsMessage.objects.all().delete()
+            messages = queue_messages([(f'0912{i:07d}', 'یادآوری نوبت', None) for i in range(count)])
+            result = {}
+            timings = measure(
+                lambda: result.update(dispatch_messages(
+                    messages, provider=provider, max_workers=workers, backoff=0.05
+                )),
+                repeat=1, warmup=0,
+            )
+            yield format_timings(
+                f"{count} messages, {workers} workers (sent {result['sent']}, failed {result['failed']})", timings
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+    yield f"stub stats: {server.stats}"
+
+
+@scenario('reminder_scan')
+def reminder_scan(options):
+    """یادآوری 100000 نوبت یک روز با سرور پیامک آزمایشی"""
+    count = int(100_000 * options['scale'])
+    day = timezone.localdate() + timedelta(days=1)
+    salon = seed_salon(appointments=count, days=1, staff_count=count // 28 + 1, customers=2000, start=day)
+    now = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    due = salon.appointments.filter(status__in=['pending', 'confirmed']).count()
+    yield f"{Appointment.objects.count()} appointments tomorrow, {due} due"
+
+    plan = due_reminders(now, 24).order_by('appointment_date', 'appointment_time').explain()
+    yield f"scan plan: {' | '.join(line.split(' ', 3)[-1] for line in plan.splitlines())}"
+
+    server = start_stub_server(latency=0.01)
+    totals = {}
+    try:
+        timings = measure(
+            lambda: totals.update(run_reminders(now, 24, chunk_size=500, provider=HttpStubProvider(server.url))),
+            repeat=1, warmup=0,
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+    rate = totals['sent'] / (timings['best_ms'] / 1000)
+    yield format_timings(f"sent {totals['sent']}, failed {totals['failed']} ({rate:.0f}/s)", timings)
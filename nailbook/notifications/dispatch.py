@@ -0,0 +1,146 @@
+"""
+ارسال گروهی پیامک‌ها
+
+پیامک‌ها به دسته‌هایی به اندازه max_batch_size سرویس‌دهنده تقسیم می‌شوند و
+دسته‌ها با حداکثر SMS_MAX_WORKERS نخ همزمان ارسال می‌شوند. پیام‌های ناموفق
+قابل تکرار همه دسته‌ها در یک دور بعدی، پس از تأخیر نمایی
+(SMS_RETRY_BACKOFF × 2^n همراه با کمی تصادف) و تا SMS_MAX_ATTEMPTS بار
+دوباره فرستاده می‌شوند. نخ‌ها به پایگاه‌داده دست نمی‌زنند؛ نتیجه همه
+پیام‌ها در پایان گروهی ذخیره می‌شود (write_back).
+
+پیش از ارسال، پیام‌ها با یک توکن رزرو می‌شوند (claim_messages و core.claims)،
+پس send_queued_sms همزمان با یک کار پس‌زمینه یا اجرای دیگر خودش یک پیامک را
+دو بار نمی‌فرستد. رزروی که بعد از SMS_CLAIM_TIMEOUT ثانیه نتیجه‌اش ثبت نشده
+باشد (worker از کار افتاده) دوباره قابل رزرو است.
+"""
+
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from core.claims import claim_rows
+from .models import SmsMessage
+from .providers import ProviderError, get_provider
+
+WRITE_BACK_FIELDS = ['status', 'attempts', 'provider_message_id', 'error', 'sent_at', 'claim']
+WRITE_BACK_BATCH_SIZE = 500
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _send_once(provider, batch):
+    """یک تلاش برای یک دسته؛ فقط اشیای batch در حافظه تغییر می‌کنند. خروجی: پیام‌های قابل تکرار"""
+    try:
+        results = provider.send_batch([(message.phone, message.text) for message in batch])
+    except ProviderError as e:
+        for message in batch:
+            message.attempts += 1
+            message.error = str(e)[:255]
+        return list(batch) if e.retryable else []
+
+    retry = []
+    now = timezone.now()
+    for message, result in zip(batch, results):
+        message.attempts += 1
+        if result.ok:
+            message.status = 'sent'
+            message.provider_message_id = result.message_id[:64]
+            message.error = ''
+            message.sent_at = now
+        else:
+            message.error = (result.error or 'ارسال ناموفق')[:255]
+            if result.retryable:
+                retry.append(message)
+    return retry
+
+
+def write_back(messages):
+    """ذخیره نتیجه ارسال با upsert گروهی (INSERT ... ON CONFLICT DO UPDATE) به جای CASE برای هر ردیف"""
+    SmsMessage.objects.bulk_create(
+        messages,
+        batch_size=WRITE_BACK_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['id'],
+        update_fields=WRITE_BACK_FIELDS,
+    )
+
+
+def claimable_messages(now=None, claim_timeout=None):
+    """شرط پیامک‌های در صفی که worker دیگری در حال ارسالشان نیست"""
+    now = now or timezone.now()
+    claim_timeout = claim_timeout or settings.SMS_CLAIM_TIMEOUT
+    return Q(status='queued') & (Q(claim__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=claim_timeout)))
+
+
+def claim_messages(messages, now=None, claim_timeout=None):
+    """رزرو پیامک‌های در صف messages برای این worker؛ خروجی پیام‌هایی از messages که رزرو شدند"""
+    ids = [message.id for message in messages if message.status == 'queued']
+    if not ids:
+        return []
+    now = now or timezone.now()
+    token = uuid.uuid4()
+    claim_rows(
+        SmsMessage.objects.filter(id__in=ids), claimable_messages(now, claim_timeout), len(ids),
+        claim=token, claimed_at=now,
+    )
+    claimed = set(SmsMessage.objects.filter(claim=token).values_list('id', flat=True))
+    return [message for message in messages if message.id in claimed]
+
+
+def dispatch_messages(messages, provider=None, max_workers=None, max_attempts=None, backoff=None):
+    """
+    رزرو و ارسال پیامک‌های در صف و ذخیره گروهی نتیجه
+
+    پیام‌هایی که worker دیگری رزرو کرده است کنار گذاشته می‌شوند.
+    خروجی: {'sent': ..., 'failed': ...}
+    """
+    messages = claim_messages(messages)
+    if not messages:
+        return {'sent': 0, 'failed': 0}
+
+    provider = provider or get_provider()
+    max_workers = max_workers or settings.SMS_MAX_WORKERS
+    max_attempts = max_attempts or settings.SMS_MAX_ATTEMPTS
+    backoff = settings.SMS_RETRY_BACKOFF if backoff is None else backoff
+
+    pending = messages
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for attempt in range(1, max_attempts + 1):
+            # هر دور همه دسته‌ها همزمان؛ پیام‌های ناموفق در دور بعد دوباره دسته‌بندی می‌شوند
+            batches = _chunks(pending, provider.max_batch_size)
+            pending = [message for retry in pool.map(lambda batch: _send_once(provider, batch), batches)
+                       for message in retry]
+            if not pending or attempt == max_attempts:
+                break
+            time.sleep(backoff * 2 ** (attempt - 1) * (1 + random.random() / 2))
+
+    for message in messages:
+        message.claim = None
+        if message.status != 'sent':
+            message.status = 'failed'
+    write_back(messages)
+    sent = sum(1 for message in messages if message.status == 'sent')
+    return {'sent': sent, 'failed': len(messages) - sent}
+
+
+def queue_messages(items, kind='general'):
+    """ساخت پیامک‌های در صف از (شماره، متن، appointment_id)"""
+    return SmsMessage.objects.bulk_create([
+        SmsMessage(phone=phone, text=text, appointment_id=appointment_id, kind=kind)
+        for phone, text, appointment_id in items
+    ], batch_size=500)
+
+
+def send_queued(limit=1000, provider=None):
+    """ارسال قدیمی‌ترین پیامک‌های در صفی که در حال ارسال نیستند"""
+    messages = list(SmsMessage.objects.filter(claimable_messages()).order_by('created_at')[:limit])
+    return dispatch_messages(messages, provider=provider)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notifications.dispatch import send_queued
+
+
+class Command(BaseCommand):
+    help = 'ارسال پیامک‌های در صف'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='حداکثر تعداد پیامک در این اجرا')
+
+    def handle(self, *args, **options):
+        result = send_queued(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Sent {result['sent']}, failed {result['failed']}"))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.reminders import run_reminders
+
+
+class Command(BaseCommand):
+    help = 'ارسال پیامک یادآوری نوبت‌های پیش رو (یک بار از cron یا به صورت worker با --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help='چند ساعت قبل از نوبت (پیش‌فرض REMINDER_HOURS_BEFORE)')
+        parser.add_argument('--chunk-size', type=int, help='تعداد نوبت در هر رزرو (پیش‌فرض REMINDER_CHUNK_SIZE)')
+        parser.add_argument('--loop', action='store_true', help='اجرای دائمی به صورت worker')
+        parser.add_argument('--interval', type=int, default=60, help='فاصله بررسی در حالت --loop (ثانیه)')
+
+    def handle(self, *args, **options):
+        while True:
+            totals = run_reminders(hours_before=options['hours'], chunk_size=options['chunk_size'])
+            if totals['claimed'] or not options['loop']:
+                self.stdout.write(
+                    f"Claimed {totals['claimed']}, sent {totals['sent']}, failed {totals['failed']}"
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
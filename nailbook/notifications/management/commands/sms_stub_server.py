@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from notifications.stub import StubSmsServer
+
+
+class Command(BaseCommand):
+    help = 'اجرای سرویس‌دهنده پیامک آزمایشی محلی (برای SMS_PROVIDER=stub)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='نسبت پیام‌های ناموفق (0 تا 1)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='نسبت درخواست‌های رد شده با 503')
+        parser.add_argument('--latency-ms', type=int, default=0, help='تأخیر هر درخواست')
+        parser.add_argument('--seed', type=int, help='بذر مولد تصادفی برای نتایج تکرارپذیر')
+
+    def handle(self, *args, **options):
+        server = StubSmsServer(
+            (options['host'], options['port']),
+            failure_rate=options['failure_rate'],
+            error_rate=options['error_rate'],
+            latency=options['latency_ms'] / 1000,
+            seed=options['seed'],
+        )
+        self.stdout.write(f'SMS stub listening on {server.url}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Stats: {server.stats}')
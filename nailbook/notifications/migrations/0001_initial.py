@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('appointments', '0005_appointmentstatushistory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SmsMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('reminder', 'یادآوری نوبت'), ('confirmation', 'تایید نوبت'), ('general', 'عمومی')], default='general', max_length=20, verbose_name='نوع')),
+                ('phone', models.CharField(max_length=15, verbose_name='گیرنده')),
+                ('text', models.TextField(verbose_name='متن')),
+                ('status', models.CharField(choices=[('queued', 'در صف'), ('sent', 'ارسال شده'), ('failed', 'ناموفق')], default='queued', max_length=10, verbose_name='وضعیت')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='تعداد تلاش')),
+                ('provider_message_id', models.CharField(blank=True, max_length=64, verbose_name='شناسه سرویس\u200cدهنده')),
+                ('error', models.CharField(blank=True, max_length=255, verbose_name='خطا')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان ارسال')),
+                ('appointment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sms_messages', to='appointments.appointment')),
+            ],
+            options={
+                'verbose_name': 'پیامک',
+                'verbose_name_plural': 'پیامک\u200cها',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='sms_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='smsmessage',
+            name='kind',
+            field=models.CharField(choices=[('reminder', 'یادآوری نوبت'), ('confirmation', 'تایید نوبت'), ('waitlist', 'لیست انتظار'), ('general', 'عمومی')], default='general', max_length=20, verbose_name='نوع'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+
+
+class SmsMessage(models.Model):
+    """پیامک‌های ارسالی و وضعیت تحویل آن‌ها"""
+    STATUS_CHOICES = [
+        ('queued', 'در صف'),
+        ('sent', 'ارسال شده'),
+        ('failed', 'ناموفق'),
+    ]
+    KIND_CHOICES = [
+        ('reminder', 'یادآوری نوبت'),
+        ('confirmation', 'تایید نوبت'),
+        ('waitlist', 'لیست انتظار'),
+        ('general', 'عمومی'),
+    ]
+    
+    appointment = models.ForeignKey(
+        'appointments.Appointment', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='sms_messages'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='general', verbose_name='نوع')
+    phone = models.CharField(max_length=15, verbose_name='گیرنده')
+    text = models.TextField(verbose_name='متن')
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', verbose_name='وضعیت')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='تعداد تلاش')
+    provider_message_id = models.CharField(max_length=64, blank=True, verbose_name='شناسه سرویس‌دهنده')
+    error = models.CharField(max_length=255, blank=True, verbose_name='خطا')
+    # رزرو پیامک برای ارسال توسط یک worker (notifications.dispatch.claim_messages)
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='زمان ارسال')
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='sms_status_idx'),
+        ]
+        verbose_name = 'پیامک'
+        verbose_name_plural = 'پیامک‌ها'
+    
+    def __str__(self):
+        return f"{self.phone} - {self.get_status_display()}"
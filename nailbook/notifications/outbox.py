@@ -0,0 +1,30 @@
+"""handlerهای رویدادهای outbox برای پیامک"""
+
+from django.utils import timezone
+
+from appointments.events import CREATED
+from appointments.waitlist import OFFERED
+from core.models import Task
+from core.outbox import handler
+from core.tasks import enqueue_many
+
+CONFIRMATION_STATUSES = ('pending', 'confirmed')
+
+
+@handler(CREATED)
+def queue_booking_confirmations(events):
+    """پیامک تایید برای نوبت‌های جدید آینده (نوبت‌های گذشته، مثلاً ورود داده قدیمی، پیامک نمی‌گیرند)"""
+    today = timezone.localdate().isoformat()
+    enqueue_many('notifications.booking_confirmation', [
+        {'appointment_id': event.object_id}
+        for event in events
+        if event.payload.get('status') in CONFIRMATION_STATUSES and event.payload.get('date', '') >= today
+    ], priority=Task.PRIORITY_HIGH)
+
+
+@handler(OFFERED)
+def queue_waitlist_offers(events):
+    """پیامک نوبت نگه داشته شده برای مشتریان لیست انتظار"""
+    enqueue_many('notifications.waitlist_offer', [
+        {'entry_id': event.object_id} for event in events
+    ], priority=Task.PRIORITY_HIGH)
@@ -0,0 +1,139 @@
+"""
+سرویس‌دهنده‌های ارسال پیامک
+
+هر سرویس‌دهنده send_batch را پیاده می‌کند: لیستی از (شماره، متن) می‌گیرد و
+برای هر پیام یک SendResult برمی‌گرداند. خطای کل درخواست (شبکه، 5xx، 429) با
+ProviderError و retryable=True گزارش می‌شود تا dispatch دوباره تلاش کند.
+
+سرویس‌دهنده فعال با SMS_PROVIDER انتخاب می‌شود:
+    console    فقط لاگ (پیش‌فرض توسعه)
+    stub       سرور محلی `manage.py sms_stub_server` برای تست بدون اینترنت
+    kavenegar  وب‌سرویس کاوه‌نگار با SMS_API_KEY و SMS_SENDER
+یا مسیر کامل یک کلاس دلخواه.
+"""
+
+import json
+import logging
+from collections import namedtuple
+from urllib import error, parse, request
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SendResult = namedtuple('SendResult', ['ok', 'message_id', 'error', 'retryable'])
+
+HTTP_TIMEOUT = 10
+
+
+class ProviderError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class SmsProvider:
+    """رابط پایه سرویس‌دهنده پیامک"""
+    name = 'base'
+    max_batch_size = 100
+
+    def send_batch(self, messages):
+        raise NotImplementedError
+
+
+class ConsoleProvider(SmsProvider):
+    name = 'console'
+    max_batch_size = 1000
+
+    def send_batch(self, messages):
+        for phone, text in messages:
+            logger.info('SMS to %s: %s', phone, text)
+        return [SendResult(True, '', '', False) for _ in messages]
+
+
+def _post(url, data, content_type):
+    """POST و برگرداندن JSON پاسخ؛ خطاهای موقت ProviderError قابل تکرار"""
+    req = request.Request(url, data=data, headers={'Content-Type': content_type}, method='POST')
+    try:
+        with request.urlopen(req, timeout=HTTP_TIMEOUT) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except error.HTTPError as e:
+        retryable = e.code == 429 or e.code >= 500
+        raise ProviderError(f'HTTP {e.code}', retryable=retryable) from e
+    except (error.URLError, TimeoutError, ConnectionError) as e:
+        raise ProviderError(str(e)) from e
+    except ValueError as e:
+        raise ProviderError('پاسخ نامعتبر سرویس‌دهنده') from e
+
+
+class HttpStubProvider(SmsProvider):
+    """سرویس‌دهنده آزمایشی روی سرور محلی sms_stub_server"""
+    name = 'stub'
+
+    def __init__(self, url=None):
+        self.url = url or settings.SMS_STUB_URL
+
+    def send_batch(self, messages):
+        payload = json.dumps({
+            'sender': settings.SMS_SENDER,
+            'messages': [{'to': phone, 'text': text} for phone, text in messages],
+        }).encode('utf-8')
+        results = _post(self.url, payload, 'application/json').get('results', [])
+        if len(results) != len(messages):
+            raise ProviderError('تعداد نتایج با پیام‌ها برابر نیست')
+        return [
+            SendResult(item.get('status') == 'sent', str(item.get('id', '')), item.get('error', ''),
+                       bool(item.get('retryable')))
+            for item in results
+        ]
+
+
+class KavenegarProvider(SmsProvider):
+    """ارسال گروهی با sendarray کاوه‌نگار"""
+    name = 'kavenegar'
+    max_batch_size = 200
+    url = 'https://api.kavenegar.com/v1/{api_key}/sms/sendarray.json'
+
+    # وضعیت‌های نهایی ناموفق در پاسخ کاوه‌نگار
+    FAILED_STATUSES = {6, 11, 13, 14, 100}
+
+    def __init__(self, api_key=None, sender=None):
+        self.api_key = api_key or settings.SMS_API_KEY
+        self.sender = sender or settings.SMS_SENDER
+
+    def send_batch(self, messages):
+        if not self.api_key:
+            raise ProviderError('SMS_API_KEY تنظیم نشده است', retryable=False)
+        data = parse.urlencode({
+            'receptor': json.dumps([phone for phone, _ in messages]),
+            'sender': json.dumps([self.sender] * len(messages)),
+            'message': json.dumps([text for _, text in messages], ensure_ascii=False),
+        }).encode('utf-8')
+        response = _post(self.url.format(api_key=self.api_key), data, 'application/x-www-form-urlencoded')
+
+        entries = response.get('entries') or []
+        if len(entries) != len(messages):
+            raise ProviderError(response.get('return', {}).get('message', 'پاسخ ناقص کاوه‌نگار'))
+        return [
+            SendResult(
+                entry.get('status') not in self.FAILED_STATUSES,
+                str(entry.get('messageid', '')),
+                entry.get('statustext', '') if entry.get('status') in self.FAILED_STATUSES else '',
+                False,
+            )
+            for entry in entries
+        ]
+
+
+PROVIDERS = {
+    'console': ConsoleProvider,
+    'stub': HttpStubProvider,
+    'kavenegar': KavenegarProvider,
+}
+
+
+def get_provider(name=None):
+    name = name or settings.SMS_PROVIDER
+    provider_class = PROVIDERS.get(name) or import_string(name)
+    return provider_class()
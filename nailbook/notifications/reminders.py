@@ -0,0 +1,112 @@
+"""
+پیامک یادآوری نوبت‌ها
+
+claim_due_reminders نوبت‌های در بازه یادآوری (reminder_sent=False، وضعیت
+pending یا confirmed، مشتری دارای تلفن، تا REMINDER_HOURS_BEFORE ساعت
+آینده) را در تکه‌های REMINDER_CHUNK_SIZE تایی با یک توکن رزرو می‌کند
+(core.claims)، پس دو worker همزمان هیچ‌وقت یک نوبت را با هم برنمی‌دارند؛
+رزروی که بعد از REMINDER_CLAIM_TIMEOUT ثانیه ارسال نشده باشد (worker از کار
+افتاده یا ارسال ناموفق) دوباره قابل رزرو است.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from appointments.models import Appointment
+from core.claims import claim_rows
+from core.jalali import format_date
+from .dispatch import dispatch_messages, queue_messages
+
+REMINDER_TEXT = '{customer} عزیز، نوبت {service} شما در {salon} {date} ساعت {time} است.\nنیل بوک'
+REMINDER_FIELDS = (
+    'id', 'customer__first_name', 'customer__phone', 'service__name', 'salon__name',
+    'appointment_date', 'appointment_time',
+)
+MARK_BATCH_SIZE = 500
+
+
+def reminder_items(appointments):
+    """(شماره، متن، شناسه نوبت) برای نوبت‌هایی که مشتری‌شان تلفن دارد"""
+    for (appointment_id, first_name, phone, service_name, salon_name,
+         appointment_date, appointment_time) in appointments.order_by().values_list(*REMINDER_FIELDS):
+        if not phone:
+            continue
+        yield phone, REMINDER_TEXT.format(
+            customer=first_name or 'مشتری',
+            service=service_name,
+            salon=salon_name,
+            date=format_date(appointment_date),
+            time=appointment_time.strftime('%H:%M'),
+        ), appointment_id
+
+
+def send_appointment_reminders(appointments, provider=None):
+    """ارسال یادآوری و علامت‌گذاری گروهی reminder_sent برای پیامک‌های موفق"""
+    messages = queue_messages(reminder_items(appointments), kind='reminder')
+    result = dispatch_messages(messages, provider=provider)
+
+    sent_ids = [message.appointment_id for message in messages if message.status == 'sent']
+    for start in range(0, len(sent_ids), MARK_BATCH_SIZE):
+        Appointment.objects.filter(id__in=sent_ids[start:start + MARK_BATCH_SIZE]).update(
+            reminder_sent=True, reminder_claim=None, updated_at=F('updated_at')
+        )
+    return result
+
+
+def due_reminders(now=None, hours_before=None):
+    """نوبت‌هایی که باید تا hours_before ساعت آینده یادآوری بگیرند"""
+    now = timezone.localtime(now)
+    hours_before = hours_before or settings.REMINDER_HOURS_BEFORE
+    start = now.replace(tzinfo=None)
+    end = start + timedelta(hours=hours_before)
+
+    # تاریخ و ساعت جدا ذخیره شده‌اند؛ بازه (start, end] به سه بخش روی ایندکس تقسیم می‌شود
+    if start.date() == end.date():
+        window = Q(appointment_date=start.date(), appointment_time__gte=start.time(),
+                   appointment_time__lte=end.time())
+    else:
+        window = (
+            Q(appointment_date=start.date(), appointment_time__gte=start.time())
+            | Q(appointment_date__gt=start.date(), appointment_date__lt=end.date())
+            | Q(appointment_date=end.date(), appointment_time__lte=end.time())
+        )
+    # مشتری بدون تلفن پیامکی نمی‌گیرد و نباید هر بار دوباره رزرو شود
+    return Appointment.objects.filter(window, reminder_sent=False, status__in=['pending', 'confirmed']).exclude(
+        Q(customer__phone__isnull=True) | Q(customer__phone='')
+    )
+
+
+def claim_due_reminders(now=None, hours_before=None, chunk_size=None, claim_timeout=None):
+    """رزرو یک تکه از نوبت‌های موعد یادآوری؛ خروجی QuerySet نوبت‌های رزرو شده این worker"""
+    now = now or timezone.now()
+    chunk_size = chunk_size or settings.REMINDER_CHUNK_SIZE
+    claim_timeout = claim_timeout or settings.REMINDER_CLAIM_TIMEOUT
+    token = uuid.uuid4()
+    claimable = Q(reminder_claim__isnull=True) | Q(reminder_claimed_at__lt=now - timedelta(seconds=claim_timeout))
+
+    claim_rows(
+        due_reminders(now, hours_before).order_by('appointment_date', 'appointment_time'), claimable, chunk_size,
+        reminder_claim=token, reminder_claimed_at=now, updated_at=F('updated_at'),
+    )
+    return Appointment.objects.filter(reminder_claim=token)
+
+
+def run_reminders(now=None, hours_before=None, chunk_size=None, max_chunks=None, provider=None):
+    """رزرو و ارسال تکه به تکه تا وقتی نوبت موعددار باقی است"""
+    totals = {'claimed': 0, 'sent': 0, 'failed': 0}
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        claimed = claim_due_reminders(now, hours_before, chunk_size)
+        count = claimed.count()
+        if not count:
+            break
+        result = send_appointment_reminders(claimed, provider=provider)
+        totals['claimed'] += count
+        totals['sent'] += result['sent']
+        totals['failed'] += result['failed']
+        chunks += 1
+    return totals
@@ -0,0 +1,88 @@
+"""
+سرور HTTP محلی شبیه سرویس‌دهنده پیامک
+
+برای سنجش توان ارسال و رفتار تکرار بدون اینترنت. درخواست‌ها همان قالب
+HttpStubProvider را دارند؛ با failure_rate بخشی از پیام‌ها ناموفق (قابل
+تکرار) و با error_rate بخشی از درخواست‌ها با 503 رد می‌شوند. با seed
+انتخاب‌های تصادفی تکرارپذیر است (برای تست‌ها).
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+
+
+class StubSmsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, failure_rate=0.0, error_rate=0.0, latency=0.0, seed=None):
+        super().__init__(address, StubSmsHandler)
+        self.failure_rate = failure_rate
+        self.error_rate = error_rate
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.ids = count(1)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'messages': 0, 'sent': 0, 'failed': 0, 'errors': 0}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/send'
+
+    def draw(self, n=1):
+        """n عدد تصادفی از مولد سرور؛ زیر قفل تا ترتیب بین نخ‌ها به هم نریزد"""
+        with self.lock:
+            return [self.random.random() for _ in range(n)]
+
+    def record(self, **counts):
+        with self.lock:
+            for key, value in counts.items():
+                self.stats[key] += value
+
+
+class StubSmsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            messages = json.loads(self.rfile.read(length)).get('messages', [])
+        except ValueError:
+            self.send_error(400)
+            return
+
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and server.draw()[0] < server.error_rate:
+            server.record(requests=1, errors=1)
+            self.send_error(503)
+            return
+
+        results = []
+        for draw in server.draw(len(messages)):
+            if draw < server.failure_rate:
+                results.append({'status': 'failed', 'error': 'stub failure', 'retryable': True})
+            else:
+                results.append({'status': 'sent', 'id': next(server.ids)})
+        sent = sum(1 for result in results if result['status'] == 'sent')
+        server.record(requests=1, messages=len(messages), sent=sent, failed=len(messages) - sent)
+
+        body = json.dumps({'results': results}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(host='127.0.0.1', port=0, **options):
+    """اجرای سرور در یک نخ پس‌زمینه (برای تست و بنچمارک)؛ بستن با server.shutdown()"""
+    server = StubSmsServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,62 @@
+"""کارهای پس‌زمینه پیامک"""
+
+from django.db.models import F
+from django.utils import timezone
+
+from appointments.models import Appointment, WaitlistEntry
+from core.jalali import format_date
+from core.tasks import task
+from .dispatch import dispatch_messages, queue_messages
+
+CONFIRMATION_TEXT = '{customer} عزیز، نوبت {service} شما در {salon} برای {date} ساعت {time} ثبت شد.\nنیل بوک'
+WAITLIST_OFFER_TEXT = (
+    '{customer} عزیز، نوبت {service} در {salon} {date} ساعت {time} آزاد شد و تا ساعت {expires} '
+    'برای شما نگه داشته می‌شود.\nنیل بوک'
+)
+
+
+@task('notifications.booking_confirmation')
+def send_booking_confirmation(appointment_id):
+    """پیامک تایید ثبت نوبت (یک بار برای هر نوبت)"""
+    appointment = Appointment.objects.filter(id=appointment_id).select_related(
+        'customer', 'service', 'salon'
+    ).first()
+    if appointment is None or appointment.sms_sent or not appointment.customer.phone:
+        return
+
+    text = CONFIRMATION_TEXT.format(
+        customer=appointment.customer.first_name or 'مشتری',
+        service=appointment.service.name,
+        salon=appointment.salon.name,
+        date=format_date(appointment.appointment_date),
+        time=appointment.appointment_time.strftime('%H:%M'),
+    )
+    messages = queue_messages([(appointment.customer.phone, text, appointment.id)], kind='confirmation')
+    result = dispatch_messages(messages)
+    if result['failed']:
+        # خطا باعث تلاش دوباره کار در صف می‌شود
+        raise RuntimeError(messages[0].error or 'ارسال پیامک تایید ناموفق بود')
+    # مثل reminder_sent با UPDATE و بدون save کامل نوبت
+    Appointment.objects.filter(id=appointment_id).update(sms_sent=True, updated_at=F('updated_at'))
+
+
+@task('notifications.waitlist_offer')
+def send_waitlist_offer(entry_id):
+    """پیامک نوبت آزاد شده برای مشتری لیست انتظار (فقط اگر هنوز نگه داشته شده باشد)"""
+    entry = WaitlistEntry.objects.filter(id=entry_id, status='offered').select_related(
+        'customer', 'service', 'salon'
+    ).first()
+    if entry is None or not entry.customer.phone:
+        return
+
+    text = WAITLIST_OFFER_TEXT.format(
+        customer=entry.customer.first_name or 'مشتری',
+        service=entry.service.name,
+        salon=entry.salon.name,
+        date=format_date(entry.offered_date),
+        time=entry.offered_time.strftime('%H:%M'),
+        expires=timezone.localtime(entry.hold_expires_at).strftime('%H:%M'),
+    )
+    messages = queue_messages([(entry.customer.phone, text, None)], kind='waitlist')
+    if dispatch_messages(messages)['failed']:
+        raise RuntimeError(messages[0].error or 'ارسال پیامک لیست انتظار ناموفق بود')
@@ -0,0 +1,150 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+
+from appointments.models import Appointment
+from core.testing import SalonTestData, create_user
+from .dispatch import claim_messages, dispatch_messages, queue_messages, send_queued
+from .models import SmsMessage
+from .providers import HttpStubProvider, ProviderError, SendResult, SmsProvider
+from .reminders import claim_due_reminders, due_reminders, run_reminders, send_appointment_reminders
+from .stub import start_stub_server
+
+
+class FlakyProvider(SmsProvider):
+    """اولین درخواست را رد می‌کند و شماره‌های مسدود را همیشه ناموفق برمی‌گرداند"""
+    max_batch_size = 3
+
+    def __init__(self):
+        self.calls = 0
+
+    def send_batch(self, messages):
+        self.calls += 1
+        if self.calls == 1:
+            raise ProviderError('timeout')
+        return [
+            SendResult(False, '', 'blocked', False) if phone.startswith('0999') else SendResult(True, phone, '', False)
+            for phone, _ in messages
+        ]
+
+
+class DispatchTests(TestCase):
+    def test_batches_retries_and_bulk_write_back(self):
+        phones = [f'0912000000{i}' for i in range(5)] + ['09990000000']
+        messages = queue_messages([(phone, 'سلام', None) for phone in phones])
+        provider = FlakyProvider()
+
+        result = dispatch_messages(messages, provider=provider, max_workers=1, backoff=0)
+
+        self.assertEqual(result, {'sent': 5, 'failed': 1})
+        self.assertEqual(provider.calls, 3)  # دو دسته سه‌تایی و یک تکرار بعد از timeout
+        failed = SmsMessage.objects.get(status='failed')
+        self.assertEqual((failed.phone, failed.error), ('09990000000', 'blocked'))
+        self.assertEqual(SmsMessage.objects.filter(status='sent', sent_at__isnull=False).count(), 5)
+
+    def test_stub_server_failures_are_retried(self):
+        server = start_stub_server(failure_rate=0.3, seed=1)
+        try:
+            messages = queue_messages([(f'0912{i:07d}', 'تست', None) for i in range(200)])
+            result = dispatch_messages(
+                messages, provider=HttpStubProvider(server.url), max_workers=1, max_attempts=10, backoff=0
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(result['sent'], 200)
+        # با seed ثابت شکست‌ها تکرارپذیرند: 96 تلاش ناموفق که همه تکرار شدند
+        self.assertEqual((server.stats['messages'], server.stats['failed']), (296, 96))
+
+
+class SmsClaimTests(TestCase):
+    """پیامک در حال ارسال توسط worker دیگر دوباره فرستاده نمی‌شود"""
+
+    def test_claimed_messages_are_sent_once(self):
+        messages = queue_messages([(f'0912000000{i}', 'سلام', None) for i in range(3)])
+        # worker دیگری (مثلا کار تایید رزرو) پیام اول را رزرو کرده و هنوز در حال ارسال است
+        self.assertEqual(len(claim_messages(messages[:1])), 1)
+        self.assertEqual(claim_messages(messages[:1]), [])
+
+        provider = FlakyProvider()
+        provider.calls = 1
+        self.assertEqual(send_queued(provider=provider), {'sent': 2, 'failed': 0})
+        self.assertEqual(dispatch_messages(messages, provider=provider), {'sent': 0, 'failed': 0})
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual(SmsMessage.objects.filter(status='sent', claim__isnull=True).count(), 2)
+
+        # رزرو worker از کار افتاده بعد از SMS_CLAIM_TIMEOUT آزاد می‌شود
+        later = timezone.now() + timedelta(seconds=settings.SMS_CLAIM_TIMEOUT + 1)
+        self.assertEqual(len(claim_messages(messages, now=later)), 1)
+
+
+class ReminderTests(SalonTestData, TestCase):
+    customer_fields = {'first_name': 'سارا'}
+
+    def test_reminders_mark_appointments(self):
+        appointment = self.create_appointment()
+
+        result = send_appointment_reminders(Appointment.objects.all())
+
+        self.assertEqual(result['sent'], 1)
+        appointment.refresh_from_db()
+        self.assertTrue(appointment.reminder_sent)
+        self.assertIn('سارا عزیز', appointment.sms_messages.get().text)
+
+
+class ReminderScannerTests(SalonTestData, TestCase):
+    salon_fields = {'opening_time': time(0), 'closing_time': time(23, 59)}
+    now = timezone.make_aware(datetime(2026, 3, 10, 20, 0))
+
+    def create(self, hours_ahead, status='confirmed', **kwargs):
+        moment = timezone.localtime(self.now).replace(tzinfo=None) + timedelta(hours=hours_ahead)
+        return self.create_appointment(
+            day=moment.date(), appointment_time=moment.time(), status=status, **kwargs
+        )
+
+    def test_due_window_and_status(self):
+        due = [self.create(1), self.create(10, status='pending'), self.create(23)]
+        self.create(30)  # خارج از بازه
+        self.create(2, status='cancelled')
+        self.create(3, reminder_sent=True)
+        self.create(-2)  # گذشته
+
+        self.assertEqual(
+            set(due_reminders(self.now, hours_before=24).values_list('id', flat=True)), {a.id for a in due}
+        )
+
+    def test_customers_without_phone_are_never_claimed(self):
+        due = self.create(1)
+        for index, phone in enumerate([None, '']):
+            customer = create_user(f'nophone{index}', 'customer', phone)
+            self.create(2 + index, customer=customer)
+
+        self.assertEqual(list(due_reminders(self.now, hours_before=24).values_list('id', flat=True)), [due.id])
+        later = self.now + timedelta(seconds=settings.REMINDER_CLAIM_TIMEOUT + 1)
+        self.assertEqual(run_reminders(self.now, hours_before=24)['claimed'], 1)
+        self.assertEqual(run_reminders(later, hours_before=24)['claimed'], 0)
+
+    def test_claims_do_not_overlap_and_expire(self):
+        for hours in range(1, 6):
+            self.create(hours)
+
+        first = set(claim_due_reminders(self.now, 24, chunk_size=3).values_list('id', flat=True))
+        second = set(claim_due_reminders(self.now, 24, chunk_size=3).values_list('id', flat=True))
+        self.assertEqual((len(first), len(second)), (3, 2))
+        self.assertFalse(first & second)
+        self.assertFalse(claim_due_reminders(self.now, 24).exists())
+
+        later = self.now + timedelta(seconds=settings.REMINDER_CLAIM_TIMEOUT + 1)
+        self.assertEqual(claim_due_reminders(later, 24, chunk_size=10).count(), 5)
+
+    def test_run_reminders_sends_once(self):
+        for hours in range(1, 8):
+            self.create(hours)
+
+        totals = run_reminders(self.now, hours_before=24, chunk_size=3)
+        self.assertEqual(totals, {'claimed': 7, 'sent': 7, 'failed': 0})
+        self.assertEqual(Appointment.objects.filter(reminder_sent=True).count(), 7)
+        self.assertEqual(run_reminders(self.now, hours_before=24)['claimed'], 0)
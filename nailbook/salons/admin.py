@@ -1,22 +1,51 @@
 from django.contrib import admin
+from django.shortcuts import redirect
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from appointments.models import Appointment
+from services.models import Service
 from .models import Salon, Staff
 
-class StaffInline(admin.TabularInline):
-    model = Staff
-    extra = 0
-    fields = ('user', 'specialties', 'is_available')
+def _count_subquery(queryset, field='salon'):
+    """شمارش ردیف‌های مرتبط با هر سالن به صورت زیرکوئری (بدون ضرب join ها در هم)"""
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        count=Count('pk')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+class StaffUserChoicesMixin:
+    """فیلتر کاربران نقش staff و خواندن گزینه‌ها فقط یک بار در هر درخواست (نه برای هر فرم inline)"""
     
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "user":
             kwargs["queryset"] = Staff._meta.get_field('user').remote_field.model.objects.filter(role='staff')
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == "user" and formfield is not None:
+            if not hasattr(request, '_staff_user_choices'):
+                request._staff_user_choices = list(formfield.choices)
+            formfield.choices = request._staff_user_choices
+        return formfield
+
+class StaffInline(StaffUserChoicesMixin, admin.TabularInline):
+    model = Staff
+    extra = 0
+    fields = ('user', 'specialties', 'is_available')
+    
+    def get_queryset(self, request):
+        # Staff.__str__ برای هر ردیف به user و salon نیاز دارد
+        return super().get_queryset(request).select_related('user', 'salon')
 
 @admin.register(Salon)
 class SalonAdmin(admin.ModelAdmin):
-    list_display = ('name', 'owner', 'phone', 'get_staff_count', 'get_working_hours', 'is_active', 'created_at')
+    list_display = (
+        'name', 'owner', 'phone', 'get_staff_count', 'get_service_count', 'get_upcoming_count',
+        'get_working_hours', 'is_active', 'created_at'
+    )
+    list_select_related = ('owner',)
     list_filter = ('is_active', 'created_at', 'owner')
     search_fields = ('name', 'owner__username', 'owner__phone', 'phone', 'address')
     ordering = ('-created_at',)
@@ -29,6 +58,9 @@ class SalonAdmin(admin.ModelAdmin):
             'fields': ('opening_time', 'closing_time', 'closed_days'),
             'description': 'روزهای تعطیل را با کاما جدا کنید (مثال: friday,saturday)'
         }),
+        ('نوبت‌های گذشته', {
+            'fields': ('stale_appointment_policy', 'stale_after_hours'),
+        }),
         ('وضعیت', {
             'fields': ('is_active', 'created_at')
         })
@@ -42,8 +74,20 @@ class SalonAdmin(admin.ModelAdmin):
             kwargs["queryset"] = Salon._meta.get_field('owner').remote_field.model.objects.filter(role='salon_owner')
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            staff_count=_count_subquery(Staff.objects.all()),
+            service_count=_count_subquery(Service.objects.all()),
+            upcoming_count=_count_subquery(
+                Appointment.objects.filter(
+                    appointment_date__gte=timezone.localdate(),
+                    status__in=['pending', 'confirmed'],
+                )
+            ),
+        )
+    
     def get_staff_count(self, obj):
-        count = obj.staff_members.count()
+        count = obj.staff_count
         if count > 0:
             return format_html(
                 '<a href="{}?salon__id__exact={}">{} نفر</a>',
@@ -53,14 +97,26 @@ class SalonAdmin(admin.ModelAdmin):
             )
         return '0 نفر'
     get_staff_count.short_description = 'تعداد کارمند'
+    get_staff_count.admin_order_field = 'staff_count'
+    
+    def get_service_count(self, obj):
+        return obj.service_count
+    get_service_count.short_description = 'تعداد خدمات'
+    get_service_count.admin_order_field = 'service_count'
+    
+    def get_upcoming_count(self, obj):
+        return obj.upcoming_count
+    get_upcoming_count.short_description = 'نوبت‌های پیش رو'
+    get_upcoming_count.admin_order_field = 'upcoming_count'
     
     def get_working_hours(self, obj):
         return f"{obj.opening_time} - {obj.closing_time}"
     get_working_hours.short_description = 'ساعات کاری'
 
 @admin.register(Staff)
-class StaffAdmin(admin.ModelAdmin):
+class StaffAdmin(StaffUserChoicesMixin, admin.ModelAdmin):
     list_display = ('get_staff_name', 'salon', 'get_specialties', 'is_available')
+    actions = ['generate_time_slots']
     list_filter = ('salon', 'is_available')
     search_fields = ('user__username', 'user__first_name', 'user__last_name', 'salon__name', 'specialties')
     
@@ -73,10 +129,9 @@ class StaffAdmin(admin.ModelAdmin):
         })
     )
     
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == "user":
-            kwargs["queryset"] = Staff._meta.get_field('user').remote_field.model.objects.filter(role='staff')
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    def get_queryset(self, request):
+        # هم برای لیست و هم برای عنوان صفحه ویرایش (Staff.__str__)
+        return super().get_queryset(request).select_related('user', 'salon')
     
     def get_staff_name(self, obj):
         return obj.user.get_full_name() or obj.user.username
@@ -84,10 +139,14 @@ class StaffAdmin(admin.ModelAdmin):
     
     def get_specialties(self, obj):
         if obj.specialties:
-            specs = obj.specialties.split(',')
+            specs = obj.specialties.split(',', 3)
             if len(specs) <= 3:
                 return obj.specialties
             return f"{', '.join(specs[:3])}..."
         return 'تعریف نشده'
     get_specialties.short_description = 'تخصص‌ها'
-
+    
+    def generate_time_slots(self, request, queryset):
+        staff_ids = ','.join(str(pk) for pk in queryset.values_list('pk', flat=True))
+        return redirect(f"{reverse('admin:appointments_timeslot_generate')}?staff={staff_ids}")
+    generate_time_slots.short_description = 'ساخت بازه‌های زمانی برای کارمندان انتخاب شده'
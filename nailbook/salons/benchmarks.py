@@ -0,0 +1,49 @@
+from accounts.models import User
+from core.benchmarks import format_timings, measure, scenario
+from core.persian import normalize_text
+from django.db.models import Q
+from services.models import Service
+from .models import Salon, SalonSearchTrigram
+from .search import index_salons, search_salons
+
+NAMES = ['رز', 'یاس', 'مهسا', 'کیمیا', 'نگین', 'آوا', 'ستاره', 'پرنیان', 'ترانه', 'شیدا', 'الماس', 'مروارید']
+KINDS = ['سالن زیبایی', 'ناخن‌آرایی', 'آرایشگاه', 'استودیو ناخن']
+CITIES = ['تهران', 'کرج', 'شیراز', 'اصفهان', 'مشهد', 'تبریز', 'رشت', 'قم']
+STREETS = ['ولیعصر', 'انقلاب', 'آزادی', 'شریعتی', 'گوهردشت', 'چهارباغ', 'ملاصدرا', 'امام رضا']
+SERVICES = ['ژل‌لاک', 'کاشت ناخن', 'مانیکور', 'پدیکور', 'میکاپ', 'اصلاح ابرو', 'رنگ مو', 'کراتینه']
+
+
+@scenario('salon_search')
+def salon_search(options):
+    """جستجوی سالن در ده‌ها هزار سالن: icontains در برابر سه‌حرفی‌ها"""
+    size = int(50_000 * options['scale'])
+    owner = User.objects.create_user(f'search_owner{User.objects.count()}', role='salon_owner')
+
+    salons = []
+    for i in range(size):
+        name = f'{KINDS[i % len(KINDS)]} {NAMES[i % len(NAMES)]} {i}'
+        address = f'{CITIES[i % len(CITIES)]}، خیابان {STREETS[(i // 8) % len(STREETS)]}، پلاک {i % 200}'
+        salons.append(Salon(
+            name=name, owner=owner, phone='021', address=address,
+            search_text=normalize_text(f'{name} {address}'),
+        ))
+    salons = Salon.objects.bulk_create(salons, batch_size=2000)
+    Service.objects.bulk_create([
+        Service(salon=salon, name=SERVICES[(salon.id + k) % len(SERVICES)], price=300000, duration=60,
+                search_text=normalize_text(SERVICES[(salon.id + k) % len(SERVICES)]))
+        for salon in salons for k in range(2)
+    ], batch_size=2000)
+    index_salons([salon.id for salon in salons])
+    yield f"{size} salons, {SalonSearchTrigram.objects.count()} trigram rows"
+
+    active = Salon.objects.filter(is_active=True)
+    for query in ['كيميا 4217', 'ناخن آرایی گوهردشت', 'مانیکور']:
+        legacy = active.filter(Q(name__icontains=query) | Q(address__icontains=query))
+        results = search_salons(active, query)
+        yield f"{query!r}: icontains {legacy.count()} results, trigram {results.count()} best matches"
+        yield format_timings('  icontains, first 20', measure(
+            lambda: list(legacy[:20]), repeat=options['repeat']
+        ))
+        yield format_timings('  trigram, first 20 ranked', measure(
+            lambda: list(results[:20]), repeat=options['repeat']
+        ))
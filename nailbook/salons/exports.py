@@ -0,0 +1,191 @@
+"""
+خروجی کامل نوبت‌های سالن برای حسابداری (CSV / XLSX)
+
+ردیف‌ها با .iterator() به صورت تکه‌ای خوانده می‌شوند و نام مشتری، کارمند و
+خدمت از جدول‌های جستجوی از پیش ساخته شده خوانده می‌شود (بدون دسترسی FK برای
+هر ردیف)، پس مصرف حافظه به تعداد نوبت‌ها بستگی ندارد. فایل در MEDIA_ROOT
+نوشته می‌شود و از طریق نمای دانلود سالن در اختیار مسئول قرار می‌گیرد.
+
+نمای گزارش‌ها خروجی را به صورت کار salons.export_report در صف (core.tasks)
+می‌گذارد تا خروجی یک سال کامل worker وب را مشغول نکند. فایل‌های قدیمی‌تر از
+EXPORT_RETENTION_DAYS با purge_exports حذف می‌شوند (قبل از هر خروجی همان سالن
+و با manage.py export_report --purge برای همه سالن‌ها).
+"""
+
+import csv
+import os
+import uuid
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from accounts.models import User
+from appointments.models import Appointment
+from core.jalali import format_dates
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+CHUNK_SIZE = 2000
+EXPORT_DIR = 'reports'
+
+COLUMNS = [
+    'شماره نوبت', 'تاریخ', 'ساعت', 'مشتری', 'تلفن مشتری', 'کارمند', 'خدمت',
+    'مبلغ (تومان)', 'وضعیت', 'پرداخت شده', 'روش پرداخت',
+]
+
+STATUS_LABELS = dict(Appointment.STATUS_CHOICES)
+PAYMENT_LABELS = dict(Appointment._meta.get_field('payment_method').choices)
+
+
+def get_export_dir(salon):
+    """پوشه خروجی‌های یک سالن داخل MEDIA_ROOT"""
+    return Path(settings.MEDIA_ROOT) / EXPORT_DIR / str(salon.id)
+
+
+def new_export_filename(salon, export_format):
+    """نام فایل خروجی جدید (قبل از ساخت، تا در صف کارها ثبت شود)"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'فرمت نامعتبر: {export_format}')
+    timestamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+    return f"appointments-{salon.id}-{timestamp}-{uuid.uuid4().hex[:6]}.{export_format}"
+
+
+def list_exports(salon):
+    """فایل‌های خروجی آماده سالن، جدیدترین اول: لیست (نام، حجم، زمان ساخت)"""
+    export_dir = get_export_dir(salon)
+    if not export_dir.is_dir():
+        return []
+    exports = []
+    for path in export_dir.iterdir():
+        if path.is_file() and not path.name.startswith('.'):
+            stat = path.stat()
+            modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.get_current_timezone())
+            exports.append((path.name, stat.st_size, modified))
+    return sorted(exports, key=lambda export: export[2], reverse=True)
+
+
+def purge_exports(salon=None, days=None):
+    """حذف فایل‌های خروجی (و فایل‌های موقت رها شده) قدیمی‌تر از EXPORT_RETENTION_DAYS روز"""
+    days = settings.EXPORT_RETENTION_DAYS if days is None else days
+    cutoff = (timezone.now() - timedelta(days=days)).timestamp()
+    root = Path(settings.MEDIA_ROOT) / EXPORT_DIR
+    dirs = [get_export_dir(salon)] if salon is not None else [d for d in root.glob('*') if d.is_dir()]
+    deleted = 0
+    for export_dir in dirs:
+        for path in export_dir.glob('*') if export_dir.is_dir() else []:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                deleted += 1
+    return deleted
+
+
+def _full_name(first_name, last_name, username):
+    return f"{first_name} {last_name}".strip() or username
+
+
+def _lookup_maps(salon):
+    """نام مشتری‌ها، کارمندان و خدمات سالن با سه کوئری"""
+    customers = {
+        user_id: (_full_name(first_name, last_name, username), phone or '')
+        for user_id, first_name, last_name, username, phone in User.objects.filter(
+            appointments__salon=salon
+        ).distinct().values_list('id', 'first_name', 'last_name', 'username', 'phone')
+    }
+    staff = {
+        staff_id: _full_name(first_name, last_name, username)
+        for staff_id, first_name, last_name, username in salon.staff_members.values_list(
+            'id', 'user__first_name', 'user__last_name', 'user__username'
+        )
+    }
+    services = dict(salon.services.values_list('id', 'name'))
+    return customers, staff, services
+
+
+def iter_report_rows(salon, from_date=None, to_date=None):
+    """ردیف‌های گزارش به ترتیب تاریخ، بدون بارگذاری همه نوبت‌ها در حافظه"""
+    customers, staff, services = _lookup_maps(salon)
+
+    appointments = Appointment.objects.filter(salon=salon)
+    if from_date:
+        appointments = appointments.filter(appointment_date__gte=from_date)
+    if to_date:
+        appointments = appointments.filter(appointment_date__lte=to_date)
+
+    rows = appointments.order_by('appointment_date', 'appointment_time', 'id').values_list(
+        'id', 'appointment_date', 'appointment_time', 'customer_id', 'staff_id', 'service_id',
+        'total_price', 'status', 'is_paid', 'payment_method',
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+    # تاریخ‌های شمسی هر تکه با یک تبدیل برداری
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        jalali_dates = format_dates([row[1] for row in chunk])
+        for (appointment_id, _, appointment_time, customer_id, staff_id, service_id, total_price,
+             status, is_paid, payment_method), jalali_date in zip(chunk, jalali_dates):
+            customer_name, customer_phone = customers.get(customer_id, ('', ''))
+
+            yield [
+                appointment_id,
+                jalali_date,
+                appointment_time.strftime('%H:%M'),
+                customer_name,
+                customer_phone,
+                staff.get(staff_id, ''),
+                services.get(service_id, ''),
+                total_price,
+                STATUS_LABELS.get(status, status),
+                'بله' if is_paid else 'خیر',
+                PAYMENT_LABELS.get(payment_method, ''),
+            ]
+
+
+def _write_csv(path, rows):
+    # utf-8-sig تا اکسل متن فارسی را درست نمایش دهد
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+def _write_xlsx(path, rows):
+    from openpyxl import Workbook
+
+    # write_only ردیف‌ها را مستقیم روی دیسک می‌نویسد
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('نوبت‌ها')
+    sheet.sheet_view.rightToLeft = True
+    sheet.append(COLUMNS)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+WRITERS = {
+    'csv': _write_csv,
+    'xlsx': _write_xlsx,
+}
+
+
+def export_appointments(salon, export_format='csv', from_date=None, to_date=None, filename=None):
+    """ساخت فایل گزارش و برگرداندن نام فایل داخل پوشه خروجی سالن"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'فرمت نامعتبر: {export_format}')
+    filename = filename or new_export_filename(salon, export_format)
+
+    export_dir = get_export_dir(salon)
+    export_dir.mkdir(parents=True, exist_ok=True)
+
+    path = export_dir / os.path.basename(filename)
+    # هر اجرا فایل موقت خودش را دارد (کاری که بعد از پایان مهلت رزرو دوباره برداشته شود)
+    partial_path = export_dir / f".{path.name}.{uuid.uuid4().hex[:8]}.part"
+
+    # نوشتن در فایل موقت تا فایل ناقص هیچ‌وقت قابل دانلود نباشد
+    try:
+        WRITERS[export_format](partial_path, iter_report_rows(salon, from_date, to_date))
+        os.replace(partial_path, path)
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
+
+    return filename
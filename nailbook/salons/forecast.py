@@ -0,0 +1,181 @@
+"""
+پیش‌بینی تقاضای نوبت‌ها و درآمد روزهای آینده
+
+مدل یک میانگین فصلی ساده است: سطح پایه هر سری (کل سالن و هر خدمت) از
+روزهای اخیر و بعد از حذف اثر فصلی محاسبه می‌شود و سپس در ضریب روز هفته و
+ضریب ماه شمسی همان روز ضرب می‌شود. تمام محاسبات روی آرایه‌های NumPy
+انجام می‌شود و نتیجه در SalonForecast ذخیره می‌شود تا صفحه آنالیتیکس
+هیچ‌وقت مدل را داخل درخواست محاسبه نکند.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from appointments.models import Appointment
+from core.jalali import jalali_months
+from .models import SalonForecast
+
+HISTORY_DAYS = 365
+RECENT_DAYS = 56
+MIN_HORIZON_DAYS = 14
+MAX_HORIZON_DAYS = 28
+DEFAULT_HORIZON_DAYS = 28
+
+# روز هفته پایتون (دوشنبه = 0) به نام روز در Salon.closed_days
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _weekdays(start, n_days):
+    """روز هفته n روز متوالی از start"""
+    return (start.weekday() + np.arange(n_days)) % 7
+
+
+def _jalali_months(start, n_days):
+    """شماره ماه شمسی (0 تا 11) برای n روز متوالی از start"""
+    return (jalali_months(start, n_days) - 1).astype(np.intp)
+
+
+def _seasonal_factors(series, keys, n_keys):
+    """
+    ضریب فصلی هر کلید نسبت به میانگین کل هر سری
+
+    series: آرایه (تعداد سری × تعداد روز)، keys: کلید هر روز (روز هفته یا ماه)
+    کلیدهایی که در تاریخچه نیستند یا سری‌هایی که داده ندارند ضریب 1 می‌گیرند.
+    """
+    onehot = np.zeros((keys.size, n_keys))
+    onehot[np.arange(keys.size), keys] = 1.0
+    key_days = onehot.sum(axis=0)
+    key_means = (series @ onehot) / np.maximum(key_days, 1.0)
+    overall = series.mean(axis=1, keepdims=True)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factors = key_means / overall
+    return np.where((key_days > 0) & (overall > 0), factors, 1.0)
+
+
+def _forecast_series(series, history_start, forecast_start, horizon_days):
+    """پیش‌بینی برداری تمام سری‌ها برای horizon_days روز بعد از forecast_start"""
+    n_days = series.shape[1]
+
+    weekday_keys = _weekdays(history_start, n_days)
+    month_keys = _jalali_months(history_start, n_days)
+    weekday_factors = _seasonal_factors(series, weekday_keys, 7)
+    month_factors = _seasonal_factors(series, month_keys, 12)
+
+    # سطح پایه: میانگین روزهای اخیر بعد از حذف اثر روز هفته و ماه
+    recent = slice(max(n_days - RECENT_DAYS, 0), n_days)
+    seasonal = weekday_factors[:, weekday_keys[recent]] * month_factors[:, month_keys[recent]]
+    observed = seasonal > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deseasonalized = np.where(observed, series[:, recent] / seasonal, 0.0)
+    base = deseasonalized.sum(axis=1) / np.maximum(observed.sum(axis=1), 1)
+
+    future_weekdays = _weekdays(forecast_start, horizon_days)
+    future_months = _jalali_months(forecast_start, horizon_days)
+    forecast = (
+        base[:, np.newaxis]
+        * weekday_factors[:, future_weekdays]
+        * month_factors[:, future_months]
+    )
+    return forecast, future_weekdays
+
+
+def build_forecast(salon, horizon_days=DEFAULT_HORIZON_DAYS, today=None):
+    """محاسبه پیش‌بینی روزانه و به تفکیک خدمت برای یک سالن"""
+    today = today or timezone.localdate()
+    horizon_days = min(max(horizon_days, MIN_HORIZON_DAYS), MAX_HORIZON_DAYS)
+    history_start = today - timedelta(days=HISTORY_DAYS)
+
+    services = list(salon.services.filter(is_active=True).values_list('id', 'name'))
+    service_rows = {service_id: row for row, (service_id, _) in enumerate(services, start=1)}
+
+    # یک کوئری گروه‌بندی‌شده برای کل تاریخچه
+    history = list(
+        Appointment.objects.filter(
+            salon=salon,
+            appointment_date__gte=history_start,
+            appointment_date__lt=today,
+        ).exclude(status='cancelled').values_list(
+            'appointment_date', 'service_id'
+        ).annotate(
+            count=Count('id'),
+            revenue=Sum('total_price'),
+        ).order_by()
+    )
+
+    # ردیف 0 مجموع سالن و ردیف‌های بعدی خدمات فعال هستند
+    shape = (len(services) + 1, HISTORY_DAYS)
+    bookings = np.zeros(shape)
+    revenue = np.zeros(shape)
+    if history:
+        day_index = np.array([(row[0] - history_start).days for row in history], dtype=np.intp)
+        service_index = np.array([service_rows.get(row[1], -1) for row in history], dtype=np.intp)
+        counts = np.array([row[2] for row in history], dtype=float)
+        amounts = np.array([row[3] or 0 for row in history], dtype=float)
+
+        np.add.at(bookings[0], day_index, counts)
+        np.add.at(revenue[0], day_index, amounts)
+        active = service_index >= 0
+        np.add.at(bookings, (service_index[active], day_index[active]), counts[active])
+        np.add.at(revenue, (service_index[active], day_index[active]), amounts[active])
+
+        # روزهای قبل از اولین نوبت سالن داده واقعی نیستند و ضرایب را صفر می‌کنند
+        first_day = int(day_index.min())
+        bookings = bookings[:, first_day:]
+        revenue = revenue[:, first_day:]
+        history_start += timedelta(days=first_day)
+
+    booking_forecast, future_weekdays = _forecast_series(bookings, history_start, today, horizon_days)
+    revenue_forecast, _ = _forecast_series(revenue, history_start, today, horizon_days)
+
+    # روزهای تعطیل سالن نوبتی ندارند
+    closed = np.array([salon.is_closed_on_day(WEEKDAY_NAMES[day]) for day in future_weekdays])
+    booking_forecast[:, closed] = 0.0
+    revenue_forecast[:, closed] = 0.0
+
+    days = [
+        {
+            'date': (today + timedelta(days=i)).isoformat(),
+            'bookings': round(float(booking_forecast[0, i]), 1),
+            'revenue': int(round(revenue_forecast[0, i])),
+        }
+        for i in range(horizon_days)
+    ]
+    service_forecasts = [
+        {
+            'id': service_id,
+            'name': name,
+            'bookings': round(float(booking_forecast[row].sum()), 1),
+            'revenue': int(round(revenue_forecast[row].sum())),
+            'daily_bookings': np.round(booking_forecast[row], 1).tolist(),
+            'daily_revenue': np.round(revenue_forecast[row]).astype(int).tolist(),
+        }
+        for row, (service_id, name) in enumerate(services, start=1)
+    ]
+    service_forecasts.sort(key=lambda service: service['bookings'], reverse=True)
+
+    return {
+        'start_date': today.isoformat(),
+        'history_days': HISTORY_DAYS,
+        'days': days,
+        'services': service_forecasts,
+        'total_bookings': round(float(booking_forecast[0].sum()), 1),
+        'total_revenue': int(round(revenue_forecast[0].sum())),
+    }
+
+
+def refresh_forecast(salon, horizon_days=DEFAULT_HORIZON_DAYS, today=None):
+    """محاسبه و ذخیره پیش‌بینی یک سالن"""
+    data = build_forecast(salon, horizon_days=horizon_days, today=today)
+    forecast, _ = SalonForecast.objects.update_or_create(
+        salon=salon,
+        defaults={
+            'horizon_days': len(data['days']),
+            'data': data,
+            'generated_at': timezone.now(),
+        }
+    )
+    return forecast
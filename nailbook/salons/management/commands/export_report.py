@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from salons.exports import EXPORT_FORMATS, export_appointments, get_export_dir, purge_exports
+from salons.models import Salon
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'تاریخ نامعتبر: {value} (فرمت YYYY-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'خروجی کامل نوبت‌های یک سالن در MEDIA_ROOT (مثلاً برای یک سال مالی)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('salon_id', type=int, nargs='?')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='xlsx')
+        parser.add_argument('--from', dest='from_date', type=parse_date)
+        parser.add_argument('--to', dest='to_date', type=parse_date)
+        parser.add_argument('--purge', action='store_true', help='حذف خروجی‌های قدیمی‌تر از EXPORT_RETENTION_DAYS همه سالن‌ها')
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            self.stdout.write(f'Purged {purge_exports()} expired export files')
+            if options['salon_id'] is None:
+                return
+        elif options['salon_id'] is None:
+            raise CommandError('شناسه سالن یا --purge لازم است')
+
+        try:
+            salon = Salon.objects.get(id=options['salon_id'])
+        except Salon.DoesNotExist:
+            raise CommandError(f"سالن {options['salon_id']} یافت نشد")
+
+        filename = export_appointments(
+            salon, options['format'], options['from_date'], options['to_date']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Exported to {get_export_dir(salon) / filename}'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from salons.models import Salon
+from salons.search import INDEX_BATCH_SIZE, rebuild_search_texts
+
+
+class Command(BaseCommand):
+    help = 'ساخت دوباره متن نرمال‌شده و سه‌حرفی‌های جستجوی سالن‌ها (بعد از migrate یا تغییرهای گروهی)'
+
+    def handle(self, *args, **options):
+        salons = Salon.objects.order_by('id').only('id', 'name', 'address')
+        last_id, total = 0, 0
+        while batch := list(salons.filter(id__gt=last_id)[:INDEX_BATCH_SIZE]):
+            rebuild_search_texts(batch)
+            last_id = batch[-1].id
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} salons'))
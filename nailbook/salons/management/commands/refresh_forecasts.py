@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from salons.forecast import DEFAULT_HORIZON_DAYS, MAX_HORIZON_DAYS, MIN_HORIZON_DAYS, refresh_forecast
+from salons.models import Salon
+
+
+class Command(BaseCommand):
+    help = 'بروزرسانی پیش‌بینی نوبت‌ها و درآمد سالن‌ها (برای اجرای شبانه با cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=DEFAULT_HORIZON_DAYS,
+            help=f'تعداد روزهای پیش‌بینی ({MIN_HORIZON_DAYS} تا {MAX_HORIZON_DAYS})'
+        )
+        parser.add_argument('--salon', type=int, action='append', help='فقط سالن با این شناسه')
+
+    def handle(self, *args, **options):
+        salons = Salon.objects.filter(is_active=True)
+        if options['salon']:
+            salons = salons.filter(id__in=options['salon'])
+
+        refreshed = 0
+        for salon in salons.iterator():
+            forecast = refresh_forecast(salon, horizon_days=options['days'])
+            refreshed += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{salon.name}: {forecast.data['total_bookings']} bookings forecast")
+
+        self.stdout.write(self.style.SUCCESS(f'Refreshed forecasts for {refreshed} salons'))
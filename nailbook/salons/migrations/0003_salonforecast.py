@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0002_alter_salon_options_alter_staff_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalonForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon_days', models.PositiveSmallIntegerField(verbose_name='بازه پیش\u200cبینی (روز)')),
+                ('data', models.JSONField(default=dict, verbose_name='داده\u200cهای پیش\u200cبینی')),
+                ('generated_at', models.DateTimeField(verbose_name='زمان محاسبه')),
+                ('salon', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='salons.salon')),
+            ],
+            options={
+                'verbose_name': 'پیش\u200cبینی سالن',
+                'verbose_name_plural': 'پیش\u200cبینی\u200cهای سالن',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0003_salonforecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salon',
+            name='stale_after_hours',
+            field=models.PositiveSmallIntegerField(default=12, help_text='چند ساعت بعد از زمان نوبت بسته شود', verbose_name='مهلت بستن خودکار (ساعت)'),
+        ),
+        migrations.AddField(
+            model_name='salon',
+            name='stale_appointment_policy',
+            field=models.CharField(choices=[('off', 'غیرفعال'), ('completed', 'انجام شده'), ('no_show', 'عدم حضور')], default='off', help_text='وضعیت نوبت\u200cهای در انتظار یا تایید شده\u200cای که زمانشان گذشته است', max_length=10, verbose_name='بستن خودکار نوبت\u200cهای گذشته'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:52
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# کپی ثابت core.persian.normalize_text و trigrams در زمان این migration؛ تغییرهای
+# بعدی آن ماژول این migration را عوض نمی‌کند (بعد از آن‌ها rebuild_salon_search_index)
+CHAR_MAP = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی', 'ك': 'ک', 'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'ٱ': 'ا', 'آ': 'ا', 'ؤ': 'و',
+    '\u200c': ' ', '\u200f': None, '\u200e': None, 'ـ': None,
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+DIACRITICS = re.compile('[\u064b-\u065f\u0670]')
+WORD_SPLIT = re.compile(r'[^\w]+')
+MAX_WORD_LENGTH = 64
+BATCH_SIZE = 500
+
+
+def normalize(value):
+    if not value:
+        return ''
+    return DIACRITICS.sub('', str(value).translate(CHAR_MAP)).lower().strip()
+
+
+def trigrams(*values):
+    grams = set()
+    for value in values:
+        for word in WORD_SPLIT.split(normalize(value)):
+            word = word.strip('_')[:MAX_WORD_LENGTH]
+            if word:
+                padded = f'  {word} '
+                grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def fill_search_index(apps, schema_editor):
+    # بدون این مرحله سالن‌های موجود سه‌حرفی ندارند و جستجو چیزی پیدا نمی‌کند
+    Salon = apps.get_model('salons', 'Salon')
+    Service = apps.get_model('services', 'Service')
+    SalonSearchTrigram = apps.get_model('salons', 'SalonSearchTrigram')
+
+    services = list(Service.objects.only('id', 'name', 'salon_id', 'is_active'))
+    active_services = {}
+    for service in services:
+        service.search_text = normalize(service.name)
+        if service.is_active:
+            active_services.setdefault(service.salon_id, []).append(service.search_text)
+    Service.objects.bulk_update(services, ['search_text'], batch_size=BATCH_SIZE)
+
+    salons = list(Salon.objects.only('id', 'name', 'address', 'is_active'))
+    for salon in salons:
+        salon.search_text = normalize(f'{salon.name} {salon.address}')
+    Salon.objects.bulk_update(salons, ['search_text'], batch_size=BATCH_SIZE)
+    SalonSearchTrigram.objects.bulk_create([
+        SalonSearchTrigram(salon_id=salon.id, trigram=trigram)
+        for salon in salons if salon.is_active
+        for trigram in trigrams(salon.search_text, *active_services.get(salon.id, []))
+    ], batch_size=BATCH_SIZE * 10)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0004_stale_appointment_policy'),
+        ('services', '0003_service_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salon',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.CreateModel(
+            name='SalonSearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('salon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_trigrams', to='salons.salon')),
+            ],
+            options={
+                'verbose_name': 'سه\u200cحرفی جستجوی سالن',
+                'verbose_name_plural': 'سه\u200cحرفی\u200cهای جستجوی سالن',
+                'constraints': [models.UniqueConstraint(fields=('trigram', 'salon'), name='salon_trigram_unique')],
+            },
+        ),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
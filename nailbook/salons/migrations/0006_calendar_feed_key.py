@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:09
+
+import secrets
+
+import salons.models
+from django.db import migrations, models
+
+
+def assign_feed_keys(apps, schema_editor):
+    # AddField مقدار پیش‌فرض را یک بار برای همه ردیف‌ها حساب می‌کند؛ هر فید کلید خودش را می‌خواهد
+    for model_name in ('Salon', 'Staff'):
+        model = apps.get_model('salons', model_name)
+        for obj_id in model.objects.values_list('id', flat=True):
+            model.objects.filter(id=obj_id).update(calendar_feed_key=secrets.token_hex(16))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('salons', '0005_salon_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salon',
+            name='calendar_feed_key',
+            field=models.CharField(default=salons.models.new_feed_key, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='staff',
+            name='calendar_feed_key',
+            field=models.CharField(default=salons.models.new_feed_key, editable=False, max_length=32),
+        ),
+        migrations.RunPython(assign_feed_keys, migrations.RunPython.noop),
+    ]
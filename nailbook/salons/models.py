@@ -1,9 +1,17 @@
-from django.db import models
+import secrets
+
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 
+from core.persian import normalize_text
+
 User = get_user_model()
 
+def new_feed_key():
+    """کلید تصادفی آدرس فید تقویم؛ عوض کردن آن آدرس‌های قبلی را باطل می‌کند"""
+    return secrets.token_hex(16)
+
 class Salon(models.Model):
     DAYS_CHOICES = [
         ('saturday', 'شنبه'),
@@ -37,13 +45,50 @@ class Salon(models.Model):
         verbose_name='روزهای تعطیل'
     )
     
+    # بستن خودکار نوبت‌های گذشته‌ای که وضعیتشان دستی به‌روز نشده (appointments.sweeper)
+    STALE_POLICY_CHOICES = [
+        ('off', 'غیرفعال'),
+        ('completed', 'انجام شده'),
+        ('no_show', 'عدم حضور'),
+    ]
+    stale_appointment_policy = models.CharField(
+        max_length=10,
+        choices=STALE_POLICY_CHOICES,
+        default='off',
+        help_text='وضعیت نوبت‌های در انتظار یا تایید شده‌ای که زمانشان گذشته است',
+        verbose_name='بستن خودکار نوبت‌های گذشته'
+    )
+    stale_after_hours = models.PositiveSmallIntegerField(
+        default=12,
+        help_text='چند ساعت بعد از زمان نوبت بسته شود',
+        verbose_name='مهلت بستن خودکار (ساعت)'
+    )
+    
     is_active = models.BooleanField(default=True, verbose_name='فعال')
     created_at = models.DateTimeField(auto_now_add=True)
     
+    calendar_feed_key = models.CharField(max_length=32, default=new_feed_key, editable=False)
+    
+    # نام و آدرس نرمال‌شده (core.persian.normalize_text)؛ در save به‌روز می‌شود
+    search_text = models.TextField(blank=True, editable=False)
+    
     def clean(self):
         if self.opening_time >= self.closing_time:
             raise ValidationError('ساعت شروع باید قبل از ساعت پایان باشد')
     
+    def save(self, *args, **kwargs):
+        from .search import SALON_SEARCH_FIELDS, index_salons
+        
+        update_fields = kwargs.get('update_fields')
+        reindex = update_fields is None or bool(SALON_SEARCH_FIELDS & set(update_fields))
+        if reindex:
+            self.search_text = normalize_text(f'{self.name} {self.address}')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+        if reindex:
+            index_salons([self.pk])
+    
     def get_closed_days_list(self):
         """لیست روزهای تعطیل"""
         if self.closed_days:
@@ -74,18 +119,50 @@ class Staff(models.Model):
         verbose_name='تخصص‌ها'
     )
     is_available = models.BooleanField(default=True, verbose_name='در دسترس')
+    calendar_feed_key = models.CharField(max_length=32, default=new_feed_key, editable=False)
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.salon.name}"
     
     def save(self, *args, **kwargs):
-        # اطمینان از اینکه user نقش staff داشته باشد
-        if self.user.role != 'staff':
-            self.user.role = 'staff'
-            self.user.save()
-        super().save(*args, **kwargs)
+        # نقش staff همان لحظه لازم است (staff_dashboard)؛ با UPDATE و در همان تراکنش، نه در صف
+        with transaction.atomic():
+            if self.user.role != 'staff':
+                User.objects.filter(pk=self.user_id).exclude(role='staff').update(role='staff')
+                self.user.role = 'staff'
+            super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = 'کارمند'
         verbose_name_plural = 'کارمندان'
 
+class SalonForecast(models.Model):
+    """پیش‌بینی ذخیره‌شده نوبت‌ها و درآمد روزهای آینده (بروزرسانی شبانه)"""
+    salon = models.OneToOneField(Salon, on_delete=models.CASCADE, related_name='forecast')
+    horizon_days = models.PositiveSmallIntegerField(verbose_name='بازه پیش‌بینی (روز)')
+    data = models.JSONField(default=dict, verbose_name='داده‌های پیش‌بینی')
+    generated_at = models.DateTimeField(verbose_name='زمان محاسبه')
+
+    def __str__(self):
+        return f"پیش‌بینی {self.salon.name}"
+
+    class Meta:
+        verbose_name = 'پیش‌بینی سالن'
+        verbose_name_plural = 'پیش‌بینی‌های سالن'
+
+
+class SalonSearchTrigram(models.Model):
+    """سه‌حرفی‌های نرمال‌شده نام، آدرس و خدمات فعال سالن برای جستجوی فازی (salons.search)"""
+    salon = models.ForeignKey(Salon, on_delete=models.CASCADE, related_name='search_trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        # ایندکس یکتای (trigram، salon) همان ایندکس جستجوست؛ حذف بر اساس سالن از ایندکس FK
+        constraints = [
+            models.UniqueConstraint(fields=['trigram', 'salon'], name='salon_trigram_unique'),
+        ]
+        verbose_name = 'سه‌حرفی جستجوی سالن'
+        verbose_name_plural = 'سه‌حرفی‌های جستجوی سالن'
+
+    def __str__(self):
+        return self.trigram
@@ -0,0 +1,67 @@
+"""
+نمای کلی همه سالن‌های یک مسئول
+
+آمار امروز همه سالن‌ها با تعداد ثابتی کوئری گروه‌بندی‌شده محاسبه می‌شود
+(یک کوئری برای سالن‌ها، یکی برای نوبت‌ها و یکی برای کارمندان)، مستقل از
+تعداد سالن‌هایی که مسئول دارد.
+"""
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from appointments.models import Appointment
+from .models import Salon, Staff
+
+
+def get_owner_overview(owner, day=None):
+    """آمار امروز و موارد در انتظار تایید برای همه سالن‌های owner"""
+    day = day or timezone.localdate()
+
+    salons = list(
+        Salon.objects.filter(owner=owner).order_by('name').values('id', 'name', 'is_active')
+    )
+
+    appointment_stats = {
+        row['salon_id']: row
+        for row in Appointment.objects.filter(
+            salon__owner=owner,
+            appointment_date__gte=day,
+        ).values('salon_id').annotate(
+            today_appointments=Count('id', filter=Q(appointment_date=day)),
+            today_completed=Count('id', filter=Q(appointment_date=day, status='completed')),
+            today_revenue=Sum('total_price', filter=Q(appointment_date=day, is_paid=True)),
+            today_pending=Count('id', filter=Q(appointment_date=day, status='pending')),
+            pending_appointments=Count('id', filter=Q(status='pending')),
+        ).order_by()
+    }
+
+    staff_counts = dict(
+        Staff.objects.filter(salon__owner=owner).values('salon_id').annotate(
+            count=Count('id')
+        ).order_by().values_list('salon_id', 'count')
+    )
+
+    totals = {
+        'today_appointments': 0,
+        'today_completed': 0,
+        'today_revenue': 0,
+        'today_pending': 0,
+        'pending_appointments': 0,
+        'staff_count': 0,
+    }
+    for salon in salons:
+        stats = appointment_stats.get(salon['id'], {})
+        salon['today_appointments'] = stats.get('today_appointments', 0)
+        salon['today_completed'] = stats.get('today_completed', 0)
+        salon['today_revenue'] = stats.get('today_revenue') or 0
+        salon['today_pending'] = stats.get('today_pending', 0)
+        salon['pending_appointments'] = stats.get('pending_appointments', 0)
+        salon['staff_count'] = staff_counts.get(salon['id'], 0)
+        for key in totals:
+            totals[key] += salon[key]
+
+    return {
+        'date': day,
+        'salons': salons,
+        'totals': totals,
+    }
@@ -0,0 +1,88 @@
+"""
+جستجوی فازی سالن‌ها با سه‌حرفی‌های نرمال‌شده
+
+Salon.search_text و Service.search_text شکل نرمال‌شده نام، آدرس و نام خدمت
+هستند (ی/ي، ک/ك، نیم‌فاصله و اعراب یکسان می‌شوند). برای هر سالن سه‌حرفی‌های
+این متن‌ها و خدمات فعالش در SalonSearchTrigram نگه‌داری می‌شود (فقط برای
+سالن‌های فعال)؛ مثل pg_trgm ولی روی هر پایگاه‌داده‌ای. search_salons
+سه‌حرفی‌های عبارت جستجو را از ایندکس (trigram، salon) می‌خواند، از سالن‌هایی
+که حداقل MIN_SIMILARITY از آن‌ها را دارند SEARCH_RESULT_LIMIT سالن با بیشترین
+سه‌حرفی مشترک را برمی‌دارد و (در امتیاز برابر با وجود خود عبارت در نام یا
+آدرس) مرتب می‌کند؛ پس به جای icontains روی کل جدول فقط ردیف‌های همان
+سه‌حرفی‌ها و همان چند سالن خوانده می‌شوند.
+
+ایندکس در Salon.save و Service.save / delete به‌روز می‌شود؛ بعد از
+تغییرهای گروهی (QuerySet.update) یا migrate دستور rebuild_salon_search_index.
+"""
+
+import math
+
+from django.db.models import BooleanField, Count, ExpressionWrapper, OuterRef, Q, Subquery
+
+from core.persian import normalize_text, trigrams
+from .models import Salon, SalonSearchTrigram
+
+# تغییر این فیلدها متن جستجوی سالن را عوض می‌کند
+SALON_SEARCH_FIELDS = {'name', 'address', 'is_active'}
+SERVICE_SEARCH_FIELDS = {'name', 'salon', 'salon_id', 'is_active'}
+
+MIN_SIMILARITY = 0.6
+SEARCH_RESULT_LIMIT = 100
+INDEX_BATCH_SIZE = 500
+
+
+def index_salons(salon_ids):
+    """ساخت دوباره سه‌حرفی‌های سالن‌های داده شده؛ سالن غیرفعال سه‌حرفی ندارد"""
+    from services.models import Service
+
+    salon_ids = [salon_id for salon_id in salon_ids if salon_id is not None]
+    for start in range(0, len(salon_ids), INDEX_BATCH_SIZE):
+        batch = salon_ids[start:start + INDEX_BATCH_SIZE]
+        texts = {salon_id: [text] for salon_id, text in Salon.objects.filter(
+            id__in=batch, is_active=True
+        ).values_list('id', 'search_text')}
+        for salon_id, text in Service.objects.filter(
+            salon_id__in=texts, is_active=True
+        ).values_list('salon_id', 'search_text'):
+            texts[salon_id].append(text)
+
+        SalonSearchTrigram.objects.filter(salon_id__in=batch).delete()
+        SalonSearchTrigram.objects.bulk_create([
+            SalonSearchTrigram(salon_id=salon_id, trigram=trigram)
+            for salon_id, values in texts.items()
+            for trigram in trigrams(*values)
+        ], batch_size=INDEX_BATCH_SIZE * 10)
+
+
+def rebuild_search_texts(salons):
+    """محاسبه دوباره search_text سالن‌ها و خدماتشان (بعد از تغییر قواعد نرمال‌سازی)"""
+    from services.models import Service
+
+    salons = list(salons)
+    for salon in salons:
+        salon.search_text = normalize_text(f'{salon.name} {salon.address}')
+    Salon.objects.bulk_update(salons, ['search_text'], batch_size=INDEX_BATCH_SIZE)
+    services = list(Service.objects.filter(salon__in=salons).only('id', 'name'))
+    for service in services:
+        service.search_text = normalize_text(service.name)
+    Service.objects.bulk_update(services, ['search_text'], batch_size=INDEX_BATCH_SIZE)
+    index_salons([salon.id for salon in salons])
+
+
+def search_salons(queryset, query, limit=SEARCH_RESULT_LIMIT):
+    """سالن‌هایی از queryset که در limit سالن شبیه‌تر به query هستند، به ترتیب شباهت (search_score)"""
+    terms = trigrams(query)
+    if not terms:
+        return queryset
+    # امتیاز و برش limit تایی فقط روی ایندکس (trigram، salon)؛ بعد فقط همین سالن‌ها خوانده می‌شوند
+    scores = SalonSearchTrigram.objects.filter(trigram__in=terms).values('salon_id').annotate(
+        score=Count('trigram')
+    )
+    top = scores.filter(
+        score__gte=math.ceil(len(terms) * MIN_SIMILARITY)
+    ).order_by('-score', 'salon_id')[:limit]
+    return queryset.filter(id__in=top.values('salon_id')).annotate(
+        search_score=Subquery(scores.filter(salon_id=OuterRef('pk')).values('score')[:1]),
+        # در امتیاز برابر، سالنی که خود عبارت در نام یا آدرسش است جلوتر از تطبیق با خدمات
+        search_exact=ExpressionWrapper(Q(search_text__contains=normalize_text(query)), BooleanField()),
+    ).order_by('-search_score', '-search_exact', 'name', 'id')
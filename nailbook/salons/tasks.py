@@ -0,0 +1,22 @@
+"""کارهای پس‌زمینه سالن‌ها"""
+
+from datetime import date
+
+from core.tasks import task
+from .exports import export_appointments, purge_exports
+from .models import Salon
+
+
+@task('salons.export_report')
+def export_report(salon_id, export_format, filename, from_date=None, to_date=None):
+    """ساخت فایل خروجی نوبت‌ها که از صفحه گزارش‌ها درخواست شده است"""
+    salon = Salon.objects.filter(id=salon_id).first()
+    if salon is None:
+        return
+    purge_exports(salon)
+    export_appointments(
+        salon, export_format,
+        date.fromisoformat(from_date) if from_date else None,
+        date.fromisoformat(to_date) if to_date else None,
+        filename=filename,
+    )
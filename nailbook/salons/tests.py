@@ -1,3 +1,390 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+import time as clock
+from datetime import date, time, timedelta
+from io import StringIO
 
-# Create your tests here.
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from appointments.models import Appointment
+from core.models import Task
+from core.tasks import run_tasks
+from core.testing import SalonTestData, create_salon, create_service, create_staff, create_user
+from .exports import export_appointments, get_export_dir, list_exports, purge_exports
+from .forecast import _seasonal_factors, build_forecast, refresh_forecast
+from .models import Salon, SalonForecast, SalonSearchTrigram, Staff
+from .overview import get_owner_overview
+from .search import search_salons
+
+
+class ForecastTests(SalonTestData, TestCase):
+    """پیش‌بینی فصلی، ذخیره آن و دستور بروزرسانی شبانه"""
+
+    today = date(2026, 5, 4)  # دوشنبه
+    salon_fields = {'closed_days': 'friday'}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # یک نوبت در هر روز از هشت هفته گذشته
+        Appointment.objects.bulk_create([
+            Appointment(
+                salon=cls.salon, customer=cls.customer, staff=cls.staff, service=cls.service,
+                appointment_date=cls.today - timedelta(days=day), appointment_time=time(10),
+                status='completed', total_price=cls.service.price,
+            )
+            for day in range(1, 57)
+        ])
+
+    def test_seasonal_factors(self):
+        series = np.array([[2.0, 4.0, 2.0, 4.0], [0.0, 0.0, 0.0, 0.0]])
+        factors = _seasonal_factors(series, np.array([0, 1, 0, 1]), 3)
+        # کلید بدون روز و سری بدون داده ضریب 1 می‌گیرند
+        np.testing.assert_allclose(factors, [[2 / 3, 4 / 3, 1.0], [1.0, 1.0, 1.0]])
+
+    def test_flat_history_and_closed_days(self):
+        data = build_forecast(self.salon, horizon_days=14, today=self.today)
+        self.assertEqual(data['start_date'], '2026-05-04')
+        self.assertEqual(len(data['days']), 14)
+        for day in data['days']:
+            closed = date.fromisoformat(day['date']).weekday() == 4
+            self.assertEqual(day['bookings'], 0.0 if closed else 1.0)
+            self.assertEqual(day['revenue'], 0 if closed else 200000)
+        self.assertEqual(data['total_bookings'], 12.0)
+        self.assertEqual(data['services'][0]['id'], self.service.id)
+        self.assertEqual(data['services'][0]['bookings'], 12.0)
+
+    def test_horizon_is_clamped(self):
+        self.assertEqual(len(build_forecast(self.salon, horizon_days=3, today=self.today)['days']), 14)
+        self.assertEqual(len(build_forecast(self.salon, horizon_days=90, today=self.today)['days']), 28)
+
+    def test_salon_without_history(self):
+        salon = create_salon(self.owner, name='سالن خالی')
+        data = build_forecast(salon, horizon_days=14, today=self.today)
+        self.assertEqual(data['total_bookings'], 0.0)
+        self.assertEqual(data['services'], [])
+
+    def test_refresh_forecast_updates_the_stored_row(self):
+        refresh_forecast(self.salon, horizon_days=14, today=self.today)
+        forecast = refresh_forecast(self.salon, horizon_days=21, today=self.today)
+        self.assertEqual(SalonForecast.objects.filter(salon=self.salon).count(), 1)
+        self.assertEqual(forecast.horizon_days, 21)
+        self.assertEqual(len(forecast.data['days']), 21)
+
+    def test_refresh_forecasts_command(self):
+        create_salon(self.owner, name='سالن غیرفعال', is_active=False)
+        out = StringIO()
+        call_command('refresh_forecasts', '--days', '14', stdout=out)
+        self.assertIn('Refreshed forecasts for 1 salons', out.getvalue())
+        self.assertEqual(list(SalonForecast.objects.values_list('salon_id', 'horizon_days')), [(self.salon.id, 14)])
+
+    def test_analytics_page_with_and_without_forecast(self):
+        self.client.force_login(self.owner)
+        url = reverse('salons:analytics', args=[self.salon.id])
+        response = self.client.get(url)
+        self.assertContains(response, 'پیش‌بینی روزهای آینده')
+        self.assertContains(response, 'پیش‌بینی هنوز محاسبه نشده است')
+
+        refresh_forecast(self.salon, horizon_days=14)
+        response = self.client.get(url)
+        self.assertContains(response, 'پیش‌بینی 14 روز آینده')
+        self.assertNotContains(response, 'پیش‌بینی هنوز محاسبه نشده است')
+
+
+class OwnerOverviewTests(TestCase):
+    """نمای کلی مسئول با تعداد ثابت کوئری برای هر تعداد سالن"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user('owner', 'salon_owner', '09120000001')
+        cls.customer = create_user('customer', 'customer', '09120000002')
+        for i in range(3):
+            cls.add_salon(i)
+
+    @classmethod
+    def add_salon(cls, index):
+        salon = create_salon(cls.owner, name=f'سالن {index}')
+        staff = create_staff(salon, f'staff{index}', f'0912100000{index}')
+        service = create_service(salon)
+        today = timezone.localdate()
+        for hour, day, status, is_paid in [
+            (10, today, 'completed', True), (11, today, 'pending', False),
+            (12, today + timedelta(days=1), 'pending', False),
+        ]:
+            Appointment.objects.create(
+                salon=salon, customer=cls.customer, staff=staff, service=service,
+                appointment_date=day, appointment_time=time(hour), status=status, is_paid=is_paid,
+            )
+
+    def test_constant_queries_and_totals(self):
+        # سالن‌ها، آمار نوبت‌ها، تعداد کارمندان
+        with self.assertNumQueries(3):
+            overview = get_owner_overview(self.owner)
+        self.assertEqual(len(overview['salons']), 3)
+        self.assertEqual(overview['salons'][0]['today_appointments'], 2)
+        self.assertEqual(overview['salons'][0]['pending_appointments'], 2)
+        self.assertEqual(overview['totals']['today_revenue'], 3 * 200000)
+        self.assertEqual(overview['totals']['staff_count'], 3)
+
+        for index in range(3, 6):
+            self.add_salon(index)
+        with self.assertNumQueries(3):
+            overview = get_owner_overview(self.owner)
+        self.assertEqual(overview['totals']['today_completed'], 6)
+
+    def test_view_and_api_do_not_grow_with_salons(self):
+        self.client.force_login(self.owner)
+        urls = [reverse('salons:overview'), reverse('api:owner_overview')]
+        for url in urls:
+            with self.assertNumQueries(5):  # session، کاربر و سه کوئری نمای کلی
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.add_salon(3)
+        for url in urls:
+            with self.assertNumQueries(5):
+                self.client.get(url)
+
+
+class StaffDashboardTests(SalonTestData, TestCase):
+    """بودجه ثابت کوئری داشبورد کارمند"""
+
+    salon_fields = {'name': 'سالن تست'}
+    service_fields = {'name': 'ژل‌لاک', 'price': 300000, 'duration': 60}
+
+    def create_appointments(self, per_day):
+        today = timezone.localdate()
+        week_start = today - timedelta(days=today.weekday())
+        for day in range(7):
+            for hour in range(per_day):
+                Appointment.objects.create(
+                    salon=self.salon,
+                    customer=self.customer,
+                    staff=self.staff,
+                    service=self.service,
+                    appointment_date=week_start + timedelta(days=day),
+                    appointment_time=time(9 + hour),
+                    total_price=self.service.price,
+                    status='completed' if hour % 2 else 'pending',
+                )
+
+    def assert_dashboard_queries(self):
+        self.client.force_login(self.staff_user)
+        # session، کاربر، کارمند و سالن، نوبت‌های هفته
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('salons:staff_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_budget_without_appointments(self):
+        response = self.assert_dashboard_queries()
+        self.assertEqual(response.context['stats']['week_appointments'], 0)
+        self.assertEqual(len(response.context['week_agenda']), 7)
+
+    def test_query_budget_is_independent_of_appointment_count(self):
+        self.create_appointments(per_day=6)
+        response = self.assert_dashboard_queries()
+
+        stats = response.context['stats']
+        self.assertEqual(stats['week_appointments'], 42)
+        self.assertEqual(stats['today_appointments'], 6)
+        self.assertEqual(stats['completed_today'], 3)
+        self.assertEqual(stats['pending_appointments'], 3)
+        self.assertEqual(
+            sum(len(day['appointments']) for day in response.context['week_agenda']), 42
+        )
+
+
+class AdminQueryCountTests(TestCase):
+    """تعداد ثابت کوئری صفحات مدیریت سالن و کارمند"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', password='pass', phone='09120000000')
+        cls.salon = None
+        for i in range(3):
+            cls.add_salon(i)
+
+    @classmethod
+    def add_salon(cls, index):
+        owner = create_user(f'owner{index}', 'salon_owner', f'0912100{index:04d}')
+        salon = create_salon(owner, name=f'سالن {index}')
+        customer = create_user(f'customer{index}', 'customer', f'0912200{index:04d}')
+        service = create_service(salon)
+        for j in range(3):
+            user = create_user(
+                f'staff{index}_{j}', 'staff', f'0912300{index:02d}{j:02d}', first_name='کارمند', last_name=str(j),
+            )
+            staff = Staff.objects.create(user=user, salon=salon, specialties='ژل‌لاک,کاشت,پدیکور,مانیکور')
+            Appointment.objects.create(
+                salon=salon, customer=customer, staff=staff, service=service,
+                appointment_date=timezone.localdate() + timedelta(days=1), appointment_time=time(10),
+                total_price=service.price,
+            )
+        cls.salon = cls.salon or salon
+        return salon
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def assert_constant_queries(self, url_name, expected, args=()):
+        url = reverse(url_name, args=args)
+        # درخواست اول کش ContentType را پر می‌کند
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(expected):
+            self.client.get(url)
+        self.add_salon(10)
+        with self.assertNumQueries(expected):
+            response = self.client.get(url)
+        return response
+
+    def test_salon_changelist(self):
+        response = self.assert_constant_queries('admin:salons_salon_changelist', 6)
+        salon = response.context['cl'].result_list.get(pk=self.salon.pk)
+        self.assertEqual((salon.staff_count, salon.service_count, salon.upcoming_count), (3, 1, 3))
+
+    def test_salon_change_page(self):
+        self.assert_constant_queries('admin:salons_salon_change', 7, args=[self.salon.pk])
+
+    def test_staff_changelist(self):
+        self.assert_constant_queries('admin:salons_staff_changelist', 6)
+
+    def test_staff_change_page(self):
+        staff = self.salon.staff_members.first()
+        self.assert_constant_queries('admin:salons_staff_change', 6, args=[staff.pk])
+
+
+class SalonSearchTests(TestCase):
+    """جستجوی فازی سالن‌ها با متن نرمال‌شده و سه‌حرفی‌ها"""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = create_user('owner', 'salon_owner', '09120000001')
+        cls.rose = create_salon(owner, name='سالن زیبایی رز', address='تهران، خیابان ولیعصر')
+        cls.nail = create_salon(owner, name='ناخن‌آرایی کیمیا', address='کرج، گوهردشت')
+        cls.other = create_salon(owner, name='آرایشگاه مهسا', address='شیراز')
+        cls.service = create_service(cls.other, name='کاشت ناخن', price=500000, duration=90)
+
+    def search(self, query):
+        return list(search_salons(Salon.objects.all(), query))
+
+    def test_arabic_letters_zwnj_and_diacritics_match(self):
+        self.assertEqual(self.search('كيميا'), [self.nail])
+        self.assertEqual(self.search('ولیعَصر'), [self.rose])
+        self.assertEqual(self.nail.search_text, 'ناخن ارایی کیمیا کرج، گوهردشت')
+
+    def test_services_are_indexed_and_ranked_below_closer_matches(self):
+        self.assertEqual(self.search('ناخن آرایی'), [self.nail, self.other])
+
+        self.service.is_active = False
+        self.service.save()
+        self.assertEqual(self.search('کاشت'), [])
+
+    def test_index_follows_renames(self):
+        self.rose.name = 'سالن یاس'
+        self.rose.save(update_fields=['name'])
+        self.assertEqual(self.search('رز'), [])
+        self.assertEqual(self.search('یاس'), [self.rose])
+        self.assertTrue(SalonSearchTrigram.objects.filter(salon=self.rose, trigram='یاس').exists())
+
+    def test_inactive_salons_leave_the_index_and_limit_applies(self):
+        self.nail.is_active = False
+        self.nail.save(update_fields=['is_active'])
+        self.assertFalse(SalonSearchTrigram.objects.filter(salon=self.nail).exists())
+        self.assertEqual(self.search('ناخن'), [self.other])
+
+        self.nail.is_active = True
+        self.nail.save(update_fields=['is_active'])
+        self.assertEqual(list(search_salons(Salon.objects.all(), 'ناخن', limit=1)), [self.nail])
+
+    def test_salon_list_view(self):
+        response = self.client.get(reverse('appointments:salon_list'), {'search': 'ناخن'})
+        self.assertEqual(list(response.context['salons']), [self.nail, self.other])
+
+
+class ReportExportTests(SalonTestData, TestCase):
+    """خروجی CSV / XLSX نوبت‌ها در صف کارها"""
+
+    salon_fields = {'name': 'سالن تست'}
+    staff_fields = {'first_name': 'مریم', 'last_name': 'احمدی'}
+    service_fields = {'name': 'ژل‌لاک', 'price': 300000, 'duration': 60}
+    customer_fields = {'first_name': 'سارا', 'last_name': 'کریمی'}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for day, payment_method in [(date(2025, 3, 21), 'cash'), (date(2025, 6, 1), 'card')]:
+            cls.create_appointment(
+                day=day, status='completed', is_paid=True, payment_method=payment_method,
+            )
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def read_csv(self, filename):
+        with open(get_export_dir(self.salon) / filename, encoding='utf-8-sig', newline='') as f:
+            return list(csv.reader(f))
+
+    def test_csv_rows_and_date_filters(self):
+        header, *rows = self.read_csv(export_appointments(self.salon, 'csv'))
+        self.assertEqual(header[:3], ['شماره نوبت', 'تاریخ', 'ساعت'])
+        self.assertEqual(
+            rows[0][1:],
+            ['1404/01/01', '10:00', 'سارا کریمی', '09120000003', 'مریم احمدی', 'ژل‌لاک',
+             '300000', 'تکمیل شده', 'بله', 'نقدی'],
+        )
+        self.assertEqual(len(rows), 2)
+
+        _, *rows = self.read_csv(export_appointments(self.salon, 'csv', from_date=date(2025, 4, 1)))
+        self.assertEqual([row[-1] for row in rows], ['کارتی'])
+        _, *rows = self.read_csv(export_appointments(self.salon, 'csv', to_date=date(2025, 4, 1)))
+        self.assertEqual([row[-1] for row in rows], ['نقدی'])
+
+    def test_xlsx_rows(self):
+        from openpyxl import load_workbook
+
+        filename = export_appointments(self.salon, 'xlsx')
+        sheet = load_workbook(get_export_dir(self.salon) / filename, read_only=True)['نوبت‌ها']
+        rows = list(sheet.values)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2][1], '1404/03/11')
+        self.assertEqual(rows[2][-1], 'کارتی')
+
+    def test_export_view_queues_a_job_and_download_is_owner_only(self):
+        self.client.force_login(self.owner)
+        response = self.client.post(reverse('salons:report_export', args=[self.salon.id]), {
+            'format': 'csv', 'from_date': '2025-04-01',
+        })
+        self.assertRedirects(response, reverse('salons:reports', args=[self.salon.id]))
+        self.assertEqual(list_exports(self.salon), [])
+        self.assertEqual(Task.objects.get().name, 'salons.export_report')
+
+        run_tasks()
+        [(filename, _, _)] = list_exports(self.salon)
+        self.assertEqual(len(self.read_csv(filename)), 2)
+        url = reverse('salons:report_download', args=[self.salon.id, filename])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        other = create_user('other', 'salon_owner', '09120000009')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_expired_exports_are_purged(self):
+        old = export_appointments(self.salon, 'csv')
+        new = export_appointments(self.salon, 'xlsx')
+        expired = clock.time() - 8 * 24 * 3600
+        os.utime(get_export_dir(self.salon) / old, (expired, expired))
+
+        self.assertEqual(purge_exports(days=7), 1)
+        self.assertEqual([name for name, _, _ in list_exports(self.salon)], [new])
+        stdout = StringIO()
+        call_command('export_report', '--purge', stdout=stdout)
+        self.assertIn('Purged 0', stdout.getvalue())
@@ -7,20 +7,25 @@ urlpatterns = [
     # Dashboard URLs
     path('dashboard/', views.salon_dashboard, name='dashboard'),
     path('staff-dashboard/', views.staff_dashboard, name='staff_dashboard'),
+    path('overview/', views.owner_overview, name='overview'),
     
     # Salon Management
     path('create/', views.salon_create, name='create'),
     path('<int:salon_id>/edit/', views.salon_edit, name='edit'),
     path('<int:salon_id>/delete/', views.salon_delete, name='delete'),
+    path('<int:salon_id>/calendar-feed/reset/', views.salon_calendar_feed_reset, name='calendar_feed_reset'),
     
     # Staff Management
     path('<int:salon_id>/staff/', views.staff_list, name='staff_list'),
     path('<int:salon_id>/staff/add/', views.staff_add, name='staff_add'),
     path('staff/<int:staff_id>/edit/', views.staff_edit, name='staff_edit'),
     path('staff/<int:staff_id>/delete/', views.staff_delete, name='staff_delete'),
+    path('staff/<int:staff_id>/calendar-feed/reset/', views.staff_calendar_feed_reset, name='staff_calendar_feed_reset'),
     
     # Reports & Analytics
     path('<int:salon_id>/reports/', views.salon_reports, name='reports'),
+    path('<int:salon_id>/reports/export/', views.salon_report_export, name='report_export'),
+    path('<int:salon_id>/reports/download/<str:filename>/', views.salon_report_download, name='report_download'),
     path('<int:salon_id>/analytics/', views.salon_analytics, name='analytics'),
 ]
 
@@ -1,13 +1,22 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, FileResponse, Http404
 from django.utils import timezone
+from django.urls import reverse
 from django.db.models import Count, Sum, Q
 from datetime import datetime, timedelta
-from .models import Salon, Staff
+import os
+from .models import Salon, Staff, SalonForecast
+from .overview import get_owner_overview
+from .exports import EXPORT_FORMATS, get_export_dir, list_exports, new_export_filename
 from services.models import Service
 from appointments.models import Appointment
+from core.jalali import to_jalali
+from core.models import Task
+from core.tasks import enqueue
+from appointments.cache import fragment_cache_context
+from appointments import ics
 from accounts.models import User
 import json
 
@@ -70,10 +79,28 @@ def salon_dashboard(request):
         'stats': stats,
         'upcoming_appointments': upcoming_appointments,
         'weekly_revenue': weekly_revenue,
+        'today': today,
+        'calendar_feed_url': request.build_absolute_uri(reverse(
+            'appointments:salon_calendar_feed', args=[ics.salon_feed_token(selected_salon)]
+        )),
+        **fragment_cache_context(selected_salon.id),
     }
     
     return render(request, 'salons/dashboard.html', context)
 
+@login_required
+def owner_overview(request):
+    """نمای کلی همه سالن‌های مسئول"""
+    if request.user.role != 'salon_owner':
+        messages.error(request, 'دسترسی غیر مجاز')
+        return redirect('accounts:login')
+    
+    overview = get_owner_overview(request.user)
+    if not overview['salons']:
+        return render(request, 'salons/no_salon.html')
+    
+    return render(request, 'salons/overview.html', {'overview': overview})
+
 @login_required
 def salon_create(request):
     """ایجاد سالن جدید"""
@@ -116,39 +143,49 @@ def staff_dashboard(request):
         return redirect('accounts:login')
     
     try:
-        staff = Staff.objects.get(user=request.user)
+        staff = Staff.objects.select_related('salon').get(user=request.user)
     except Staff.DoesNotExist:
         messages.error(request, 'اطلاعات کارمند یافت نشد')
         return redirect('accounts:login')
     
-    # نوبت‌های امروز
-    today = timezone.now().date()
-    today_appointments = Appointment.objects.filter(
-        staff=staff,
-        appointment_date=today
-    ).select_related('customer', 'service').order_by('appointment_time')
-    
-    # نوبت‌های این هفته
-    week_start = today - timezone.timedelta(days=today.weekday())
-    week_end = week_start + timezone.timedelta(days=6)
-    week_appointments = Appointment.objects.filter(
+    # نوبت‌های این هفته با یک کوئری؛ نوبت‌های امروز و آمار از همین لیست ساخته می‌شوند
+    today = timezone.localdate()
+    week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=6)
+    week_appointments = list(Appointment.objects.filter(
         staff=staff,
         appointment_date__range=[week_start, week_end]
-    ).count()
+    ).select_related('customer', 'service').order_by('appointment_date', 'appointment_time'))
+    
+    today_appointments = [a for a in week_appointments if a.appointment_date == today]
+    
+    # برنامه هفته (روزهای بدون نوبت هم نمایش داده می‌شوند)
+    week_agenda = [
+        {'date': week_start + timedelta(days=i), 'appointments': []}
+        for i in range(7)
+    ]
+    for appointment in week_appointments:
+        week_agenda[(appointment.appointment_date - week_start).days]['appointments'].append(appointment)
     
     # آمار
     stats = {
-        'today_appointments': today_appointments.count(),
-        'completed_today': today_appointments.filter(status='completed').count(),
-        'pending_appointments': today_appointments.filter(status='pending').count(),
-        'week_appointments': week_appointments,
+        'today_appointments': len(today_appointments),
+        'completed_today': sum(1 for a in today_appointments if a.status == 'completed'),
+        'pending_appointments': sum(1 for a in today_appointments if a.status == 'pending'),
+        'week_appointments': len(week_appointments),
     }
     
     context = {
         'staff': staff,
         'salon': staff.salon,
+        'today': today,
         'today_appointments': today_appointments,
-        'stats': stats
+        'week_agenda': week_agenda,
+        'stats': stats,
+        'calendar_feed_url': request.build_absolute_uri(reverse(
+            'appointments:staff_calendar_feed', args=[ics.staff_feed_token(staff)]
+        )),
+        **fragment_cache_context(staff.salon_id),
     }
     
     return render(request, 'salons/staff_dashboard.html', context)
@@ -301,10 +338,9 @@ def salon_reports(request, salon_id):
         total=Sum('total_price')
     )['total'] or 0
     
-    # آمار ماهانه
-    monthly_stats = appointments.filter(
-        appointment_date__gte=timezone.now().date().replace(day=1)
-    ).aggregate(
+    # آمار ماه شمسی جاری
+    jalali_year, jalali_month, _ = to_jalali(timezone.localdate())
+    monthly_stats = appointments.in_jalali_month(jalali_year, jalali_month).aggregate(
         count=Count('id'),
         revenue=Sum('total_price', filter=Q(is_paid=True))
     )
@@ -316,11 +352,88 @@ def salon_reports(request, salon_id):
         'total_revenue': total_revenue,
         'monthly_stats': monthly_stats,
         'from_date': from_date,
-        'to_date': to_date
+        'to_date': to_date,
+        'exports': list_exports(salon),
+        'pending_exports': Task.objects.filter(
+            name='salons.export_report', status__in=['queued', 'running'], payload__salon_id=salon.id
+        ).count(),
     }
     
     return render(request, 'salons/reports.html', context)
 
+@login_required
+def salon_calendar_feed_reset(request, salon_id):
+    """آدرس جدید فید تقویم سالن؛ آدرس قبلی (مثلاً لو رفته) باطل می‌شود"""
+    salon = get_object_or_404(Salon, id=salon_id, owner=request.user)
+    
+    if request.method == 'POST':
+        ics.reset_feed_key(salon)
+        messages.success(request, 'آدرس تقویم عوض شد؛ آدرس قبلی دیگر کار نمی‌کند')
+    return redirect(f"{reverse('salons:dashboard')}?salon_id={salon.id}")
+
+@login_required
+def staff_calendar_feed_reset(request, staff_id):
+    """آدرس جدید فید تقویم کارمند (توسط خود کارمند یا مسئول سالن)"""
+    staff = get_object_or_404(Staff.objects.select_related('salon'), id=staff_id)
+    is_own = staff.user_id == request.user.id
+    
+    if not is_own and staff.salon.owner_id != request.user.id:
+        messages.error(request, 'دسترسی غیر مجاز')
+        return redirect('salons:dashboard')
+    
+    if request.method == 'POST':
+        ics.reset_feed_key(staff)
+        messages.success(request, 'آدرس تقویم عوض شد؛ آدرس قبلی دیگر کار نمی‌کند')
+    if is_own:
+        return redirect('salons:staff_dashboard')
+    return redirect('salons:staff_list', salon_id=staff.salon_id)
+
+@login_required
+def salon_report_export(request, salon_id):
+    """ساخت خروجی کامل نوبت‌ها (CSV یا XLSX)"""
+    salon = get_object_or_404(Salon, id=salon_id, owner=request.user)
+    
+    if request.method != 'POST':
+        return redirect('salons:reports', salon_id=salon.id)
+    
+    export_format = request.POST.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        messages.error(request, 'فرمت خروجی نامعتبر است')
+        return redirect('salons:reports', salon_id=salon.id)
+    
+    try:
+        from_date = request.POST.get('from_date') or None
+        to_date = request.POST.get('to_date') or None
+        if from_date:
+            from_date = datetime.strptime(from_date, '%Y-%m-%d').date().isoformat()
+        if to_date:
+            to_date = datetime.strptime(to_date, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        messages.error(request, 'تاریخ نامعتبر است')
+        return redirect('salons:reports', salon_id=salon.id)
+    
+    # خروجی بازه‌های بزرگ در صف کارها ساخته می‌شود، نه در همین درخواست
+    enqueue('salons.export_report', {
+        'salon_id': salon.id,
+        'export_format': export_format,
+        'filename': new_export_filename(salon, export_format),
+        'from_date': from_date,
+        'to_date': to_date,
+    })
+    messages.success(request, 'خروجی در حال ساخت است؛ بعد از آماده شدن از همین صفحه دانلود کنید')
+    return redirect('salons:reports', salon_id=salon.id)
+
+@login_required
+def salon_report_download(request, salon_id, filename):
+    """دانلود فایل خروجی گزارش"""
+    salon = get_object_or_404(Salon, id=salon_id, owner=request.user)
+    
+    path = get_export_dir(salon) / os.path.basename(filename)
+    if filename.startswith('.') or not path.is_file():
+        raise Http404('فایل گزارش یافت نشد')
+    
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
+
 @login_required
 def salon_analytics(request, salon_id):
     """تحلیل‌های سالن"""
@@ -359,11 +472,22 @@ def salon_analytics(request, salon_id):
             )['total'] or 0
         })
     
+    # پیش‌بینی روزهای آینده (محاسبه شبانه با دستور refresh_forecasts)
+    forecast = SalonForecast.objects.filter(salon=salon).first()
+    forecast_days = []
+    if forecast:
+        forecast_days = [
+            dict(day, date=datetime.strptime(day['date'], '%Y-%m-%d').date())
+            for day in forecast.data.get('days', [])
+        ]
+    
     context = {
         'salon': salon,
         'popular_services': popular_services,
         'top_staff': top_staff,
-        'daily_stats': daily_stats
+        'daily_stats': daily_stats,
+        'forecast': forecast,
+        'forecast_days': forecast_days,
     }
     
     return render(request, 'salons/analytics.html', context)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
+from core.persian import format_duration, format_price
 from .models import Service
 
 @admin.register(Service)
@@ -26,15 +27,11 @@ class ServiceAdmin(admin.ModelAdmin):
     
     def get_price_display(self, obj):
         return format_html(
-            '<span style="color: green; font-weight: bold;">{:,} تومان</span>',
-            obj.price
+            '<span style="color: green; font-weight: bold;">{} تومان</span>',
+            format_price(obj.price)
         )
     get_price_display.short_description = 'قیمت'
     
     def get_duration_display(self, obj):
-        hours = obj.duration // 60
-        minutes = obj.duration % 60
-        if hours > 0:
-            return f"{hours} ساعت و {minutes} دقیقه"
-        return f"{minutes} دقیقه"
+        return format_duration(obj.duration)
     get_duration_display.short_description = 'مدت زمان'
\ No newline at end of file
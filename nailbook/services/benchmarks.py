@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from core import persian
+from core.benchmarks import format_timings, measure, scenario
+from core.templatetags import persian_filters
+
+
+def legacy_format_price(value):
+    """پیاده‌سازی قبلی فیلتر format_price"""
+    if not value:
+        return "0"
+    try:
+        price = int(float(value))
+        return f"{price:,}".replace(',', '،')
+    except (ValueError, TypeError):
+        return value
+
+
+def legacy_duration(duration):
+    """پیاده‌سازی قبلی Service.get_duration_display"""
+    hours = duration // 60
+    minutes = duration % 60
+    if hours > 0:
+        return f"{hours} ساعت و {minutes} دقیقه"
+    return f"{minutes} دقیقه"
+
+
+def legacy_digits(value):
+    """تبدیل رقم به رقم با replace، مثل اسکریپت‌های سمت کاربر"""
+    value = str(value)
+    for latin, persian_digit in zip('0123456789', '۰۱۲۳۴۵۶۷۸۹'):
+        value = value.replace(latin, persian_digit)
+    return value
+
+
+@scenario('localization_filters')
+def localization_filters(options):
+    """فیلترهای قیمت، مدت زمان و ارقام فارسی در برابر پیاده‌سازی قبلی"""
+    size = int(10_000 * options['scale'])
+    # قیمت‌های صفحه‌ها معمولاً همان چند قیمت خدمات‌اند؛ چند Decimal مثل جمع درآمد
+    prices = [100_000 * (i % 20 + 1) for i in range(size)]
+    revenues = [Decimal(1_250_000 * (i % 50 + 1)) for i in range(size // 10)]
+    durations = [15 * (i % 16 + 1) for i in range(size)]
+    texts = [f'1405/07/{i % 30 + 1:02d} - {8 + i % 12}:30' for i in range(size)]
+    repeat = options['repeat']
+
+    for price in prices[:100] + revenues[:100]:
+        assert persian_filters.format_price(price) == legacy_format_price(price)
+    assert all(persian.format_duration(d) == legacy_duration(d) for d in durations[:100])
+    assert all(persian.to_persian_digits(t) == legacy_digits(t) for t in texts[:100])
+
+    yield f"{size} prices, {len(revenues)} decimal revenues, {size} durations, {size} digit strings"
+    cases = [
+        ('format_price', legacy_format_price, persian_filters.format_price, prices),
+        ('format_price (Decimal)', legacy_format_price, persian_filters.format_price, revenues),
+        ('persian_price', lambda v: legacy_digits(legacy_format_price(v)), persian_filters.persian_price, prices),
+        ('duration', legacy_duration, persian.format_duration, durations),
+        ('persian_duration', lambda v: legacy_digits(legacy_duration(v)), persian_filters.persian_duration, durations),
+        ('persian_digits', legacy_digits, persian_filters.persian_digits, texts),
+    ]
+    for label, legacy, current, values in cases:
+        yield format_timings(f'{label}, before', measure(lambda: [legacy(v) for v in values], repeat=repeat))
+        yield format_timings(f'{label}, after', measure(lambda: [current(v) for v in values], repeat=repeat))
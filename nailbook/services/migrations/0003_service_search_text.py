@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_alter_service_options_alter_service_duration_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
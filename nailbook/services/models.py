@@ -1,6 +1,8 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 
+from core.persian import format_duration, format_price, normalize_text
+
 class Service(models.Model):
     salon = models.ForeignKey('salons.Salon', on_delete=models.CASCADE, related_name='services')
     name = models.CharField(max_length=200, verbose_name='نام خدمت')
@@ -16,18 +18,47 @@ class Service(models.Model):
     is_active = models.BooleanField(default=True, verbose_name='فعال')
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # نام نرمال‌شده (core.persian.normalize_text)؛ در save به‌روز می‌شود
+    search_text = models.TextField(blank=True, editable=False)
+    
     def __str__(self):
         return f"{self.name} - {self.salon.name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'salon_id' in field_names:
+            instance._loaded_salon_id = instance.salon_id
+        return instance
+    
+    def save(self, *args, **kwargs):
+        from salons.search import SERVICE_SEARCH_FIELDS, index_salons
+        
+        update_fields = kwargs.get('update_fields')
+        reindex = update_fields is None or bool(SERVICE_SEARCH_FIELDS & set(update_fields))
+        if reindex:
+            self.search_text = normalize_text(self.name)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+        if reindex:
+            # خدمت ممکن است به سالن دیگری منتقل شده باشد
+            index_salons({self.salon_id, getattr(self, '_loaded_salon_id', self.salon_id)})
+            self._loaded_salon_id = self.salon_id
+    
+    def delete(self, *args, **kwargs):
+        from salons.search import index_salons
+        
+        salon_id = self.salon_id
+        result = super().delete(*args, **kwargs)
+        index_salons([salon_id])
+        return result
+    
     def get_price_display(self):
-        return f"{self.price:,} تومان"
+        return f"{format_price(self.price)} تومان"
     
     def get_duration_display(self):
-        hours = self.duration // 60
-        minutes = self.duration % 60
-        if hours > 0:
-            return f"{hours} ساعت و {minutes} دقیقه"
-        return f"{minutes} دقیقه"
+        return format_duration(self.duration)
 
     class Meta:
         verbose_name = 'خدمت'
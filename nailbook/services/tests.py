@@ -1,3 +1,23 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from accounts.models import User
+from core.testing import create_salon, create_service, create_user
+
+
+class ServiceDisplayTests(TestCase):
+    """نمایش قیمت و مدت خدمت در سایت و پنل ادمین"""
+
+    @classmethod
+    def setUpTestData(cls):
+        salon = create_salon(create_user('owner', 'salon_owner', '09120000001'), name='سالن تست')
+        cls.service = create_service(salon, name='کاشت ناخن', price=1200000, duration=135)
+
+    def test_displays(self):
+        self.assertEqual(self.service.get_price_display(), '1،200،000 تومان')
+        self.assertEqual(self.service.get_duration_display(), '2 ساعت و 15 دقیقه')
+
+    def test_admin_changelist(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        response = self.client.get(reverse('admin:services_service_changelist'))
+        self.assertContains(response, '1،200،000 تومان')